@@ -11,8 +11,15 @@ PIPELINE_DIR = '/pipeline-dir'
 # Relative to the `PIPELINE_DIR`.
 KERNELSPECS_PATH = '.orchest/kernels'
 LOGS_PATH = '.orchest/logs'
+DATA_PATH = '.orchest/data'
+STEP_CACHE_PATH = '.orchest/cache'
 PIPELINE_DESCRIPTION_FILE = 'pipeline.json'
 PIPELINE_DESCRIPTION_PATH = os.path.join('.orchest', PIPELINE_DESCRIPTION_FILE)
 
+# The first line of the log of a step identifies the run that wrote it,
+# such that readers notice that the log was rewritten. It is an HTML
+# comment, since logs are displayed as HTML.
+LOG_ID_LINE = '<!-- log-id: {log_id} -->\n'
+
 # memory-server
 MEMORY_SERVER_SOCK_PATH = TEMP_DIRECTORY_PATH
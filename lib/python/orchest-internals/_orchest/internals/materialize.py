@@ -0,0 +1,174 @@
+"""Materializes pipeline directories, e.g. the directory of a run.
+
+The files of the source directory are (in order of preference):
+
+* reflinked: the file shares its data with the source until either of
+  them is written to (copy-on-write), which requires a filesystem with
+  support for reflinks, e.g. Btrfs or XFS.
+* hardlinked (only if allowed): the file is the same file as the source,
+  thus writing to it also writes to the source. Files that are written
+  to, e.g. the notebooks of steps, have to be passed as `copy_paths`.
+* copied.
+"""
+import errno
+import fnmatch
+import os
+import shutil
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows.
+    fcntl = None
+
+from _orchest.internals import config as _config
+
+
+# ioctl to clone (reflink) a file on Linux, see ioctl_ficlone(2).
+FICLONE = 0x40049409
+
+# Errors of the FICLONE ioctl meaning that reflinks are not supported
+# between the source and destination.
+_REFLINK_UNSUPPORTED_ERRORS = {
+    errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS,
+}
+
+# Paths, relative to the pipeline directory, that are specific to the
+# directory (e.g. the outputs and logs of its steps) and are thus never
+# materialized.
+IGNORED_PATHS = [
+    _config.DATA_PATH,
+    _config.LOGS_PATH,
+    _config.STEP_CACHE_PATH,
+]
+
+# Names of files and directories that are never materialized.
+IGNORED_NAMES = ['.ipynb_checkpoints', '__pycache__', '*.pyc']
+
+
+def reflink(src: str, dst: str) -> None:
+    """Creates `dst` as reflink of `src`.
+
+    Raises:
+        OSError: the reflink could not be created. Its `errno` is in
+            `_REFLINK_UNSUPPORTED_ERRORS` if reflinks are not supported.
+    """
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, 'Reflinks are not supported')
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+
+    shutil.copystat(src, dst)
+
+
+class Materializer:
+    """Materializes a directory, see the module docstring.
+
+    Args:
+        allow_hardlinks: Whether to hardlink files if reflinks are not
+            supported.
+        copy_paths: Paths, relative to the source directory, of files
+            that are always copied, i.e. never hardlinked.
+        ignored_paths: Paths, relative to the source directory, that
+            are not materialized.
+        ignored_names: Patterns of names of files and directories that
+            are not materialized.
+
+    Attributes:
+        stats: The number of files that were respectively reflinked,
+            hardlinked and copied.
+    """
+
+    def __init__(self,
+                 allow_hardlinks: bool = False,
+                 copy_paths: Iterable[str] = (),
+                 ignored_paths: Iterable[str] = IGNORED_PATHS,
+                 ignored_names: Iterable[str] = IGNORED_NAMES):
+        self.allow_hardlinks = allow_hardlinks
+        self.copy_paths = {os.path.normpath(path) for path in copy_paths}
+        self.ignored_paths = {os.path.normpath(path) for path in ignored_paths}
+        self.ignored_names = list(ignored_names)
+
+        self.stats = {'reflink': 0, 'hardlink': 0, 'copy': 0}
+
+        # Whether reflinks are supported, which is only known once the
+        # first reflink was attempted.
+        self._reflinks: Optional[bool] = None
+
+    def materialize(self, src: str, dst: str) -> Dict[str, int]:
+        """Materializes the directory `src` as `dst`.
+
+        Args:
+            src: The directory to materialize.
+            dst: The directory to create. Its parent has to exist.
+
+        Returns:
+            The `stats` of the materializer.
+        """
+        self._materialize_dir(src, dst, '')
+        return self.stats
+
+    def _is_ignored(self, name: str, rel_path: str) -> bool:
+        return (rel_path in self.ignored_paths
+                or any(fnmatch.fnmatch(name, pattern) for pattern in self.ignored_names))
+
+    def _materialize_dir(self, src: str, dst: str, rel_dir: str) -> None:
+        os.mkdir(dst)
+
+        with os.scandir(src) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if self._is_ignored(entry.name, rel_path):
+                    continue
+
+                dst_path = os.path.join(dst, entry.name)
+                if entry.is_symlink():
+                    os.symlink(os.readlink(entry.path), dst_path)
+                elif entry.is_dir():
+                    self._materialize_dir(entry.path, dst_path, rel_path)
+                else:
+                    self._materialize_file(entry.path, dst_path, rel_path)
+
+        shutil.copystat(src, dst)
+
+    def _materialize_file(self, src: str, dst: str, rel_path: str) -> None:
+        if self._reflinks is not False:
+            try:
+                reflink(src, dst)
+            except OSError as e:
+                if e.errno not in _REFLINK_UNSUPPORTED_ERRORS:
+                    raise
+                self._reflinks = False
+            else:
+                self._reflinks = True
+                self.stats['reflink'] += 1
+                return
+
+        if self.allow_hardlinks and rel_path not in self.copy_paths:
+            os.link(src, dst)
+            self.stats['hardlink'] += 1
+            return
+
+        shutil.copy2(src, dst)
+        self.stats['copy'] += 1
+
+
+def materialize_dir(src: str,
+                    dst: str,
+                    allow_hardlinks: bool = False,
+                    copy_paths: Iterable[str] = ()) -> Dict[str, int]:
+    """Materializes the directory `src` as `dst`.
+
+    See the module docstring and `Materializer` for the arguments.
+
+    Returns:
+        The number of files that were respectively reflinked, hardlinked
+        and copied.
+    """
+    return Materializer(allow_hardlinks, copy_paths).materialize(src, dst)
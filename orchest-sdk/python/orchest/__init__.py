@@ -9,4 +9,5 @@ from orchest.parameters import (
 from orchest.transfer import (
     get_inputs,
     output,
+    output_stream,
 )
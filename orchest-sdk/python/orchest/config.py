@@ -29,6 +29,16 @@ class Config:
     # socket to connect to the plasma store.
     STORE_SOCKET_NAME = '/tmp/orchest/plasma.sock'
 
+    # Minimum number of seconds between health checks of the client
+    # that is shared by all functions to connect to the plasma store.
+    STORE_HEALTH_CHECK_INTERVAL = 5
+
+    # Relative capacity of the store that is kept as margin when using
+    # the occupancy published by the memory-server, since it can lag
+    # behind. Only if an object does not fit within the margin the
+    # occupancy is computed exactly by listing all objects in the store.
+    STORE_OCCUPANCY_MARGIN = 0.1
+
     IDENTIFIER_SERIALIZATION = 1
     IDENTIFIER_EVICTION = 2
 
@@ -1,11 +1,11 @@
 """Module to interact with the parameters inside the ``pipeline.json``."""
+import copy
 import json
 from typing import Any, Dict
 
 from orchest.config import Config
 from orchest.errors import StepUUIDResolveError
-from orchest.pipeline import Pipeline
-from orchest.utils import get_step_uuid
+from orchest.utils import get_step_uuid, load_pipeline
 
 
 def get_params() -> Dict[str, Any]:
@@ -14,17 +14,17 @@ def get_params() -> Dict[str, Any]:
     Returns:
         The parameters of the current step.
     """
-    with open(Config.PIPELINE_DESCRIPTION_PATH, 'r') as f:
-        pipeline_description = json.load(f)
-
-    pipeline = Pipeline.from_json(pipeline_description)
+    pipeline = load_pipeline()
     try:
         step_uuid = get_step_uuid(pipeline)
     except StepUUIDResolveError:
         raise StepUUIDResolveError('Failed to determine from where to get data.')
 
     step = pipeline.get_step_by_uuid(step_uuid)
-    params = step.get_params()
+
+    # The pipeline is cached, thus modifications to the returned params
+    # should not end up in the pipeline.
+    params = copy.deepcopy(step.get_params())
 
     return params
 
@@ -46,10 +46,7 @@ def update_params(params: Dict[str, Any]) -> Dict[str, Any]:
         The updated parameters mapping.
 
     """
-    with open(Config.PIPELINE_DESCRIPTION_PATH, 'r') as f:
-        pipeline_description = json.load(f)
-
-    pipeline = Pipeline.from_json(pipeline_description)
+    pipeline = load_pipeline()
     try:
         step_uuid = get_step_uuid(pipeline)
     except StepUUIDResolveError:
@@ -66,4 +63,6 @@ def update_params(params: Dict[str, Any]) -> Dict[str, Any]:
     with open(Config.PIPELINE_DESCRIPTION_PATH, 'w') as f:
         json.dump(pipeline.to_dict(), f)
 
-    return curr_params
+    # The pipeline is cached, thus modifications to the returned params
+    # should not end up in the pipeline.
+    return copy.deepcopy(curr_params)
@@ -38,6 +38,8 @@ class PipelineStep:
         parents: see ``Args`` section.
     """
 
+    __slots__ = ['properties', 'parents', 'children']
+
     def __init__(self,
                  properties: PipelineStepProperties,
                  parents: Optional[List['PipelineStep']] = None) -> None:
@@ -71,6 +73,15 @@ class Pipeline:
         self.steps = steps
         self.properties = properties
 
+        # Indexes to look up steps in constant time. In case multiple
+        # steps have the same file path, the first step is indexed.
+        self._steps_by_uuid = {step.properties['uuid']: step for step in steps}
+        self._steps_by_file_path: Dict[str, PipelineStep] = {}
+        for step in steps:
+            file_path = step.properties.get('file_path')
+            if file_path is not None:
+                self._steps_by_file_path.setdefault(file_path, step)
+
     @classmethod
     def from_json(cls, description: PipelineDescription) -> 'Pipeline':
         """Constructs a pipeline from a json description.
@@ -112,11 +123,13 @@ class Pipeline:
                          uuid: str,
                          default: Any = None) -> Optional[PipelineStep]:
         """Get pipeline step object by its UUID."""
-        for step in self.steps:
-            if step.properties['uuid'] == uuid:
-                return step
+        return self._steps_by_uuid.get(uuid, default)
 
-        return default
+    def get_step_by_file_path(self,
+                              file_path: str,
+                              default: Any = None) -> Optional[PipelineStep]:
+        """Get pipeline step object by its file path."""
+        return self._steps_by_file_path.get(file_path, default)
 
     def __repr__(self) -> str:
         return f'Pipeline({self.steps!r})'
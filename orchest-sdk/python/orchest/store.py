@@ -0,0 +1,306 @@
+"""Connection management for the in-memory object store.
+
+All functions in :mod:`orchest.transfer` share a single, lazily created
+client to the plasma store per process. This way steps that output and
+retrieve many objects do not pay for setting up a connection every
+single time.
+
+Additionally, the memory-server publishes the occupancy of the store
+through an :class:`OccupancyCounter`, such that it does not have to be
+computed by listing all objects in the store.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pyarrow.plasma as plasma
+
+from orchest.config import Config
+from orchest.errors import OrchestNetworkError
+
+
+def _get_socket_id(socket_name: str) -> Optional[Tuple[int, int]]:
+    """Returns the device and inode of the socket, None if it is gone."""
+    try:
+        stat = os.stat(socket_name)
+    except OSError:
+        return None
+
+    return stat.st_dev, stat.st_ino
+
+
+class StoreClientManager:
+    """Manages a reusable connection to the plasma store.
+
+    The client is only created once it is requested for the first time
+    and is then reused for consecutive requests. A new client is created
+    if:
+
+    * The process was forked. A client cannot be shared between
+      processes, since they would share the same socket.
+    * The ``Config.STORE_SOCKET_NAME`` has changed, or now refers to a
+      different socket, i.e. the store was restarted on the same path.
+    * The client failed its health check, e.g. because the store died
+      and was restarted.
+
+    Attributes:
+        health_check_interval: Minimum number of seconds between two
+            consecutive health checks of the client.
+    """
+
+    def __init__(self, health_check_interval: Optional[float] = None) -> None:
+        if health_check_interval is None:
+            health_check_interval = Config.STORE_HEALTH_CHECK_INTERVAL
+        self.health_check_interval = health_check_interval
+
+        self._client: Optional[plasma.PlasmaClient] = None
+        self._pid: Optional[int] = None
+        self._socket_name: Optional[str] = None
+        self._socket_id: Optional[Tuple[int, int]] = None
+        self._last_health_check = 0.0
+        self._lock = threading.Lock()
+
+    def get_client(self, num_retries: int = -1) -> plasma.PlasmaClient:
+        """Gets a client connected to the ``Config.STORE_SOCKET_NAME``.
+
+        Args:
+            num_retries: Number of times to try to connect to the store,
+                in case no connection exists yet. Passed to
+                ``plasma.connect``.
+
+        Returns:
+            A connected PlasmaClient.
+
+        Raises:
+            OrchestNetworkError: Could not connect to the
+                ``Config.STORE_SOCKET_NAME``, because it does not exist.
+                Which might be because the specified value was wrong or
+                the store died.
+        """
+        with self._lock:
+            if self._client is not None and not self._is_reusable():
+                self._reset()
+
+            if self._client is None:
+                try:
+                    client = plasma.connect(Config.STORE_SOCKET_NAME,
+                                            num_retries=num_retries)
+                except OSError:
+                    raise OrchestNetworkError(
+                        'Failed to connect to in-memory object store.'
+                    )
+
+                self._client = client
+                self._pid = os.getpid()
+                self._socket_name = Config.STORE_SOCKET_NAME
+                self._socket_id = _get_socket_id(Config.STORE_SOCKET_NAME)
+                self._last_health_check = time.monotonic()
+
+            return self._client
+
+    def is_healthy(self) -> bool:
+        """Checks whether the client can still talk to the store."""
+        if self._client is None:
+            return False
+
+        try:
+            self._client.store_capacity()
+        except OSError:
+            return False
+
+        return True
+
+    def close(self) -> None:
+        """Disconnects the client from the store.
+
+        A consecutive call to :meth:`get_client` will connect again.
+
+        Warning:
+            Data retrieved with ``zero_copy=True`` references memory
+            inside the store through the client and should no longer be
+            used after closing the connection.
+        """
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                try:
+                    self._client.disconnect()
+                except OSError:
+                    # The store might have died already.
+                    pass
+
+            self._reset()
+
+    def _is_reusable(self) -> bool:
+        if self._pid != os.getpid():
+            return False
+
+        if self._socket_name != Config.STORE_SOCKET_NAME:
+            return False
+
+        # A restarted store creates a new socket at the same path, to
+        # which the client is not connected.
+        if self._socket_id != _get_socket_id(self._socket_name):
+            return False
+
+        now = time.monotonic()
+        if now - self._last_health_check >= self.health_check_interval:
+            self._last_health_check = now
+            return self.is_healthy()
+
+        return True
+
+    def _after_fork(self) -> None:
+        # The lock could have been held by another thread of the parent
+        # at the time of forking.
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # NOTE: the client of a parent process is intentionally not
+        # disconnected, since the socket is shared with the parent.
+        self._client = None
+        self._pid = None
+        self._socket_name = None
+        self._socket_id = None
+
+
+class OccupancyCounter:
+    """Shared-memory counter of the number of bytes occupied in the store.
+
+    The counter is a memory-mapped file that is written by the
+    memory-server and read by the SDK. Reads and writes are guarded by a
+    sequence number, which is odd while a write is in progress, such
+    that a reader never observes a partially written value.
+
+    Args:
+        path: Path to the file backing the counter.
+        writable: Whether the counter is opened to be written to. If
+            True, then the file is created if it does not yet exist.
+
+    Raises:
+        FileNotFoundError: If the counter is opened to be read and the
+            file does not exist.
+    """
+
+    _FORMAT = '<QQ'
+    _SIZE = struct.calcsize(_FORMAT)
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path = path
+        self.writable = writable
+
+        if writable:
+            # The file is reused instead of replaced, such that readers
+            # that mapped it before a restart of the memory-server keep
+            # seeing its writes.
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            os.ftruncate(fd, self._SIZE)
+            access = mmap.ACCESS_WRITE
+        else:
+            fd = os.open(path, os.O_RDONLY)
+            access = mmap.ACCESS_READ
+
+        try:
+            self._mmap = mmap.mmap(fd, self._SIZE, access=access)
+        finally:
+            # The mapping stays valid after closing the file descriptor.
+            os.close(fd)
+
+        self._sequence = 0
+        if writable:
+            self.write(0)
+
+    def write(self, occupied: int) -> None:
+        """Publishes the number of bytes occupied in the store."""
+        self._sequence += 1
+        struct.pack_into('<Q', self._mmap, 0, self._sequence)
+        struct.pack_into('<Q', self._mmap, 8, occupied)
+
+        self._sequence += 1
+        struct.pack_into('<Q', self._mmap, 0, self._sequence)
+
+    def read(self, max_tries: int = 100) -> Optional[int]:
+        """Reads the number of bytes occupied in the store.
+
+        Returns:
+            None if no consistent value could be read within `max_tries`
+            attempts, because the counter was written to concurrently.
+        """
+        for _ in range(max_tries):
+            sequence, occupied = struct.unpack_from(self._FORMAT, self._mmap)
+            if sequence % 2 == 0 and struct.unpack_from('<Q', self._mmap)[0] == sequence:
+                return occupied
+
+        return None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def get_occupancy_path(store_socket_name: str) -> str:
+    """Returns the path of the occupancy counter of a store."""
+    return f'{store_socket_name}.occupancy'
+
+
+_occupancy_counters: Dict[str, OccupancyCounter] = {}
+
+
+def get_occupancy() -> Optional[int]:
+    """Gets the occupancy of the store as published by the memory-server.
+
+    The published occupancy can lag behind the actual occupancy of the
+    store, since it is updated by the memory-server asynchronously.
+
+    Returns:
+        The number of bytes occupied in the store at
+        ``Config.STORE_SOCKET_NAME``. None if the occupancy is not
+        published, e.g. because the store was not started by the
+        memory-server.
+    """
+    path = get_occupancy_path(Config.STORE_SOCKET_NAME)
+
+    counter = _occupancy_counters.get(path)
+    if counter is None:
+        try:
+            counter = OccupancyCounter(path)
+        except (FileNotFoundError, ValueError):
+            # A ValueError is raised in case the file is (still) empty.
+            return None
+
+        _occupancy_counters[path] = counter
+
+    return counter.read()
+
+
+_client_manager = StoreClientManager()
+
+# Python 3.7+ on POSIX only. Otherwise forks are still detected through
+# the PID by the manager itself.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_client_manager._after_fork)
+
+
+def get_client(num_retries: int = -1) -> plasma.PlasmaClient:
+    """Gets the process-wide client to the in-memory object store.
+
+    See :meth:`StoreClientManager.get_client`.
+    """
+    return _client_manager.get_client(num_retries=num_retries)
+
+
+def close() -> None:
+    """Closes the process-wide client to the in-memory object store.
+
+    Also closes the occupancy counters that were opened by
+    :func:`get_occupancy`, which are opened again when needed.
+
+    See :meth:`StoreClientManager.close`.
+    """
+    _client_manager.close()
+
+    for counter in _occupancy_counters.values():
+        counter.close()
+    _occupancy_counters.clear()
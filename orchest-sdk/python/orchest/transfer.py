@@ -1,13 +1,24 @@
 """Transfer mechanisms to output data and get data."""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import json
+import inspect
 import os
-import pickle
-from typing import Any, Dict, List, Optional, Tuple
+import struct
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pyarrow as pa
 import pyarrow.plasma as plasma
 
+# Pickle protocol 5 (with out-of-band buffers) was added in Python 3.8,
+# older versions use its backport such that every version can read the
+# outputs of every other version.
+if sys.version_info < (3, 8):
+    import pickle5 as pickle
+else:
+    import pickle
+
+from orchest import store
 from orchest.config import Config
 from orchest.errors import (
     DiskOutputNotFoundError,
@@ -17,8 +28,7 @@ from orchest.errors import (
     OrchestNetworkError,
     StepUUIDResolveError
 )
-from orchest.pipeline import Pipeline
-from orchest.utils import get_step_uuid
+from orchest.utils import get_step_uuid, load_pipeline
 
 
 # First line of the docstring is for sphinx-autodoc. Otherwise the third
@@ -41,8 +51,9 @@ def serialize(
 
     Returns:
         Tuple of the serialized data and the serialization that was
-        used, where ``'arrowpickle'`` stands for that the data was first
-        pickled and then serialized using ``pyarrow``.
+        used. In case of the ``pickle`` fallback, the serialization is
+        ``'pickle5'`` which stands for that the data was pickled using
+        protocol 5 with out-of-band buffers, see :class:`Pickle5Object`.
 
     Raises:
         pa.SerializationCallbackError: If ``pa.serialize`` cannot
@@ -61,44 +72,272 @@ def serialize(
         serialized = pa.serialize(data)
 
     except pa.SerializationCallbackError as e:
-        # TODO: this is very inefficient. We decided to pickle the
-        #       object if pyarrow can not serialize it for us. However,
-        #       there might very well be a better way to write the
-        #       pickled object to the buffer instead of serializing the
-        #       pickled object again so that we get a SerializedPyObject
-        #       (on which we can call certain methods).
-        if pickle_fallback:
-            serialized = pa.serialize(pickle.dumps(data))
-            serialization = 'arrowpickle'
-        else:
+        if not pickle_fallback:
             raise pa.SerializationCallbackError(e)
 
+        serialized = Pickle5Object(data)
+        serialization = 'pickle5'
+
     else:
         serialization = 'arrow'
 
     return serialized, serialization
 
 
-def _output_to_disk(obj: pa.SerializedPyObject,
+class Pickle5Object:
+    """Data serialized using pickle protocol 5 with out-of-band buffers.
+
+    Large contiguous buffers inside the data, e.g. those of NumPy
+    arrays, are not copied into the pickle. Instead, they are written
+    directly from the original data to the plasma buffer or file when
+    calling :meth:`write_to`. Supports the subset of the interface of
+    ``pa.SerializedPyObject`` that is used to output data.
+
+    The serialized object is laid out as follows (all integers are
+    little-endian uint64):
+
+    * The number of out-of-band buffers ``n``.
+    * The size of the pickle followed by the sizes of the ``n`` buffers.
+    * The pickle.
+    * The ``n`` buffers, where every buffer starts at an offset aligned
+      to 64 bytes.
+
+    Args:
+        data: The object/data to be serialized.
+
+    Attributes:
+        total_bytes: The size of the serialized object.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, data: Any) -> None:
+        buffers = []
+        self._pickle = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+        self._buffers = [buffer.raw() for buffer in buffers]
+
+        sizes = [len(self._pickle)] + [buffer.nbytes for buffer in self._buffers]
+        self._header = struct.pack(f'<{len(sizes) + 1}Q', len(self._buffers), *sizes)
+
+        position = len(self._header) + len(self._pickle)
+        for buffer in self._buffers:
+            position = self._align(position) + buffer.nbytes
+
+        self.total_bytes = position
+
+    def write_to(self, sink: pa.NativeFile) -> None:
+        """Writes the serialized object to the given sink."""
+        sink.write(self._header)
+        sink.write(self._pickle)
+
+        position = len(self._header) + len(self._pickle)
+        for buffer in self._buffers:
+            padding = self._align(position) - position
+            sink.write(bytes(padding))
+            sink.write(buffer)
+            position += padding + buffer.nbytes
+
+    def to_buffer(self) -> pa.Buffer:
+        """Writes the serialized object to a new buffer."""
+        sink = pa.BufferOutputStream()
+        self.write_to(sink)
+        return sink.getvalue()
+
+    @classmethod
+    def deserialize(cls, buffer: Any) -> Any:
+        """Deserializes an object that was written by :meth:`write_to`.
+
+        Args:
+            buffer: Any object supporting the buffer protocol, e.g. a
+                ``pa.Buffer``. The out-of-band buffers of the returned
+                data reference the memory of the `buffer` instead of
+                copying it. Thus, e.g., NumPy arrays are read-only if
+                the `buffer` is read-only.
+
+        Returns:
+            The deserialized data.
+        """
+        view = memoryview(buffer)
+
+        num_buffers, = struct.unpack_from('<Q', view)
+        sizes = struct.unpack_from(f'<{num_buffers + 1}Q', view, offset=8)
+
+        position = 8 * (num_buffers + 2)
+        pickled = view[position:position + sizes[0]]
+        position += sizes[0]
+
+        buffers = []
+        for size in sizes[1:]:
+            position = cls._align(position)
+            buffers.append(view[position:position + size])
+            position += size
+
+        return pickle.loads(pickled, buffers=buffers)
+
+    @classmethod
+    def _align(cls, position: int) -> int:
+        return -(-position // cls.ALIGNMENT) * cls.ALIGNMENT
+
+
+def _to_table(data: Any) -> Tuple[Optional[pa.Table], Optional[str]]:
+    """Converts tabular data to an Arrow Table.
+
+    Args:
+        data: The data to convert.
+
+    Returns:
+        Tuple of the table and its serialization, where ``'arrowtable'``
+        stands for an Arrow Table and ``'arrowpandas'`` for a pandas
+        DataFrame that was converted to an Arrow Table. ``(None, None)``
+        if the data is not tabular or cannot be converted.
+    """
+    if isinstance(data, pa.Table):
+        return data, 'arrowtable'
+
+    # If pandas has not been imported, then the data cannot be a
+    # DataFrame. This way pandas is not a required dependency.
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(data, pd.DataFrame):
+        try:
+            return pa.Table.from_pandas(data), 'arrowpandas'
+        except (pa.ArrowException, TypeError, ValueError):
+            # E.g. columns with mixed types or custom objects. These
+            # are serialized instead.
+            pass
+
+    return None, None
+
+
+def _select_columns(data: Any, columns: List[str]) -> Any:
+    """Selects the given columns from a table or DataFrame.
+
+    Any other data is returned as is.
+    """
+    if not isinstance(data, pa.Table):
+        pd = sys.modules.get('pandas')
+        if pd is not None and isinstance(data, pd.DataFrame):
+            return data[columns]
+
+        return data
+
+    # The index of a DataFrame is stored in columns as well, which are
+    # needed to reconstruct the DataFrame.
+    pandas_metadata = data.schema.pandas_metadata or {}
+    columns = columns + [
+        name for name in pandas_metadata.get('index_columns', [])
+        if isinstance(name, str) and name not in columns
+    ]
+
+    return pa.Table.from_arrays(
+        [data.column(name) for name in columns],
+        schema=pa.schema([data.schema.field(name) for name in columns],
+                         metadata=data.schema.metadata)
+    )
+
+
+def _check_compression(compression: Optional[str]) -> Optional[str]:
+    """Validates the compression codec.
+
+    Returns:
+        The codec to use, where ``None`` means no compression.
+
+    Raises:
+        ValueError: If the specified `compression` is not supported.
+    """
+    if compression is None or compression == 'none':
+        return None
+
+    if compression not in ['lz4', 'zstd']:
+        raise ValueError(
+            f'Compression "{compression}" is not supported. Supported '
+            "values are: ['none', 'lz4', 'zstd']."
+        )
+
+    return compression
+
+
+def _get_data_path(full_path: str,
+                   serialization: str,
+                   compression: Optional[str] = None) -> str:
+    """Returns the path of the data file of an output to disk."""
+    path = f'{full_path}.{serialization}'
+    if compression is not None:
+        path = f'{path}.{compression}'
+
+    return path
+
+
+def _write_serialized(obj: Any, sink: pa.NativeFile, serialization: str) -> None:
+    """Writes a serialized object, see :meth:`_output_to_disk`."""
+    if serialization in ['arrow', 'arrowpickle', 'pickle5']:
+        obj.write_to(sink)
+
+    elif serialization in ['arrowtable', 'arrowpandas']:
+        # Written in the Arrow IPC file format (also known as Feather
+        # V2), so that it can be memory-mapped when reading.
+        writer = pa.RecordBatchFileWriter(sink, obj.schema)
+        writer.write_table(obj)
+        writer.close()
+
+    else:
+        raise ValueError("Function not defined for specified 'serialization'")
+
+
+def _output_to_disk(obj: Any,
                     full_path: str,
-                    serialization: str = 'arrow') -> None:
+                    serialization: str = 'arrow',
+                    compression: Optional[str] = None,
+                    compression_level: Optional[int] = None) -> None:
     """Outputs a serialized object to disk to the specified path.
 
     Args:
-        obj: Object to output to disk.
+        obj: Object to output to disk. Either a serialized object or an
+            Arrow Table, see :meth:`_to_table`.
         full_path: Full path to save the data to.
         serialization: Serialization of the `obj`. Currently supported
-            values are: ``['arrow', 'arrowpickle']``.
+            values are: ``['arrow', 'arrowpickle', 'pickle5',
+            'arrowtable', 'arrowpandas']``.
+        compression: Codec to compress the data with. Currently
+            supported values are: ``[None, 'lz4', 'zstd']``.
+        compression_level: Compression level passed to the codec. If
+            ``None``, then the default level of the codec is used.
 
     Raises:
-        ValueError: If the specified `type` is not one of ``['pickle']``
+        ValueError: If the specified `serialization` or `compression` is
+            not supported.
     """
-    if serialization in ['arrow', 'arrowpickle']:
-        with open(f'{full_path}.{serialization}', 'wb') as f:
-            obj.write_to(f)
+    if serialization not in ['arrow', 'arrowpickle', 'pickle5', 'arrowtable',
+                             'arrowpandas']:
+        raise ValueError("Function not defined for specified 'serialization'")
+
+    path = _get_data_path(full_path, serialization, compression)
+
+    if compression is None:
+        with pa.OSFile(path, 'wb') as f:
+            _write_serialized(obj, f, serialization)
+
+    elif compression_level is None:
+        # The data is compressed while it is being written, thus no
+        # (compressed) copy of the data is ever held in memory.
+        with pa.output_stream(path, compression=compression) as f:
+            _write_serialized(obj, f, serialization)
 
     else:
-        raise ValueError("Function not defined for specified 'serialization'")
+        # Compressed streams do not support setting a level, thus the
+        # data is compressed as a whole instead. Both result in a single
+        # frame of the codec.
+        sink = pa.BufferOutputStream()
+        _write_serialized(obj, sink, serialization)
+
+        try:
+            codec = pa.Codec(compression, compression_level=compression_level)
+        except TypeError:
+            raise ValueError('Setting a compression level requires pyarrow>=1.0.')
+
+        compressed = codec.compress(sink.getvalue(), asbytes=False)
+
+        with pa.OSFile(path, 'wb') as f:
+            f.write(compressed)
 
     return
 
@@ -110,7 +349,9 @@ def _output_to_disk(obj: pa.SerializedPyObject,
 #       serialized it before using the _serialize method.
 def output_to_disk(data: Any,
                    pickle_fallback: bool = True,
-                   serialization: Optional[str] = None) -> None:
+                   serialization: Optional[str] = None,
+                   compression: Optional[str] = None,
+                   compression_level: Optional[int] = None) -> None:
     """Outputs data to disk.
 
     To manage outputing the data to disk, this function has a side
@@ -118,7 +359,8 @@ def output_to_disk(data: Any,
 
     * Writes to a HEAD file alongside the actual data file. This file
       serves as a protocol that returns the timestamp of the latest
-      write to disk via this function alongside the used serialization.
+      write to disk via this function alongside the used serialization
+      and compression.
 
     Args:
         data: Data to output to disk.
@@ -128,26 +370,48 @@ def output_to_disk(data: Any,
             types.
         serialization: Serialization of the `data` in case it is already
             serialized. Currently supported values are:
-            ``['arrow', 'arrowpickle']``.
+            ``['arrow', 'arrowpickle', 'pickle5', 'arrowtable',
+            'arrowpandas']``.
+        compression: Codec to compress the data with before writing it
+            to disk. Currently supported values are: ``['none', 'lz4',
+            'zstd']``, where ``None`` is the same as ``'none'``.
+            Compression trades CPU time for less I/O, which pays off
+            when disk is slow compared to the codec. ``'lz4'`` is the
+            faster codec, whereas ``'zstd'`` compresses better.
+        compression_level: Compression level of the codec. If ``None``,
+            then the default level of the codec is used. Requires
+            ``pyarrow>=1.0``.
 
     Raises:
         StepUUIDResolveError: The step's UUID cannot be resolved and
             thus it cannot determine where to output data to.
+        ValueError: If the specified `compression` is not supported.
 
     Example:
         >>> data = 'Data I would like to use in my next step'
         >>> output_to_disk(data)
 
+        Tabular data, i.e. pandas DataFrames and Arrow Tables, is
+        written in a columnar format. Receiving steps memory-map the
+        data and can read a subset of its columns:
+
+        >>> output_to_disk(df)
+        >>> # In the receiving step.
+        >>> df, = get_inputs(columns={'step-1': ['a', 'b']})
+
+        Receiving steps decompress the data transparently:
+
+        >>> output_to_disk(data, compression='zstd', compression_level=3)
+
     Note:
         Calling :meth:`output_to_disk` multiple times within the same script
         will overwrite the output. Generally speaking you therefore want
         to be only calling the function once.
 
     """
-    with open(Config.PIPELINE_DESCRIPTION_PATH, 'r') as f:
-        pipeline_description = json.load(f)
+    compression = _check_compression(compression)
 
-    pipeline = Pipeline.from_json(pipeline_description)
+    pipeline = load_pipeline()
 
     try:
         step_uuid = get_step_uuid(pipeline)
@@ -155,30 +419,152 @@ def output_to_disk(data: Any,
         raise StepUUIDResolveError('Failed to determine where to output data to.')
 
     # In case the data is not already serialized, then we need to
-    # serialize it.
+    # serialize it. Tabular data is written as a table instead.
     if serialization is None:
-        data, serialization = serialize(data, pickle_fallback=pickle_fallback)
+        table, serialization = _to_table(data)
+
+        if table is not None:
+            data = table
+        else:
+            data, serialization = serialize(data, pickle_fallback=pickle_fallback)
 
     # Recursively create any directories if they do not already exists.
     step_data_dir = Config.get_step_data_dir(step_uuid)
     os.makedirs(step_data_dir, exist_ok=True)
 
-    # The HEAD file serves to resolve the transfer method.
+    _write_head(step_data_dir, serialization, compression=compression)
+
+    # Full path to write the actual data to.
+    full_path = os.path.join(step_data_dir, step_uuid)
+
+    return _output_to_disk(data,
+                           full_path,
+                           serialization=serialization,
+                           compression=compression,
+                           compression_level=compression_level)
+
+
+def _write_head(step_data_dir: str,
+                serialization: str,
+                compression: Optional[str] = None,
+                timestamp: Optional[datetime] = None) -> None:
+    """Writes the HEAD file, which serves to resolve the transfer method.
+
+    It contains the timestamp of the latest write to disk alongside the
+    used serialization and, if the data is compressed, the codec. The
+    timestamp defaults to the current time.
+    """
+    if timestamp is None:
+        timestamp = datetime.utcnow()
+
     head_file = os.path.join(step_data_dir, 'HEAD')
     with open(head_file, 'w') as f:
-        current_time = datetime.utcnow()
-        f.write(f'{current_time.isoformat(timespec="seconds")}, {serialization}')
+        head = f'{timestamp.isoformat(timespec="seconds")}, {serialization}'
+
+        # Uncompressed outputs keep the original format of the file.
+        if compression is not None:
+            head = f'{head}, {compression}'
+
+        f.write(head)
+
+
+def spill_to_disk(step_uuid: str,
+                  buffer: pa.Buffer,
+                  serialization: str,
+                  timestamp: datetime) -> None:
+    """Writes an output of a step that was passed through memory to disk.
+
+    Used by the memory-server to move outputs out of the in-memory store.
+    The output keeps the timestamp of its write to memory, such that
+    :meth:`resolve` keeps resolving to the same output once it has been
+    removed from memory.
+
+    Args:
+        step_uuid: The UUID of the step that outputted the data.
+        buffer: The buffer of the object inside the store.
+        serialization: The serialization of the object. Currently
+            supported values are: ``['arrow', 'arrowpickle', 'pickle5']``,
+            for which the object inside the store is byte for byte the
+            same as the file written by :meth:`output_to_disk`.
+        timestamp: The time at which the object was written to memory.
+
+    Raises:
+        ValueError: If the specified `serialization` is not supported.
+    """
+    if serialization not in ['arrow', 'arrowpickle', 'pickle5']:
+        raise ValueError("Function not defined for specified 'serialization'")
+
+    step_data_dir = Config.get_step_data_dir(step_uuid)
+    os.makedirs(step_data_dir, exist_ok=True)
 
-    # Full path to write the actual data to.
     full_path = os.path.join(step_data_dir, step_uuid)
+    with pa.OSFile(_get_data_path(full_path, serialization), 'wb') as f:
+        f.write(buffer)
 
-    return _output_to_disk(data, full_path, serialization=serialization)
+    # The HEAD is written last, such that it never resolves to partially
+    # written data.
+    _write_head(step_data_dir, serialization, timestamp=timestamp)
 
 
-def _get_output_disk(full_path: str, serialization: str = 'arrow') -> Any:
+def _get_output_disk(full_path: str,
+                     serialization: str = 'arrow',
+                     columns: Optional[List[str]] = None,
+                     compression: Optional[str] = None) -> Any:
     """Gets data from disk."""
-    with open(f'{full_path}.{serialization}', 'rb') as f:
-        data = pa.deserialize_from(f, base=None)
+    if serialization == 'arrowstream':
+        # Make sure the file exists now instead of once the stream is
+        # being consumed.
+        stream_path = f'{full_path}.{serialization}'
+        if not os.path.isfile(stream_path):
+            raise FileNotFoundError(stream_path)
+
+        return _read_stream_disk(stream_path)
+
+    path = _get_data_path(full_path, serialization, compression)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+
+    # Compressed data is decompressed into memory as a whole, the data
+    # is then deserialized from the decompressed buffer without copying.
+    buffer = None
+    if compression is not None:
+        with pa.input_stream(path, compression=compression) as f:
+            buffer = f.read_buffer()
+
+    if serialization in ['arrowtable', 'arrowpandas']:
+        if buffer is None:
+            # The table references the memory-mapped file instead of
+            # reading it. Thus only the columns that are actually used
+            # are ever read from disk.
+            source = pa.memory_map(path)
+        else:
+            source = pa.BufferReader(buffer)
+
+        data = pa.ipc.open_file(source).read_all()
+
+        if columns is not None:
+            data = _select_columns(data, columns)
+
+        if serialization == 'arrowpandas':
+            return data.to_pandas()
+
+        return data
+
+    if serialization == 'pickle5':
+        if buffer is None:
+            # Read into a mutable buffer, such that the out-of-band
+            # buffers (e.g. of NumPy arrays) are writeable.
+            with open(path, 'rb') as f:
+                buffer = bytearray(os.fstat(f.fileno()).st_size)
+                f.readinto(buffer)
+
+        return Pickle5Object.deserialize(buffer)
+
+    if buffer is None:
+        with open(path, 'rb') as f:
+            data = pa.deserialize_from(f, base=None)
+    else:
+        data = pa.deserialize(buffer)
 
     if serialization == 'arrowpickle':
         return pickle.loads(data)
@@ -186,13 +572,21 @@ def _get_output_disk(full_path: str, serialization: str = 'arrow') -> Any:
     return data
 
 
-def get_output_disk(step_uuid: str, serialization: str = 'arrow') -> Any:
+def get_output_disk(step_uuid: str,
+                    serialization: str = 'arrow',
+                    columns: Optional[List[str]] = None,
+                    compression: Optional[str] = None) -> Any:
     """Gets data from disk.
 
     Args:
         step_uuid: The UUID of the step to get output data from.
         serialization: The serialization of the output. Has to be
             specified in order to deserialize correctly.
+        columns: The columns to read in case the output is tabular, i.e.
+            a pandas DataFrame or Arrow Table. If ``None``, then all
+            columns are read. Ignored for non-tabular outputs.
+        compression: The codec the output was compressed with, if any.
+            Has to be specified in order to decompress correctly.
 
     Returns:
         Data from the step identified by `step_uuid`.
@@ -204,7 +598,10 @@ def get_output_disk(step_uuid: str, serialization: str = 'arrow') -> Any:
     full_path = os.path.join(step_data_dir, step_uuid)
 
     try:
-        return _get_output_disk(full_path, serialization=serialization)
+        return _get_output_disk(full_path,
+                                serialization=serialization,
+                                columns=columns,
+                                compression=compression)
     except FileNotFoundError:
         # TODO: Ideally we want to provide the user with the step's
         #       name instead of UUID.
@@ -238,7 +635,7 @@ def resolve_disk(step_uuid: str) -> Dict[str, Any]:
 
     try:
         with open(head_file, 'r') as f:
-            timestamp, serialization = f.read().split(', ')
+            timestamp, serialization, *compression = f.read().split(', ')
 
     except FileNotFoundError:
         # TODO: Ideally we want to provide the user with the step's
@@ -253,7 +650,9 @@ def resolve_disk(step_uuid: str) -> Dict[str, Any]:
         'method_to_call': get_output_disk,
         'method_args': (step_uuid,),
         'method_kwargs': {
-            'serialization': serialization
+            'serialization': serialization,
+            # HEAD files of uncompressed outputs do not list a codec.
+            'compression': compression[0] if compression else None,
         }
     }
     return res
@@ -290,13 +689,21 @@ def _output_to_memory(obj: pa.SerializedPyObject,
     # over what objects get evicted.
     total_size = obj.total_bytes + len(metadata)
 
-    occupied_size = sum(
-        obj['data_size'] + obj['metadata_size']
-        for obj in client.list().values()
-    )
     # Take a percentage of the maximum capacity such that the message
     # for object eviction always fits inside the store.
-    store_capacity = Config.MAX_RELATIVE_STORE_CAPACITY * client.store_capacity()
+    capacity = client.store_capacity()
+    store_capacity = Config.MAX_RELATIVE_STORE_CAPACITY * capacity
+
+    # Use the occupancy that is published by the memory-server if the
+    # object clearly fits, otherwise fall back to listing all objects.
+    occupied_size = store.get_occupancy()
+    margin = Config.STORE_OCCUPANCY_MARGIN * capacity
+    if occupied_size is None or occupied_size + total_size > store_capacity - margin:
+        occupied_size = sum(
+            obj['data_size'] + obj['metadata_size']
+            for obj in client.list().values()
+        )
+
     available_size = store_capacity - occupied_size
 
     if total_size > available_size:
@@ -327,7 +734,9 @@ def _output_to_memory(obj: pa.SerializedPyObject,
 
 def output_to_memory(data: Any,
                      pickle_fallback: bool = True,
-                     disk_fallback: bool = True) -> None:
+                     disk_fallback: bool = True,
+                     compression: Optional[str] = None,
+                     compression_level: Optional[int] = None) -> None:
     """Outputs data to memory.
 
     To manage outputing the data to memory for the user, this function
@@ -342,6 +751,10 @@ def output_to_memory(data: Any,
         disk_fallback: If True, then outputing to disk is used when the
             `data` does not fit in memory. If False, then a
             :exc:`MemoryError` is thrown.
+        compression: Codec to compress the data with, in case it falls
+            back to disk. Passed to :meth:`output_to_disk`.
+        compression_level: Compression level of the codec, in case it
+            falls back to disk. Passed to :meth:`output_to_disk`.
 
     Raises:
         MemoryError: If the `data` does not fit in memory and
@@ -364,12 +777,12 @@ def output_to_memory(data: Any,
         therefore want to be only calling the function once.
 
     """
+    # Fail early instead of once falling back to disk.
+    compression = _check_compression(compression)
+
     # TODO: we might want to wrap this so we can throw a custom error,
     #       if the file cannot be found, i.e. FileNotFoundError.
-    with open(Config.PIPELINE_DESCRIPTION_PATH, 'r') as f:
-        pipeline_description = json.load(f)
-
-    pipeline = Pipeline.from_json(pipeline_description)
+    pipeline = load_pipeline()
 
     try:
         step_uuid = get_step_uuid(pipeline)
@@ -379,26 +792,17 @@ def output_to_memory(data: Any,
     # Serialize the object and collect the serialization metadata.
     obj, serialization = serialize(data, pickle_fallback=pickle_fallback)
 
-    # TODO: Get the store socket name from the Config. And pass it to
-    #       _output_to_memory which will then connect to it. Although better
-    #       if it connects more high level since otherwise if you want
-    #       to use low-level the code will connect everytime instead of
-    #       being able to reuse the same client. But still good idea to
-    #       get it from the config in this function. Maybe set the kwarg
-    #       to None default, so that if it is None then use config and
-    #       otherwise the given value.
     try:
-        client = plasma.connect(Config.STORE_SOCKET_NAME)
-    except OSError:
+        client = store.get_client()
+    except OrchestNetworkError:
         if not disk_fallback:
-            raise OrchestNetworkError('Failed to connect to in-memory object store.')
+            raise
 
-        # TODO: note that metadata is lost when falling back to disk.
-        #       Therefore we will only support metadata added by the
-        #       user, once disk also supports passing metadata.
-        return output_to_disk(
-            obj,
-            serialization=serialization)
+        return _output_to_disk_fallback(data,
+                                        obj,
+                                        serialization,
+                                        compression=compression,
+                                        compression_level=compression_level)
 
     # Try to output to memory.
     obj_id = _convert_uuid_to_object_id(step_uuid)
@@ -411,24 +815,123 @@ def output_to_memory(data: Any,
         if not disk_fallback:
             raise MemoryError('Data does not fit in memory.')
 
-        # TODO: note that metadata is lost when falling back to disk.
-        #       Therefore we will only support metadata added by the
-        #       user, once disk also supports passing metadata.
-        return output_to_disk(
-            obj,
-            serialization=serialization)
+        return _output_to_disk_fallback(data,
+                                        obj,
+                                        serialization,
+                                        compression=compression,
+                                        compression_level=compression_level)
 
     return
 
 
+def _get_outputs_memory(
+    obj_ids: List[plasma.ObjectID],
+    client: plasma.PlasmaClient,
+    zero_copy: bool = False
+) -> Dict[plasma.ObjectID, Any]:
+    """Gets a batch of data from memory.
+
+    All objects are retrieved from the store using a single call to
+    ``client.get_buffers``.
+
+    Args:
+        obj_ids: The IDs of the objects to retrieve from the plasma
+            store.
+        client: A PlasmaClient to interface with the in-memory object
+            store.
+        zero_copy: If True, then the objects are deserialized directly
+            from the sealed plasma buffers instead of from a copy of
+            them on the heap. See :meth:`get_output_memory`.
+
+    Returns:
+        Mapping from ObjectID to the unserialized data from the store.
+        Objects that are not in the store are not included.
+    """
+    buffers = client.get_buffers(obj_ids, with_meta=True, timeout_ms=1000)
+
+    objs = {}
+    for obj_id, (metadata, buffer) in zip(obj_ids, buffers):
+        # Getting the buffer timed out. We conclude that the object has
+        # not yet been written to the store and maybe never will.
+        if metadata is None and buffer is None:
+            continue
+
+        if metadata == bytes(f'{Config.IDENTIFIER_SERIALIZATION};pickle5', 'utf-8'):
+            if not zero_copy:
+                # Copy into a mutable buffer, such that the out-of-band
+                # buffers (e.g. of NumPy arrays) are writeable.
+                buffer = bytearray(buffer)
+
+            objs[obj_id] = Pickle5Object.deserialize(buffer)
+            continue
+
+        if zero_copy:
+            # The deserialized object references the memory of the
+            # buffer (e.g. the data of NumPy arrays), which in turn holds
+            # on to the client. Thus the object stays pinned inside the
+            # store for as long as the deserialized object is alive.
+            obj = pa.deserialize(buffer)
+        else:
+            buffers_bytes = buffer.to_pybytes()
+            obj = pa.deserialize(buffers_bytes)
+
+        # If the metadata stated that the object was pickled, then we
+        # need to additionally unpickle the obj.
+        if metadata == bytes(f'{Config.IDENTIFIER_SERIALIZATION};arrowpickle', 'utf-8'):
+            obj = pickle.loads(obj)
+
+        # The object is the head of a stream, containing the IDs of the
+        # objects of the chunks.
+        elif metadata == bytes(f'{Config.IDENTIFIER_SERIALIZATION};arrowstream', 'utf-8'):
+            chunk_ids = [plasma.ObjectID(binary) for binary in obj]
+            obj = _read_stream_memory(chunk_ids, client, zero_copy=zero_copy)
+
+        objs[obj_id] = obj
+
+    return objs
+
+
+def _output_to_disk_fallback(data: Any,
+                             obj: pa.SerializedPyObject,
+                             serialization: str,
+                             compression: Optional[str] = None,
+                             compression_level: Optional[int] = None) -> None:
+    """Outputs to disk in case outputting to memory is not possible.
+
+    Args:
+        data: The original data.
+        obj: The serialized `data`.
+        serialization: The serialization of `obj`.
+        compression: Passed to :meth:`output_to_disk`.
+        compression_level: Passed to :meth:`output_to_disk`.
+    """
+    # Tabular data is written in a columnar format to disk, instead of
+    # using the already serialized data.
+    table, table_serialization = _to_table(data)
+    if table is not None:
+        obj, serialization = table, table_serialization
+
+    # TODO: note that metadata is lost when falling back to disk.
+    #       Therefore we will only support metadata added by the
+    #       user, once disk also supports passing metadata.
+    return output_to_disk(obj,
+                          serialization=serialization,
+                          compression=compression,
+                          compression_level=compression_level)
+
+
 def _get_output_memory(obj_id: plasma.ObjectID,
-                       client: plasma.PlasmaClient) -> Any:
+                       client: plasma.PlasmaClient,
+                       zero_copy: bool = False) -> Any:
     """Gets data from memory.
 
     Args:
         obj_id: The ID of the object to retrieve from the plasma store.
         client: A PlasmaClient to interface with the in-memory object
             store.
+        zero_copy: If True, then the object is deserialized directly
+            from the sealed plasma buffer instead of from a copy of it
+            on the heap. See :meth:`get_output_memory`.
 
     Returns:
         The unserialized data from the store corresponding to the
@@ -438,35 +941,68 @@ def _get_output_memory(obj_id: plasma.ObjectID,
         ObjectNotFoundError: If the specified `obj_id` is not in the
             store.
     """
-    obj_ids = [obj_id]
-
-    # TODO: the get_buffers allows for batch, which we want to use in
-    #       the future.
-    buffers = client.get_buffers(obj_ids, with_meta=True, timeout_ms=1000)
+    objs = _get_outputs_memory([obj_id], client, zero_copy=zero_copy)
 
-    # Since we currently know that we are only restrieving one buffer,
-    # we can instantly get its metadata and buffer.
-    metadata, buffer = buffers[0]
-
-    # Getting the buffer timed out. We conclude that the object has not
-    # yet been written to the store and maybe never will.
-    if metadata is None and buffer is None:
+    try:
+        return objs[obj_id]
+    except KeyError:
         raise ObjectNotFoundError(
             f'Object with ObjectID "{obj_id}" does not exist in store.'
         )
 
-    buffers_bytes = buffer.to_pybytes()
-    obj = pa.deserialize(buffers_bytes)
 
-    # If the metadata stated that the object was pickled, then we need
-    # to additionally unpickle the obj.
-    if metadata == bytes(f'{Config.IDENTIFIER_SERIALIZATION};arrowpickle', 'utf-8'):
-        obj = pickle.loads(obj)
+def _notify_eviction_after_read(obj: Any,
+                                client: plasma.PlasmaClient,
+                                step_uuid: str,
+                                consumer: Optional[str]) -> Any:
+    """Notifies the memory-server once `consumer` has read the `obj`.
+
+    Returns:
+        The given `obj`. In case the `obj` is a stream, it is wrapped
+        such that the notification is only sent once the stream has been
+        consumed entirely. Otherwise its chunks could get evicted while
+        they are still being read.
+    """
+    # Deserialized data can never be a generator, thus it has to be an
+    # output stream.
+    if not inspect.isgenerator(obj):
+        _notify_eviction(client, step_uuid, consumer)
+        return obj
+
+    def notify_on_exhaustion(stream):
+        yield from stream
+        _notify_eviction(client, step_uuid, consumer)
+
+    return notify_on_exhaustion(obj)
 
-    return obj
 
+def _notify_eviction(client: plasma.PlasmaClient,
+                     step_uuid: str,
+                     consumer: Optional[str]) -> None:
+    """Notifies the memory-server that `consumer` read the output.
 
-def get_output_memory(step_uuid: str, consumer: Optional[str] = None) -> Any:
+    An empty object is put inside the store with the notification in its
+    metadata, which is then used to manage eviction of objects.
+    """
+    # TODO: note somewhere (maybe in the docstring) that it might
+    #       although very unlikely raise MemoryError, because the
+    #       receive is now actually also outputing data.
+    # TODO: this ENV variable is set in the orchest-api. Now we
+    #       always know when we are running inside a jupyter kernel
+    #       interactively. And in that case we never want to do
+    #       eviction.
+    if os.getenv('EVICTION_OPTIONALITY') is None:
+        return
+
+    empty_obj, _ = serialize('')
+    msg = f'{Config.IDENTIFIER_EVICTION};{step_uuid},{consumer}'
+    metadata = bytes(msg, 'utf-8')
+    _output_to_memory(empty_obj, client, metadata=metadata)
+
+
+def get_output_memory(step_uuid: str,
+                      consumer: Optional[str] = None,
+                      zero_copy: bool = False) -> Any:
     """Gets data from memory.
 
     Args:
@@ -475,6 +1011,12 @@ def get_output_memory(step_uuid: str, consumer: Optional[str] = None) -> Any:
             the metadata of an empty object to trigger a notification in
             the plasma store, which is then used to manage eviction of
             objects.
+        zero_copy: If True, then the data is deserialized directly from
+            the buffer inside the store, without first copying it to the
+            heap. This halves the peak memory usage for large outputs,
+            but the returned data is read-only (e.g. NumPy arrays have
+            ``writeable=False``) and it keeps the object pinned inside
+            the store for as long as the data is referenced.
 
     Returns:
         Data from step identified by `step_uuid`.
@@ -486,18 +1028,11 @@ def get_output_memory(step_uuid: str, consumer: Optional[str] = None) -> Any:
             might be because the specified value was wrong or the store
             died.
     """
-    # TODO: could be good idea to put connecting to plasma in a class
-    #       such that does not get called when no store is instantiated
-    #       or allocated. Additionally, we don't want to be connecting
-    #       to the store multiple times.
-    try:
-        client = plasma.connect(Config.STORE_SOCKET_NAME)
-    except OSError:
-        raise OrchestNetworkError('Failed to connect to in-memory object store.')
+    client = store.get_client()
 
     obj_id = _convert_uuid_to_object_id(step_uuid)
     try:
-        obj = _get_output_memory(obj_id, client)
+        obj = _get_output_memory(obj_id, client, zero_copy=zero_copy)
 
     except ObjectNotFoundError:
         raise MemoryOutputNotFoundError(
@@ -505,60 +1040,69 @@ def get_output_memory(step_uuid: str, consumer: Optional[str] = None) -> Any:
             'Try rerunning it.'
         )
 
-    else:
-        # TODO: note somewhere (maybe in the docstring) that it might
-        #       although very unlikely raise MemoryError, because the
-        #       receive is now actually also outputing data.
-        # TODO: this ENV variable is set in the orchest-api. Now we
-        #       always know when we are running inside a jupyter kernel
-        #       interactively. And in that case we never want to do
-        #       eviction.
-        if os.getenv('EVICTION_OPTIONALITY') is not None:
-            empty_obj, _ = serialize('')
-            msg = f'{Config.IDENTIFIER_EVICTION};{step_uuid},{consumer}'
-            metadata = bytes(msg, 'utf-8')
-            _output_to_memory(empty_obj, client, metadata=metadata)
-
-    return obj
-
-
-def resolve_memory(step_uuid: str, consumer: str = None) -> Dict[str, Any]:
-    """Returns information of the most recent write to memory.
+    return _notify_eviction_after_read(obj, client, step_uuid, consumer)
 
-    Resolves the timestamp via the `create_time` attribute from the info
-    of the plasma store. It also sets the arguments to call the
-    :func:`get_output_memory` method with.
+
+def get_outputs_memory(step_uuids: List[str],
+                       consumer: Optional[str] = None,
+                       zero_copy: bool = False) -> Dict[str, Any]:
+    """Gets data of multiple steps from memory in batch.
+
+    Equivalent to calling :meth:`get_output_memory` for every step,
+    except that only a single connection to the store is made and all
+    the data is retrieved from the store at once.
 
     Args:
-        step_uuid: The UUID of the step to resolve its most recent write
-            to memory.
-        consumer: The consumer of the output data. This is put inside
-            the metadata of an empty object to trigger a notification in
-            the plasma store, which is then used to manage eviction of
-            objects.
+        step_uuids: The UUIDs of the steps to get output data from.
+        consumer: See :meth:`get_output_memory`.
+        zero_copy: See :meth:`get_output_memory`.
 
     Returns:
-        Dictionary containing the information of the function to be
-        called to get the most recent data from the step. Additionally,
-        returns fill-in arguments for the function.
+        Mapping from step UUID to the data of that step. Steps for which
+        the output cannot be found are not included.
 
     Raises:
-        MemoryOutputNotFoundError: If output from `step_uuid` cannot be found.
         OrchestNetworkError: Could not connect to the
             ``Config.STORE_SOCKET_NAME``, because it does not exist. Which
             might be because the specified value was wrong or the store
             died.
     """
-    try:
-        client = plasma.connect(Config.STORE_SOCKET_NAME, num_retries=20)
-    except OSError:
-        raise OrchestNetworkError('Failed to connect to in-memory object store.')
+    client = store.get_client()
+
+    obj_ids = [_convert_uuid_to_object_id(step_uuid) for step_uuid in step_uuids]
+    objs = _get_outputs_memory(obj_ids, client, zero_copy=zero_copy)
+
+    data = {}
+    for step_uuid, obj_id in zip(step_uuids, obj_ids):
+        if obj_id not in objs:
+            continue
 
+        data[step_uuid] = _notify_eviction_after_read(objs[obj_id], client,
+                                                      step_uuid, consumer)
+
+    return data
+
+
+def _resolve_memory_info(step_uuid: str,
+                         store_objects: Dict[plasma.ObjectID, Dict[str, Any]],
+                         consumer: str = None,
+                         zero_copy: bool = False) -> Dict[str, Any]:
+    """Resolves the most recent write to memory from a store listing.
+
+    Args:
+        step_uuid: See :meth:`resolve_memory`.
+        store_objects: The result of ``client.list()``, i.e. a
+            dictionary from ObjectIDs to an "info" dictionary describing
+            the object.
+        consumer: See :meth:`resolve_memory`.
+        zero_copy: See :meth:`resolve_memory`.
+
+    Raises:
+        MemoryOutputNotFoundError: If output from `step_uuid` cannot be found.
+    """
     obj_id = _convert_uuid_to_object_id(step_uuid)
     try:
-        # Dictionary from ObjectIDs to an "info" dictionary describing
-        # the object.
-        info = client.list()[obj_id]
+        info = store_objects[obj_id]
 
     except KeyError:
         raise MemoryOutputNotFoundError(
@@ -574,13 +1118,52 @@ def resolve_memory(step_uuid: str, consumer: str = None) -> Dict[str, Any]:
         'method_to_call': get_output_memory,
         'method_args': (step_uuid,),
         'method_kwargs': {
-            'consumer': consumer
+            'consumer': consumer,
+            'zero_copy': zero_copy,
         }
     }
     return res
 
 
-def resolve(step_uuid: str, consumer: str = None) -> Tuple[Any]:
+def resolve_memory(step_uuid: str,
+                   consumer: str = None,
+                   zero_copy: bool = False) -> Dict[str, Any]:
+    """Returns information of the most recent write to memory.
+
+    Resolves the timestamp via the `create_time` attribute from the info
+    of the plasma store. It also sets the arguments to call the
+    :func:`get_output_memory` method with.
+
+    Args:
+        step_uuid: The UUID of the step to resolve its most recent write
+            to memory.
+        consumer: The consumer of the output data. This is put inside
+            the metadata of an empty object to trigger a notification in
+            the plasma store, which is then used to manage eviction of
+            objects.
+        zero_copy: Passed to :meth:`get_output_memory`.
+
+    Returns:
+        Dictionary containing the information of the function to be
+        called to get the most recent data from the step. Additionally,
+        returns fill-in arguments for the function.
+
+    Raises:
+        MemoryOutputNotFoundError: If output from `step_uuid` cannot be found.
+        OrchestNetworkError: Could not connect to the
+            ``Config.STORE_SOCKET_NAME``, because it does not exist. Which
+            might be because the specified value was wrong or the store
+            died.
+    """
+    client = store.get_client(num_retries=20)
+
+    return _resolve_memory_info(step_uuid, client.list(),
+                                consumer=consumer, zero_copy=zero_copy)
+
+
+def resolve(step_uuid: str,
+            consumer: str = None,
+            zero_copy: bool = False) -> Tuple[Any]:
     """Resolves the most recently used tranfer method of the given step.
 
     Additionally, resolves all the ``*args`` and ``**kwargs`` the
@@ -592,6 +1175,7 @@ def resolve(step_uuid: str, consumer: str = None) -> Tuple[Any]:
             the metadata of an empty object to trigger a notification in
             the plasma store, which is then used to manage eviction of
             objects.
+        zero_copy: Passed to :meth:`resolve_memory`.
 
     Returns:
         Tuple containing the information of the function to be called
@@ -613,7 +1197,8 @@ def resolve(step_uuid: str, consumer: str = None) -> Tuple[Any]:
     for method in _resolve_methods:
         try:
             if method.__name__ == 'resolve_memory':
-                method_info = method(step_uuid, consumer=consumer)
+                method_info = method(step_uuid, consumer=consumer,
+                                     zero_copy=zero_copy)
             else:
                 method_info = method(step_uuid)
 
@@ -628,6 +1213,71 @@ def resolve(step_uuid: str, consumer: str = None) -> Tuple[Any]:
         else:
             method_infos.append(method_info)
 
+    return _get_most_recent(step_uuid, method_infos)
+
+
+def resolve_batch(step_uuids: List[str],
+                  consumer: str = None,
+                  zero_copy: bool = False) -> List[Tuple[Any]]:
+    """Resolves the most recently used transfer method of every step.
+
+    Equivalent to calling :meth:`resolve` for every step, except that
+    the in-memory store is only connected to and listed once for all the
+    given steps.
+
+    Args:
+        step_uuids: UUIDs of the steps to resolve their most recent
+            write.
+        consumer: See :meth:`resolve`.
+        zero_copy: See :meth:`resolve`.
+
+    Returns:
+        List of the resolved information (see :meth:`resolve`) in the
+        same order as the given `step_uuids`.
+
+    Raises:
+        OutputNotFoundError: If no output can be found of any of the
+            given `step_uuids`.
+    """
+    # Dictionary from ObjectIDs to an "info" dictionary describing the
+    # objects, shared by all steps.
+    try:
+        client = store.get_client(num_retries=20)
+    except OrchestNetworkError:
+        # If no in-memory store is running, then getting the data from
+        # memory obviously will not work.
+        store_objects = None
+    else:
+        store_objects = client.list()
+
+    resolved = []
+    for step_uuid in step_uuids:
+        method_infos = []
+        for method in _resolve_methods:
+            try:
+                if method.__name__ == 'resolve_memory':
+                    if store_objects is None:
+                        continue
+
+                    method_info = _resolve_memory_info(
+                        step_uuid, store_objects,
+                        consumer=consumer, zero_copy=zero_copy)
+                else:
+                    method_info = method(step_uuid)
+
+            except OutputNotFoundError:
+                pass
+            else:
+                method_infos.append(method_info)
+
+        resolved.append(_get_most_recent(step_uuid, method_infos))
+
+    return resolved
+
+
+def _get_most_recent(step_uuid: str,
+                     method_infos: List[Dict[str, Any]]) -> Tuple[Any]:
+    """Gets the most recently used method from the resolved infos."""
     # If no info could be collected, then the previous step has not yet
     # been executed.
     if not method_infos:
@@ -648,7 +1298,9 @@ def resolve(step_uuid: str, consumer: str = None) -> Tuple[Any]:
 
 
 def get_inputs(ignore_failure: bool = False,
-               verbose: bool = False) -> List[Any]:
+               verbose: bool = False,
+               zero_copy: bool = False,
+               columns: Optional[Dict[str, List[str]]] = None) -> List[Any]:
     """Gets all data sent from incoming steps.
 
     Args:
@@ -659,6 +1311,15 @@ def get_inputs(ignore_failure: bool = False,
             ``[None, 'Hello World!']`` vs :exc:`OutputNotFoundError`
         verbose: If True print all the steps from which the current step
             has retrieved data.
+        zero_copy: If True, then data that is passed through memory is
+            not copied out of the in-memory store, see
+            :meth:`get_output_memory`. Useful for large (read-only)
+            inputs.
+        columns: Mapping from the title of an incoming step to the
+            columns to get from its output, in case the output is
+            tabular (a pandas DataFrame or Arrow Table). When such an
+            output was passed through disk, only the given columns are
+            read.
 
     Returns:
         List of all the data in the specified order from the front-end.
@@ -680,31 +1341,83 @@ def get_inputs(ignore_failure: bool = False,
         data or maintain a copy yourself.
 
     """
-    with open(Config.PIPELINE_DESCRIPTION_PATH, 'r') as f:
-        pipeline_description = json.load(f)
-
-    pipeline = Pipeline.from_json(pipeline_description)
+    pipeline = load_pipeline()
     try:
         step_uuid = get_step_uuid(pipeline)
     except StepUUIDResolveError:
         raise StepUUIDResolveError('Failed to determine from where to get data.')
 
-    # TODO: maybe instead of for loop we could first get the receive
-    #       method and then do batch receive. For example memory allows
-    #       to do get_buffers which operates in batch.
     # NOTE: the order in which the `parents` list is traversed is
     # indirectly set in the UI. The order is important since it
     # determines the order in which the inputs are received in the next
     # step.
-    data = []
-    for parent in pipeline.get_step_by_uuid(step_uuid).parents:
-        parent_uuid = parent.properties['uuid']
-        get_output_method, args, kwargs = resolve(parent_uuid, consumer=step_uuid)
+    parents = pipeline.get_step_by_uuid(step_uuid).parents
+    parent_uuids = [parent.properties['uuid'] for parent in parents]
+    resolved = resolve_batch(parent_uuids, consumer=step_uuid, zero_copy=zero_copy)
+
+    # All parents that passed their data through memory are retrieved
+    # from the store in a single batch.
+    memory_uuids = [
+        parent_uuid
+        for parent_uuid, (get_output_method, _, _) in zip(parent_uuids, resolved)
+        if get_output_method is get_output_memory
+    ]
+    memory_data = {}
+    if memory_uuids:
+        memory_data = get_outputs_memory(memory_uuids,
+                                         consumer=step_uuid,
+                                         zero_copy=zero_copy)
+
+    # Columns to select from tabular outputs, by parent UUID.
+    if columns is None:
+        columns = {}
+    parent_columns = {
+        parent_uuid: columns[parent.properties['title']]
+        for parent, parent_uuid in zip(parents, parent_uuids)
+        if parent.properties.get('title') in columns
+    }
 
+    # The data of the other parents, e.g. passed through disk, is
+    # retrieved concurrently.
+    futures = {}
+    with ThreadPoolExecutor() as executor:
+        for parent_uuid, (get_output_method, args, kwargs) in zip(parent_uuids, resolved):
+            if get_output_method is get_output_memory:
+                if parent_uuid in memory_data:
+                    continue
+
+                # The output might have been spilled to disk by the
+                # memory-server in between resolving and getting it.
+                futures[parent_uuid] = executor.submit(
+                    _get_output_spilled, parent_uuid, parent_columns.pop(parent_uuid, None)
+                )
+                continue
+
+            # Only read the required columns from disk.
+            if get_output_method is get_output_disk and parent_uuid in parent_columns:
+                kwargs = {**kwargs, 'columns': parent_columns.pop(parent_uuid)}
+
+            futures[parent_uuid] = executor.submit(get_output_method, *args, **kwargs)
+
+    data = []
+    for parent, parent_uuid in zip(parents, parent_uuids):
         # Either raise an error on failure of getting output or
         # continue with other steps.
         try:
-            incoming_step_data = get_output_method(*args, **kwargs)
+            if parent_uuid in futures:
+                incoming_step_data = futures[parent_uuid].result()
+            elif parent_uuid in memory_data:
+                incoming_step_data = memory_data[parent_uuid]
+
+                if parent_uuid in parent_columns:
+                    incoming_step_data = _select_columns(incoming_step_data,
+                                                         parent_columns[parent_uuid])
+            else:
+                raise MemoryOutputNotFoundError(
+                    f'Output from incoming step "{parent_uuid}" cannot be found. '
+                    'Try rerunning it.'
+                )
+
         except OutputNotFoundError as e:
             if not ignore_failure:
                 raise OutputNotFoundError(e)
@@ -723,8 +1436,29 @@ def get_inputs(ignore_failure: bool = False,
     return data
 
 
+def _get_output_spilled(step_uuid: str, columns: Optional[List[str]] = None) -> Any:
+    """Gets the output of a step that was spilled from memory to disk.
+
+    Raises:
+        MemoryOutputNotFoundError: If output from `step_uuid` cannot be
+            found on disk either.
+    """
+    try:
+        method_info = resolve_disk(step_uuid)
+        return get_output_disk(*method_info['method_args'],
+                               **method_info['method_kwargs'],
+                               columns=columns)
+    except DiskOutputNotFoundError:
+        raise MemoryOutputNotFoundError(
+            f'Output from incoming step "{step_uuid}" cannot be found. '
+            'Try rerunning it.'
+        )
+
+
 def output(data: Any,
-           pickle_fallback: bool = True) -> None:
+           pickle_fallback: bool = True,
+           compression: Optional[str] = None,
+           compression_level: Optional[int] = None) -> None:
     """Outputs data so that it can be retrieved by the next step.
 
     It first tries to output to memory and if it does not fit in memory,
@@ -736,6 +1470,10 @@ def output(data: Any,
             ``pyarrow`` cannot serialize the data, then it will fall
             back to using ``pickle``. This is helpful for custom data
             types.
+        compression: Codec to compress the data with, in case it is
+            output to disk. See :meth:`output_to_disk`.
+        compression_level: Compression level of the codec, in case the
+            data is output to disk. See :meth:`output_to_disk`.
 
     Raises:
         OrchestNetworkError: Could not connect to the
@@ -757,7 +1495,369 @@ def output(data: Any,
     """
     return output_to_memory(data,
                             pickle_fallback=pickle_fallback,
-                            disk_fallback=True)
+                            disk_fallback=True,
+                            compression=compression,
+                            compression_level=compression_level)
+
+
+# Schema of the record batches used to write chunks, that are not
+# Arrow record batches themselves, to an Arrow IPC stream. Every record
+# batch contains a single serialized chunk.
+_SERIALIZED_CHUNK_SCHEMA = pa.schema(
+    [
+        ('data', pa.large_binary()),
+        ('serialization', pa.string()),
+    ],
+    metadata={'orchest': 'serialized-chunks'}
+)
+
+
+class _MemoryStreamWriter:
+    """Writes the chunks of a stream as a sequence of objects to memory.
+
+    Every chunk is put in the store as a separate object with a random
+    ID. Once the stream is closed, a "head" object, containing the IDs of
+    all the chunks, is put in the store under the ID of the step.
+
+    Args:
+        client: A PlasmaClient to interface with the in-memory object
+            store.
+        step_uuid: The UUID of the step that outputs the stream.
+        pickle_fallback: This option is passed to :meth:`serialize`.
+    """
+
+    def __init__(self,
+                 client: plasma.PlasmaClient,
+                 step_uuid: str,
+                 pickle_fallback: bool = True) -> None:
+        self.client = client
+        self.step_uuid = step_uuid
+        self.pickle_fallback = pickle_fallback
+        self.chunk_ids: List[plasma.ObjectID] = []
+
+    def write(self, chunk: Any) -> None:
+        """Writes a chunk to memory.
+
+        Raises:
+            MemoryError: If the `chunk` does not fit in memory.
+        """
+        obj, serialization = serialize(chunk, pickle_fallback=self.pickle_fallback)
+        metadata = bytes(f'{Config.IDENTIFIER_SERIALIZATION};{serialization}', 'utf-8')
+
+        chunk_id = _output_to_memory(obj, self.client, metadata=metadata)
+        self.chunk_ids.append(chunk_id)
+
+    def read_chunks(self) -> Iterator[Any]:
+        """Reads back the chunks that have been written so far."""
+        return _read_stream_memory(self.chunk_ids, self.client, zero_copy=True)
+
+    def close(self) -> None:
+        """Makes the stream available by writing its head.
+
+        Raises:
+            MemoryError: If the head does not fit in memory.
+        """
+        obj_id = _convert_uuid_to_object_id(self.step_uuid)
+
+        # Remove the chunks of a previous stream of the same step, its
+        # head is overwritten below.
+        self.client.delete(get_stream_chunk_ids(self.client, obj_id))
+
+        head, _ = serialize([chunk_id.binary() for chunk_id in self.chunk_ids])
+        metadata = bytes(f'{Config.IDENTIFIER_SERIALIZATION};arrowstream', 'utf-8')
+        _output_to_memory(head, self.client, obj_id=obj_id, metadata=metadata)
+
+    def abort(self) -> None:
+        """Removes the chunks that have been written so far."""
+        self.client.delete(self.chunk_ids)
+        self.chunk_ids = []
+
+
+class _DiskStreamWriter:
+    """Writes the chunks of a stream as an Arrow IPC stream to disk.
+
+    Chunks that are Arrow record batches (or tables) are written as is,
+    such that they can be read without any deserialization. Any other
+    chunk is serialized and written as a record batch containing only
+    the serialized chunk.
+
+    Args:
+        step_uuid: The UUID of the step that outputs the stream.
+        pickle_fallback: This option is passed to :meth:`serialize`.
+    """
+
+    def __init__(self, step_uuid: str, pickle_fallback: bool = True) -> None:
+        self.step_uuid = step_uuid
+        self.pickle_fallback = pickle_fallback
+
+        # Recursively create any directories if they do not already exists.
+        self._step_data_dir = Config.get_step_data_dir(step_uuid)
+        os.makedirs(self._step_data_dir, exist_ok=True)
+
+        self._path = os.path.join(self._step_data_dir, f'{step_uuid}.arrowstream')
+        self._sink = None
+        self._writer = None
+        self._native = None
+
+    def write(self, chunk: Any) -> None:
+        """Writes a chunk to disk.
+
+        Raises:
+            ValueError: If record batches (or tables) and other chunks
+                are mixed within the same stream.
+        """
+        native = isinstance(chunk, (pa.RecordBatch, pa.Table))
+
+        if self._writer is None:
+            self._open(chunk.schema if native else _SERIALIZED_CHUNK_SCHEMA)
+            self._native = native
+
+        elif native != self._native:
+            raise ValueError(
+                'Arrow record batches (or tables) cannot be mixed with other '
+                'chunks within the same stream.'
+            )
+
+        if isinstance(chunk, pa.Table):
+            self._writer.write_table(chunk)
+
+        elif native:
+            self._writer.write_batch(chunk)
+
+        else:
+            obj, serialization = serialize(chunk, pickle_fallback=self.pickle_fallback)
+            self._writer.write_batch(_to_serialized_chunk_batch(obj, serialization))
+
+    def close(self) -> None:
+        """Makes the stream available by writing the HEAD file."""
+        if self._writer is None:
+            # An empty stream still has to be readable.
+            self._open(_SERIALIZED_CHUNK_SCHEMA)
+
+        self._writer.close()
+        self._sink.close()
+
+        _write_head(self._step_data_dir, 'arrowstream')
+
+    def _open(self, schema: pa.Schema) -> None:
+        self._sink = pa.OSFile(self._path, 'wb')
+        self._writer = pa.RecordBatchStreamWriter(self._sink, schema)
+
+
+def _to_serialized_chunk_batch(obj: pa.SerializedPyObject,
+                               serialization: str) -> pa.RecordBatch:
+    """Wraps a serialized chunk in a record batch."""
+    buffer = obj.to_buffer()
+
+    # Construct the binary array directly from the buffer to prevent
+    # copying the serialized chunk.
+    offsets = pa.py_buffer(struct.pack('<qq', 0, buffer.size))
+    data = pa.Array.from_buffers(pa.large_binary(), 1, [None, offsets, buffer])
+
+    return pa.RecordBatch.from_arrays(
+        [data, pa.array([serialization], type=pa.string())],
+        schema=_SERIALIZED_CHUNK_SCHEMA
+    )
+
+
+def _read_stream_disk(stream_path: str) -> Iterator[Any]:
+    """Lazily reads the chunks of a stream from disk."""
+    with pa.memory_map(stream_path) as source:
+        reader = pa.ipc.open_stream(source)
+        serialized = reader.schema.equals(_SERIALIZED_CHUNK_SCHEMA, check_metadata=True)
+
+        for batch in reader:
+            if not serialized:
+                yield batch
+                continue
+
+            _, offsets, buffer = batch.column(0).buffers()
+            start, end = struct.unpack('<qq', offsets.to_pybytes()[:16])
+
+            # Copy the chunk out of the memory-mapped file, such that the
+            # returned data is writeable (just like other outputs that
+            # are read from disk).
+            chunk_buffer = buffer.slice(start, end - start)
+            serialization = batch.column(1)[0].as_py()
+
+            if serialization == 'pickle5':
+                chunk = Pickle5Object.deserialize(bytearray(chunk_buffer))
+            else:
+                chunk = pa.deserialize(chunk_buffer.to_pybytes())
+                if serialization == 'arrowpickle':
+                    chunk = pickle.loads(chunk)
+
+            yield chunk
+
+
+def _read_stream_memory(chunk_ids: List[plasma.ObjectID],
+                        client: plasma.PlasmaClient,
+                        zero_copy: bool = False) -> Iterator[Any]:
+    """Lazily reads the chunks of a stream from memory."""
+    for chunk_id in chunk_ids:
+        try:
+            yield _get_output_memory(chunk_id, client, zero_copy=zero_copy)
+        except ObjectNotFoundError:
+            raise MemoryOutputNotFoundError(
+                f'Chunk "{chunk_id}" of the incoming stream cannot be found. '
+                'Try rerunning the step.'
+            )
+
+
+def get_stream_chunk_ids(client: plasma.PlasmaClient,
+                         obj_id: plasma.ObjectID) -> List[plasma.ObjectID]:
+    """Gets the IDs of the chunks of a stream in memory.
+
+    Args:
+        client: A PlasmaClient to interface with the in-memory object
+            store.
+        obj_id: The ID of the (head) object of the stream.
+
+    Returns:
+        The IDs of the objects of the chunks. Empty if the object with
+        the given `obj_id` is not the head of a stream or does not exist.
+    """
+    [(metadata, buffer)] = client.get_buffers([obj_id], with_meta=True, timeout_ms=0)
+
+    if metadata != bytes(f'{Config.IDENTIFIER_SERIALIZATION};arrowstream', 'utf-8'):
+        return []
+
+    chunk_ids = [plasma.ObjectID(binary) for binary in pa.deserialize(buffer)]
+
+    # Release the buffer, otherwise the head cannot be deleted.
+    del buffer
+
+    return chunk_ids
+
+
+def _move_stream_to_disk(writer: _MemoryStreamWriter,
+                         disk_fallback: bool) -> _DiskStreamWriter:
+    """Moves the chunks that were written to memory so far to disk."""
+    if not disk_fallback:
+        writer.abort()
+        raise MemoryError('Data does not fit in memory.')
+
+    disk_writer = _DiskStreamWriter(writer.step_uuid, writer.pickle_fallback)
+    for chunk in writer.read_chunks():
+        disk_writer.write(chunk)
+
+        # The chunk references its buffer inside the store, which would
+        # otherwise prevent it from being deleted.
+        del chunk
+
+    writer.abort()
+    return disk_writer
+
+
+def output_stream(chunks: Iterable[Any],
+                  pickle_fallback: bool = True,
+                  disk_fallback: bool = True) -> None:
+    """Outputs data as a stream of chunks.
+
+    Useful for data that is too large to materialize at once. The chunks
+    are written one after another, as they are produced by the given
+    iterable. Receiving steps get a generator over the chunks (instead
+    of the data itself) from :meth:`get_inputs`.
+
+    The stream is first written to memory as a sequence of objects. If
+    a chunk does not fit in memory, then all chunks are written to disk
+    as an Arrow IPC stream instead.
+
+    Args:
+        chunks: Iterable of the chunks to output, e.g. Arrow record
+            batches or NumPy arrays.
+        pickle_fallback: This option is passed to :meth:`serialize`. If
+            ``pyarrow`` cannot serialize a chunk, then it will fall
+            back to using ``pickle``. This is helpful for custom data
+            types.
+        disk_fallback: If True, then outputing to disk is used when the
+            `chunks` do not fit in memory. If False, then a
+            :exc:`MemoryError` is thrown.
+
+    Raises:
+        MemoryError: If the `chunks` do not fit in memory and
+            ``disk_fallback=False``.
+        OrchestNetworkError: Could not connect to the
+            ``Config.STORE_SOCKET_NAME`` and ``disk_fallback=False``.
+        StepUUIDResolveError: The step's UUID cannot be resolved and
+            thus it cannot determine where to output data to.
+
+    Example:
+        >>> def batches():
+        ...     for path in paths:
+        ...         yield read_batch(path)
+        >>> output_stream(batches())
+
+        In the receiving step:
+
+        >>> stream, = get_inputs()
+        >>> for batch in stream:
+        ...     process(batch)
+
+    Note:
+        A stream can only be consumed once. In addition, Arrow record
+        batches (or tables) cannot be mixed with other chunks within the
+        same stream.
+
+    """
+    pipeline = load_pipeline()
+
+    try:
+        step_uuid = get_step_uuid(pipeline)
+    except StepUUIDResolveError:
+        raise StepUUIDResolveError('Failed to determine where to output data to.')
+
+    try:
+        writer = _MemoryStreamWriter(store.get_client(), step_uuid, pickle_fallback)
+    except OrchestNetworkError:
+        if not disk_fallback:
+            raise
+
+        writer = _DiskStreamWriter(step_uuid, pickle_fallback)
+
+    for chunk in chunks:
+        try:
+            writer.write(chunk)
+        except MemoryError:
+            writer = _move_stream_to_disk(writer, disk_fallback)
+            writer.write(chunk)
+
+    try:
+        writer.close()
+    except MemoryError:
+        writer = _move_stream_to_disk(writer, disk_fallback)
+        writer.close()
+
+
+def output_stream_to_disk(chunks: Iterable[Any],
+                          pickle_fallback: bool = True) -> None:
+    """Outputs data as a stream of chunks to disk.
+
+    The chunks are written as an Arrow IPC stream, see
+    :meth:`output_stream`.
+
+    Args:
+        chunks: Iterable of the chunks to output, e.g. Arrow record
+            batches or NumPy arrays.
+        pickle_fallback: This option is passed to :meth:`serialize`.
+
+    Raises:
+        StepUUIDResolveError: The step's UUID cannot be resolved and
+            thus it cannot determine where to output data to.
+
+    """
+    pipeline = load_pipeline()
+
+    try:
+        step_uuid = get_step_uuid(pipeline)
+    except StepUUIDResolveError:
+        raise StepUUIDResolveError('Failed to determine where to output data to.')
+
+    writer = _DiskStreamWriter(step_uuid, pickle_fallback)
+    for chunk in chunks:
+        writer.write(chunk)
+
+    writer.close()
 
 
 def _convert_uuid_to_object_id(step_uuid: str) -> plasma.ObjectID:
@@ -1,12 +1,58 @@
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 import urllib
 
+from orchest.config import Config
 from orchest.errors import OrchestNetworkError, StepUUIDResolveError
 from orchest.pipeline import Pipeline
 
 
+# Maps the path of a pipeline description to the version of the file
+# (see `load_pipeline`) and the pipeline constructed from it.
+_pipelines: Dict[str, Tuple[Tuple[int, int, int], Pipeline]] = {}
+
+# Maps the ID of a kernel to the pipeline (as loaded by `load_pipeline`)
+# for which the path of its notebook was resolved via the Jupyter
+# sessions and that path.
+_notebook_paths: Dict[str, Tuple[Pipeline, str]] = {}
+
+
+def load_pipeline(path: Optional[str] = None) -> Pipeline:
+    """Loads the pipeline from its description.
+
+    The pipeline is cached and only loaded again once the file has
+    changed, i.e. its inode (in case the file is replaced), modification
+    time or size has changed.
+
+    Args:
+        path: Path to the pipeline description. Defaults to
+            ``Config.PIPELINE_DESCRIPTION_PATH``.
+
+    Returns:
+        The pipeline described by the file. Note that the pipeline is
+        shared between calls, thus it should not be modified without
+        writing the modifications to the file.
+    """
+    if path is None:
+        path = Config.PIPELINE_DESCRIPTION_PATH
+
+    stat = os.stat(path)
+    file_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    cached = _pipelines.get(path)
+    if cached is not None and cached[0] == file_version:
+        return cached[1]
+
+    with open(path, 'r') as f:
+        pipeline_description = json.load(f)
+
+    pipeline = Pipeline.from_json(pipeline_description)
+    _pipelines[path] = (file_version, pipeline)
+
+    return pipeline
+
+
 def get_step_uuid(pipeline: Pipeline) -> str:
     """Gets the currently running script's step UUID.
 
@@ -31,6 +77,30 @@ def get_step_uuid(pipeline: Pipeline) -> str:
     if kernel_id is None:
         raise StepUUIDResolveError('Environment variable "KERNEL_ID" not present.')
 
+    # NOTE: the UUID itself cannot be cached. Because if the notebook is
+    # assigned to a different step, then the env variable does not
+    # change and thus the notebooks wrongly thinks it is a different
+    # step. Instead, the notebook path of the kernel is cached for as
+    # long as the pipeline is unchanged. A changed pipeline description
+    # is loaded as a new pipeline by `load_pipeline`, after which the
+    # path is resolved again since the notebook might have been renamed
+    # or swapped with the notebook of another step.
+    cached = _notebook_paths.get(kernel_id)
+    if cached is not None and cached[0] is pipeline:
+        notebook_path = cached[1]
+    else:
+        notebook_path = _get_notebook_path(pipeline, kernel_id)
+        _notebook_paths[kernel_id] = (pipeline, notebook_path)
+
+    step = pipeline.get_step_by_file_path(notebook_path)
+    if step is None:
+        raise StepUUIDResolveError(f'No step with "notebook_path": {notebook_path}.')
+
+    return step.properties['uuid']
+
+
+def _get_notebook_path(pipeline: Pipeline, kernel_id: str) -> str:
+    """Gets the path of the notebook of a kernel via Jupyter."""
     # Get JupyterLab sessions to resolve the step's UUID via the id of
     # the running kernel and the step's associated file path. This
     # requires an authenticated request, which is obtained by requesting
@@ -50,23 +120,12 @@ def get_step_uuid(pipeline: Pipeline) -> str:
 
     for session in jupyter_sessions:
         if session['kernel']['id'] == kernel_id:
-            notebook_path = session['notebook']['path']
-            break
-    else:
-        raise StepUUIDResolveError(
-            f'Jupyter session data has no "kernel" with "id" equal to the '
-            '"KERNEL_ID" of this step: {kernel_id}.'
-        )
-
-    for step in pipeline.steps:
-        if step.properties['file_path'] == notebook_path:
-            # NOTE: the UUID cannot be cached here. Because if the
-            # notebook is assigned to a different step, then the env
-            # variable does not change and thus the notebooks wrongly
-            # thinks it is a different step.
-            return step.properties['uuid']
+            return session['notebook']['path']
 
-    raise StepUUIDResolveError('No step with "notebook_path": {notebook_path}.')
+    raise StepUUIDResolveError(
+        f'Jupyter session data has no "kernel" with "id" equal to the '
+        '"KERNEL_ID" of this step: {kernel_id}.'
+    )
 
 
 def _request_json(url: str) -> Dict[Any, Any]:
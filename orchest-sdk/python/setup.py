@@ -14,6 +14,7 @@ setuptools.setup(
         'boto3>=1.13.26',
         'requests>=2.23.0',
         'SQLAlchemy>=1.3.18',
+        'pickle5>=0.0.10; python_version < "3.8"',
     ],
 
     # Metadata to display on PyPI.
@@ -0,0 +1,81 @@
+"""Benchmark the latency of outputting to memory as the store fills up.
+
+Run from the ``orchest-sdk/python`` directory:
+
+    python tests/benchmarks/bench_admission.py
+
+Fills the store with small objects and reports the latency of
+:meth:`orchest.transfer._output_to_memory` at increasing numbers of
+objects inside the store. Without a published occupancy every output
+lists all objects inside the store to compute its occupancy, with a
+published occupancy (as maintained by the memory-server) it is read from
+shared memory instead.
+"""
+import os
+import time
+
+import pyarrow.plasma as plasma
+
+import orchest
+from orchest import store, transfer
+
+
+MEGABYTE = 1 << 20
+STORE_MEGABYTES = 1024
+OBJECT_BYTES = 1024
+NUM_OBJECTS = [100, 1000, 10000, 50000]
+REPEATS = 100
+
+
+def measure(client, obj, metadata):
+    latencies = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        obj_id = transfer._output_to_memory(obj, client, metadata=metadata)
+        latencies.append(time.perf_counter() - start)
+
+        client.delete([obj_id])
+
+    latencies.sort()
+    return latencies[len(latencies) // 2]
+
+
+def main():
+    obj, serialization = transfer.serialize(b'0' * OBJECT_BYTES)
+    metadata = bytes(f'1;{serialization}', 'utf-8')
+    object_size = obj.total_bytes + len(metadata)
+
+    with plasma.start_plasma_store(STORE_MEGABYTES * MEGABYTE) as (store_socket_name, _):
+        orchest.Config.STORE_SOCKET_NAME = store_socket_name
+        client = plasma.connect(store_socket_name)
+
+        occupancy_path = store.get_occupancy_path(store_socket_name)
+
+        print(f'{"objects":<10}{"list (us)":<12}{"published (us)":<15}')
+        num_filled = 0
+        for num_objects in NUM_OBJECTS:
+            # Fill the store directly, since filling it through
+            # `_output_to_memory` without a published occupancy is
+            # quadratic in the number of objects.
+            data = obj.to_buffer()
+            for _ in range(num_objects - num_filled):
+                client.put_raw_buffer(data, metadata=metadata)
+            num_filled = num_objects
+
+            # Without a published occupancy.
+            list_latency = measure(client, obj, metadata)
+
+            counter = store.OccupancyCounter(occupancy_path, writable=True)
+            counter.write(num_objects * object_size)
+            published_latency = measure(client, obj, metadata)
+
+            counter.close()
+            os.remove(occupancy_path)
+            store._occupancy_counters.clear()
+
+            print(f'{num_objects:<10}{list_latency * 1e6:<12.1f}'
+                  f'{published_latency * 1e6:<15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark the compression codecs of outputs to disk.
+
+Run from the ``orchest-sdk/python`` directory:
+
+    python tests/benchmarks/bench_compression.py [DIRECTORY]
+
+The outputs are written to the given directory (defaults to a temporary
+directory), which should be on the disk of interest, e.g. the userdir
+bind mount. For every payload and codec the write and read throughput
+(in terms of uncompressed data) and the on-disk size are reported.
+
+Note that the page cache is not dropped between writing and reading,
+thus read throughput is mostly bound by decompression.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from orchest import transfer
+
+
+MEGABYTE = 1 << 20
+PAYLOAD_MEGABYTES = 256
+REPEATS = 3
+
+CODECS = [
+    (None, None),
+    ('lz4', None),
+    ('zstd', None),
+    ('zstd', 1),
+    ('zstd', 9),
+]
+
+
+def random_payload(total_size):
+    # Incompressible, e.g. model weights.
+    nrows = int(total_size / np.dtype('float64').itemsize)
+    return np.random.randn(nrows)
+
+
+def categorical_payload(total_size):
+    # Low cardinality integers, e.g. labels or encoded features.
+    nrows = int(total_size / np.dtype('int64').itemsize)
+    return np.random.randint(0, 16, size=nrows)
+
+
+def table_payload(total_size):
+    # Mixed table with repetitive strings, e.g. a log or event dataset.
+    nrows = int(total_size / 32)
+    values = np.random.randn(nrows)
+    timestamps = np.arange(nrows, dtype='int64')
+    categories = np.random.choice(['click', 'view', 'purchase'], size=nrows)
+    return pa.Table.from_arrays(
+        [pa.array(values), pa.array(timestamps), pa.array(categories)],
+        names=['value', 'timestamp', 'event'],
+    )
+
+
+def serialize(data):
+    if isinstance(data, pa.Table):
+        return data, 'arrowtable', data.nbytes
+
+    obj, serialization = transfer.serialize(data)
+    return obj, serialization, obj.total_bytes
+
+
+def measure(obj, full_path, serialization, compression, compression_level):
+    write_times = []
+    read_times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        transfer._output_to_disk(obj,
+                                 full_path,
+                                 serialization=serialization,
+                                 compression=compression,
+                                 compression_level=compression_level)
+        write_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        data = transfer._get_output_disk(full_path,
+                                         serialization=serialization,
+                                         compression=compression)
+        read_times.append(time.perf_counter() - start)
+        del data
+
+    path = transfer._get_data_path(full_path, serialization, compression)
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    return min(write_times), min(read_times), size
+
+
+def main(directory):
+    payloads = {
+        'random': random_payload(PAYLOAD_MEGABYTES * MEGABYTE),
+        'categorical': categorical_payload(PAYLOAD_MEGABYTES * MEGABYTE),
+        'table': table_payload(PAYLOAD_MEGABYTES * MEGABYTE),
+    }
+    full_path = os.path.join(directory, 'bench-compression')
+
+    print(f'{"payload":<13}{"codec":<10}{"write (MB/s)":<14}{"read (MB/s)":<13}'
+          f'{"size (MB)":<11}{"ratio":<6}')
+    for name, data in payloads.items():
+        obj, serialization, nbytes = serialize(data)
+
+        for compression, compression_level in CODECS:
+            codec = compression or 'none'
+            if compression_level is not None:
+                codec = f'{codec}:{compression_level}'
+
+            try:
+                write_time, read_time, size = measure(
+                    obj, full_path, serialization, compression, compression_level
+                )
+            except ValueError as e:
+                # E.g. compression levels are not supported by pyarrow.
+                print(f'{name:<13}{codec:<10}skipped: {e}')
+                continue
+
+            print(f'{name:<13}{codec:<10}'
+                  f'{nbytes / MEGABYTE / write_time:<14.1f}'
+                  f'{nbytes / MEGABYTE / read_time:<13.1f}'
+                  f'{size / MEGABYTE:<11.1f}'
+                  f'{nbytes / size:<6.2f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            main(directory)
@@ -0,0 +1,141 @@
+"""Benchmark reading outputs from memory with and without copying.
+
+Run from the ``orchest-sdk/python`` directory:
+
+    python tests/benchmarks/bench_zero_copy.py
+
+For every payload the peak resident memory and latency of
+:meth:`orchest.transfer._get_output_memory` is reported. Reading with
+``zero_copy=False`` copies the entire plasma buffer to the heap before
+deserializing it, whereas ``zero_copy=True`` deserializes directly from
+the sealed buffer in the store.
+
+Every read is done in a fresh process, such that its peak RSS is not
+hidden by the peak of an earlier read (or of the benchmark itself). The
+peak is read from ``/proc``, thus the benchmark only runs on Linux. Note
+that the RSS includes the pages of the store that are mapped by reading
+the buffer, thus it only drops to (close to) zero for reads that do not
+touch the data. The memory allocated by Arrow is reported as well.
+"""
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.plasma as plasma
+
+from orchest import transfer
+
+
+MEGABYTE = 1 << 20
+PAYLOAD_MEGABYTES = 256
+REPEATS = 5
+
+
+def numpy_payload(total_size):
+    nrows = int(total_size / np.dtype('float64').itemsize)
+    return np.random.randn(nrows)
+
+
+def arrow_payload(total_size):
+    ncols = 8
+    nrows = int(total_size / np.dtype('float64').itemsize / ncols)
+    columns = [pa.array(np.random.randn(nrows)) for _ in range(ncols)]
+    return pa.Table.from_arrays(columns, names=[f'col-{i}' for i in range(ncols)])
+
+
+def get_rss():
+    """Returns the current and peak RSS of the process in bytes.
+
+    Note that `getrusage` cannot be used for the peak, since its
+    `ru_maxrss` is inherited from the parent process.
+    """
+    rss = {}
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            key, value = line.split(':', 1)
+            if key in ['VmRSS', 'VmHWM']:
+                # In kilobytes.
+                rss[key] = int(value.split()[0]) * 1024
+
+    return rss['VmRSS'], rss['VmHWM']
+
+
+def reset_peak_rss():
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def read(store_socket_name, obj_id, zero_copy):
+    """Reads the output once and prints its latency and memory usage.
+
+    Run in a fresh process by :func:`measure`.
+    """
+    client = plasma.connect(store_socket_name)
+    reset_peak_rss()
+    start_rss, _ = get_rss()
+    start_allocated = pa.total_allocated_bytes()
+    start = time.perf_counter()
+
+    obj = transfer._get_output_memory(obj_id, client, zero_copy=zero_copy)
+
+    latency = time.perf_counter() - start
+    allocated = pa.total_allocated_bytes() - start_allocated
+    _, peak_rss = get_rss()
+    print(latency, peak_rss - start_rss, allocated)
+
+    del obj
+
+
+def measure(store_socket_name, obj_id, zero_copy):
+    latencies = []
+    peaks = []
+    allocations = []
+    for _ in range(REPEATS):
+        output = subprocess.run(
+            [sys.executable, __file__, store_socket_name, obj_id.binary().hex(),
+             str(zero_copy)],
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        latency, peak, allocated = output.split()
+        latencies.append(float(latency))
+        peaks.append(int(peak))
+        allocations.append(int(allocated))
+
+    return min(latencies), max(peaks), max(allocations)
+
+
+def main():
+    payloads = {
+        'numpy': numpy_payload(PAYLOAD_MEGABYTES * MEGABYTE),
+        'arrow': arrow_payload(PAYLOAD_MEGABYTES * MEGABYTE),
+    }
+    store_capacity = 3 * PAYLOAD_MEGABYTES * MEGABYTE
+
+    with plasma.start_plasma_store(store_capacity) as (store_socket_name, _):
+        client = plasma.connect(store_socket_name)
+
+        print(f'{"payload":<10}{"zero_copy":<12}{"latency (s)":<14}'
+              f'{"peak RSS (MB)":<16}{"arrow (MB)":<10}')
+        for name, data in payloads.items():
+            obj, serialization = transfer.serialize(data)
+            metadata = bytes(f'1;{serialization}', 'utf-8')
+            obj_id = transfer._output_to_memory(obj, client, metadata=metadata)
+
+            for zero_copy in [False, True]:
+                latency, peak, allocated = measure(store_socket_name, obj_id, zero_copy)
+                print(f'{name:<10}{str(zero_copy):<12}{latency:<14.4f}'
+                      f'{peak / MEGABYTE:<16.1f}{allocated / MEGABYTE:<10.1f}')
+
+            client.delete([obj_id])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        store_socket_name, obj_id, zero_copy = sys.argv[1:]
+        read(store_socket_name, plasma.ObjectID(bytes.fromhex(obj_id)),
+             zero_copy == 'True')
+    else:
+        main()
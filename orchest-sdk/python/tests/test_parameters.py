@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from orchest import parameters, utils
+from orchest.config import Config
+
+
+@pytest.fixture()
+def pipeline_fname(tmp_path, monkeypatch):
+    with open('tests/userdir/pipeline-basic.json', 'r') as f:
+        description = json.load(f)
+    for step in description['steps'].values():
+        step['parameters'] = {}
+
+    fname = str(tmp_path / 'pipeline.json')
+    with open(fname, 'w') as f:
+        json.dump(description, f)
+
+    monkeypatch.setattr(Config, 'PIPELINE_DESCRIPTION_PATH', fname)
+    monkeypatch.setattr(parameters, 'get_step_uuid',
+                        lambda pipeline: pipeline.steps[0].properties['uuid'])
+    return fname
+
+
+def test_update_params(pipeline_fname):
+    params = parameters.update_params({'a': 1})
+    assert params == {'a': 1}
+    assert parameters.get_params() == {'a': 1}
+
+    pipeline = utils.load_pipeline()
+    params = parameters.update_params({'b': [2]})
+    assert params == {'a': 1, 'b': [2]}
+
+    # The returned params are not shared with the cached pipeline.
+    params['b'].append(3)
+    params['c'] = 4
+    assert pipeline.steps[0].get_params() == {'a': 1, 'b': [2]}
+    assert parameters.get_params() == {'a': 1, 'b': [2]}
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from orchest.pipeline import Pipeline
+
+
+@pytest.fixture()
+def pipeline():
+    with open('tests/userdir/pipeline-basic.json', 'r') as f:
+        description = json.load(f)
+
+    return Pipeline.from_json(description)
+
+
+def test_get_step_by_uuid(pipeline):
+    step = pipeline.get_step_by_uuid('uuid-2______________')
+    assert step.properties['title'] == 'step-2'
+    assert [parent.properties['uuid'] for parent in step.parents] == ['uuid-1______________']
+
+    assert pipeline.get_step_by_uuid('does-not-exist') is None
+
+
+def test_get_step_by_file_path(pipeline):
+    step = pipeline.get_step_by_file_path('step-1.ipynb')
+    assert step.properties['uuid'] == 'uuid-1______________'
+
+    assert pipeline.get_step_by_file_path('does-not-exist.ipynb', default=-1) == -1
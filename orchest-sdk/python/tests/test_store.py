@@ -0,0 +1,103 @@
+import os
+from unittest.mock import Mock
+
+import pyarrow.plasma as plasma
+import pytest
+
+import orchest
+from orchest import store, transfer
+from orchest.errors import OrchestNetworkError
+
+
+KILOBYTE = 1 << 10
+
+
+@pytest.fixture()
+def plasma_store(monkeypatch):
+    with plasma.start_plasma_store(10 * KILOBYTE) as info:
+        store_socket_name, _ = info
+        monkeypatch.setattr(orchest.Config, 'STORE_SOCKET_NAME', store_socket_name)
+        yield store_socket_name
+
+    store.close()
+
+
+def test_client_is_reused(plasma_store):
+    client = store.get_client()
+    assert store.get_client() is client
+
+
+def test_client_reconnects_after_close(plasma_store):
+    client = store.get_client()
+    store.close()
+
+    new_client = store.get_client()
+    assert new_client is not client
+    assert new_client.store_capacity() == 10 * KILOBYTE
+
+
+def test_client_reconnects_after_fork(plasma_store):
+    client = store.get_client()
+
+    pid = os.fork()
+    if pid == 0:
+        # The child should not reuse the socket of its parent.
+        os._exit(0 if store.get_client() is not client else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_client_reconnects_after_store_restart(plasma_store, monkeypatch):
+    client = store.get_client()
+
+    # A store restarted on the same path creates a new socket.
+    monkeypatch.setattr(store, '_get_socket_id', lambda socket_name: (0, 0))
+
+    new_client = store.get_client()
+    assert new_client is not client
+    assert store.get_client() is new_client
+
+
+def test_client_no_store(monkeypatch):
+    monkeypatch.setattr(orchest.Config, 'STORE_SOCKET_NAME', '/tmp/does-not-exist.sock')
+
+    with pytest.raises(OrchestNetworkError):
+        store.get_client(num_retries=1)
+
+
+@pytest.fixture()
+def occupancy_counter(plasma_store):
+    path = store.get_occupancy_path(plasma_store)
+    counter = store.OccupancyCounter(path, writable=True)
+    yield counter
+
+    counter.close()
+    os.remove(path)
+
+
+def test_occupancy_not_published(plasma_store):
+    assert store.get_occupancy() is None
+
+
+def test_occupancy_published(occupancy_counter):
+    assert store.get_occupancy() == 0
+
+    occupancy_counter.write(KILOBYTE)
+    assert store.get_occupancy() == KILOBYTE
+
+
+def test_output_uses_published_occupancy(occupancy_counter):
+    client = Mock(wraps=store.get_client())
+    obj, serialization = transfer.serialize(b'0' * KILOBYTE)
+    metadata = bytes(f'1;{serialization}', 'utf-8')
+
+    # The object clearly fits, thus the store is not listed.
+    transfer._output_to_memory(obj, client, metadata=metadata)
+    assert not client.list.called
+
+    # The published occupancy is outdated, thus the store is listed to
+    # compute the exact occupancy.
+    occupancy_counter.write(9 * KILOBYTE)
+    transfer._output_to_memory(obj, client, metadata=metadata)
+    assert client.list.called
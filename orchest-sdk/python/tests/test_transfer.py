@@ -83,8 +83,22 @@ def test_assert_object_is_unserializable_by_pyarrow():
                 'pickle_fallback': True
             }
         },
+        {
+            'method': transfer.output_to_disk,
+            'kwargs': {
+                'pickle_fallback': True,
+                'compression': 'lz4'
+            }
+        },
+        {
+            'method': transfer.output_to_disk,
+            'kwargs': {
+                'pickle_fallback': True,
+                'compression': 'zstd'
+            }
+        },
     ],
-    ids=['default']
+    ids=['default', 'lz4', 'zstd']
 )
 @patch('orchest.transfer.get_step_uuid')
 @patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
@@ -144,6 +158,59 @@ def test_memory(mock_get_step_uuid, data_1, test_transfer, plasma_store):
     assert (input_data == data_1).all()
 
 
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_memory_zero_copy(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    data_1 = generate_data(KILOBYTE)
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_to_memory(data_1, disk_fallback=False)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs(zero_copy=True)
+
+    assert (input_data[0] == data_1).all()
+
+    # The data is backed by the (immutable) buffer inside the store.
+    assert not input_data[0].flags.writeable
+
+
+@pytest.mark.parametrize('output_method', [
+        transfer.output_to_memory,
+        transfer.output_to_disk,
+    ],
+    ids=['memory', 'disk']
+)
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_pickle5(mock_get_step_uuid, output_method, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    data_1 = UnserializableByPyarrowObject(generate_data(KILOBYTE))
+    obj, serialization = transfer.serialize(data_1)
+    assert serialization == 'pickle5'
+
+    # The array is passed out-of-band instead of being copied into the
+    # pickle.
+    assert len(obj._buffers) == 1
+    assert len(obj._pickle) < data_1.x.nbytes
+    assert len(obj.to_buffer()) == obj.total_bytes
+
+    # Do as if we are uuid-1
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    output_method(data_1)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs()
+
+    assert input_data[0] == data_1
+    assert input_data[0].x.flags.writeable
+
+
 @patch('orchest.transfer.get_step_uuid')
 @patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
 def test_memory_out_of_memory(mock_get_step_uuid, plasma_store):
@@ -320,3 +387,166 @@ def test_output_no_memory_store(mock_get_step_uuid):
     input_data = transfer.get_inputs()
 
     assert (input_data[0] == data_1).all()
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_receive_input_order_memory_and_disk(mock_get_step_uuid, plasma_store):
+    """Test batch retrieval of inputs passed through memory and disk.
+
+    The inputs are retrieved in batch per transfer method, but should
+    still be received in the order of the "incoming-connections".
+    """
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-order.json'
+
+    # Do as if we are uuid-3
+    data_3 = generate_data(KILOBYTE)
+    mock_get_step_uuid.return_value = 'uuid-3______________'
+    transfer.output_to_memory(data_3, disk_fallback=False)
+
+    # Do as if we are uuid-1
+    data_1 = generate_data(KILOBYTE)
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_to_disk(data_1)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs()
+
+    assert (input_data[0] == data_1).all()
+    assert (input_data[1] == data_3).all()
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_stream_memory(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    chunks = [generate_data(KILOBYTE) for _ in range(3)]
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_stream(iter(chunks), disk_fallback=False)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    stream, = transfer.get_inputs()
+
+    received = list(stream)
+    assert len(received) == len(chunks)
+    for received_chunk, chunk in zip(received, chunks):
+        assert (received_chunk == chunk).all()
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_stream_disk_record_batches(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    batches = [
+        pa.RecordBatch.from_arrays([pa.array(generate_data(KILOBYTE))], names=['x'])
+        for _ in range(3)
+    ]
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_stream_to_disk(iter(batches))
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    stream, = transfer.get_inputs()
+
+    received = list(stream)
+    assert len(received) == len(batches)
+    for received_batch, batch in zip(received, batches):
+        assert received_batch.equals(batch)
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_stream_memory_disk_fallback(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1. The stream does not fit in memory as a
+    # whole, although every chunk does.
+    chunks = [generate_data(KILOBYTE) for _ in range(PLASMA_KILOBYTES + 1)]
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_stream(iter(chunks), disk_fallback=True)
+
+    # The chunks that were already in memory have been moved to disk.
+    client = plasma.connect(plasma_store)
+    assert not client.list()
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    stream, = transfer.get_inputs()
+
+    received = list(stream)
+    assert len(received) == len(chunks)
+    for received_chunk, chunk in zip(received, chunks):
+        assert (received_chunk == chunk).all()
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_disk_table_column_projection(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    names = ['a', 'b', 'c']
+    table = pa.Table.from_arrays(
+        [pa.array(generate_data(KILOBYTE)) for _ in names], names=names
+    )
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_to_disk(table)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs()
+    assert input_data[0].equals(table)
+
+    input_data = transfer.get_inputs(columns={'step-1': ['c', 'a']})
+    assert input_data[0].column_names == ['c', 'a']
+    assert input_data[0].column('a').equals(table.column('a'))
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_disk_table_compression(mock_get_step_uuid, plasma_store):
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    names = ['a', 'b']
+    table = pa.Table.from_arrays(
+        [pa.array(generate_data(KILOBYTE)) for _ in names], names=names
+    )
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_to_disk(table, compression='zstd')
+
+    with open('tests/userdir/.data/uuid-1______________/HEAD', 'r') as f:
+        assert f.read().endswith(', arrowtable, zstd')
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs(columns={'step-1': ['b']})
+    assert input_data[0].column_names == ['b']
+    assert input_data[0].column('b').equals(table.column('b'))
+
+    with pytest.raises(ValueError):
+        transfer.output_to_disk(table, compression='gzip')
+
+
+@patch('orchest.transfer.get_step_uuid')
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_disk_dataframe(mock_get_step_uuid, plasma_store):
+    pd = pytest.importorskip('pandas')
+    orchest.Config.PIPELINE_DESCRIPTION_PATH = 'tests/userdir/pipeline-basic.json'
+
+    # Do as if we are uuid-1
+    df = pd.DataFrame({name: generate_data(KILOBYTE) for name in ['a', 'b', 'c']})
+    mock_get_step_uuid.return_value = 'uuid-1______________'
+    transfer.output_to_disk(df)
+
+    # Do as if we are uuid-2
+    mock_get_step_uuid.return_value = 'uuid-2______________'
+    input_data = transfer.get_inputs(columns={'step-1': ['b']})
+
+    pd.testing.assert_frame_equal(input_data[0], df[['b']])
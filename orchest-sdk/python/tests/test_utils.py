@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from orchest import utils
+
+
+@pytest.fixture()
+def pipeline_fname(tmp_path):
+    fname = str(tmp_path / 'pipeline.json')
+    shutil.copyfile('tests/userdir/pipeline-basic.json', fname)
+    return fname
+
+
+def test_load_pipeline_cached(pipeline_fname):
+    pipeline = utils.load_pipeline(pipeline_fname)
+    assert utils.load_pipeline(pipeline_fname) is pipeline
+
+    # Modifying the file invalidates the cache.
+    with open(pipeline_fname, 'r') as f:
+        description = json.load(f)
+    description['name'] = description['name'] + '-modified'
+    with open(pipeline_fname, 'w') as f:
+        json.dump(description, f)
+
+    new_pipeline = utils.load_pipeline(pipeline_fname)
+    assert new_pipeline is not pipeline
+    assert new_pipeline.properties['name'] == description['name']
+
+
+@patch('orchest.utils._request_json')
+def test_get_step_uuid_cached(mock_request_json, pipeline_fname, monkeypatch):
+    monkeypatch.setattr(os, 'environ', {'KERNEL_ID': 'kernel-1'})
+    monkeypatch.setattr(utils, '_notebook_paths', {})
+
+    pipeline = utils.load_pipeline(pipeline_fname)
+    step = pipeline.steps[0]
+    notebook_path = step.properties['file_path']
+
+    mock_request_json.side_effect = lambda url: (
+        [{'kernel': {'id': 'kernel-1'}, 'notebook': {'path': notebook_path}}]
+        if 'api/sessions?' in url else
+        {
+            'jupyter_server_ip': '127.0.0.1',
+            'notebook_server_info': {'port': 8888, 'token': 'token'},
+        }
+    )
+
+    assert utils.get_step_uuid(pipeline) == step.properties['uuid']
+    assert mock_request_json.call_count == 2
+
+    # The notebook path of the kernel is cached.
+    assert utils.get_step_uuid(pipeline) == step.properties['uuid']
+    assert mock_request_json.call_count == 2
+
+    # The file of the step changed, thus the cached path no longer maps
+    # to a step and it is requested again.
+    with open(pipeline_fname, 'r') as f:
+        description = json.load(f)
+    description['steps'][step.properties['uuid']]['file_path'] = 'other.ipynb'
+    with open(pipeline_fname, 'w') as f:
+        json.dump(description, f)
+
+    pipeline = utils.load_pipeline(pipeline_fname)
+    with pytest.raises(utils.StepUUIDResolveError):
+        utils.get_step_uuid(pipeline)
+    assert mock_request_json.call_count == 4
+
+
+@patch('orchest.utils._request_json')
+def test_get_step_uuid_swapped(mock_request_json, pipeline_fname, monkeypatch):
+    monkeypatch.setattr(os, 'environ', {'KERNEL_ID': 'kernel-1'})
+    monkeypatch.setattr(utils, '_notebook_paths', {})
+
+    pipeline = utils.load_pipeline(pipeline_fname)
+    step_1, step_2 = pipeline.steps[:2]
+    notebook_path = step_1.properties['file_path']
+
+    mock_request_json.side_effect = lambda url: (
+        [{'kernel': {'id': 'kernel-1'}, 'notebook': {'path': notebook_path}}]
+        if 'api/sessions?' in url else
+        {
+            'jupyter_server_ip': '127.0.0.1',
+            'notebook_server_info': {'port': 8888, 'token': 'token'},
+        }
+    )
+
+    assert utils.get_step_uuid(pipeline) == step_1.properties['uuid']
+
+    # The files of the steps are swapped and the notebook of the kernel
+    # is renamed to the (new) file of its step.
+    with open(pipeline_fname, 'r') as f:
+        description = json.load(f)
+    steps = description['steps']
+    properties_1 = steps[step_1.properties['uuid']]
+    properties_2 = steps[step_2.properties['uuid']]
+    properties_1['file_path'], properties_2['file_path'] = (
+        properties_2['file_path'], properties_1['file_path'])
+    with open(pipeline_fname, 'w') as f:
+        json.dump(description, f)
+    notebook_path = properties_1['file_path']
+
+    # The cached path still belongs to a step, but it is resolved again
+    # since the pipeline changed.
+    pipeline = utils.load_pipeline(pipeline_fname)
+    assert utils.get_step_uuid(pipeline) == step_1.properties['uuid']
+    assert mock_request_json.call_count == 4
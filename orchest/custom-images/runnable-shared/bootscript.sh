@@ -8,6 +8,17 @@ if [ "$1" = "runnable" ]; then
 elif [ "$1" = "idle" ]; then 
     # infinite sleep to run user installation
     while true; do sleep 86400; done
+elif [ "$1" = "clean" ]; then
+    # Reset a warm container after running a step inside it: stop the
+    # processes left behind by the step (everything except the idle
+    # process and this script) and remove its temporary files.
+    for pid in $(ps -eo pid=); do
+        if [ "$pid" != "1" ] && [ "$pid" != "$$" ]; then
+            kill -9 "$pid" 2> /dev/null
+        fi
+    done
+    rm -rf /tmp/* /tmp/.[!.]* 2> /dev/null
+    exit 0
 else
     /usr/local/bin/bootstrap-kernel.sh
-fi
\ No newline at end of file
+fi
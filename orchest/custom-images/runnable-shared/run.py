@@ -1,6 +1,10 @@
+import base64
+import json
 import sys
 import os
+import shutil
 import subprocess
+import uuid
 
 import nbformat
 from nbconvert.preprocessors import ExecutePreprocessor
@@ -14,11 +18,70 @@ WORKING_DIR = _config.PIPELINE_DIR
 LOG_DIR = _config.LOGS_PATH
 
 
+# Text is converted to HTML in chunks of at most this many characters,
+# such that large outputs do not have to be converted at once.
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Text outputs larger than this many characters are written to a side
+# file instead of being inlined in the log. Rich outputs (e.g. images)
+# are always written to side files.
+LOG_INLINE_LIMIT = 64 * 1024
+
+# Extensions of the side files of rich outputs, by mime type.
+OUTPUT_EXTENSIONS = {
+    'text/plain': 'txt',
+    'text/html': 'html',
+    'text/markdown': 'md',
+    'text/latex': 'tex',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/svg+xml': 'svg',
+    'application/json': 'json',
+    'application/javascript': 'js',
+}
+
+
+def iter_chunks(text, size=LOG_CHUNK_SIZE):
+    """Splits text into chunks of at most `size` characters.
+
+    Chunks end at a newline where possible, such that ANSI escape
+    sequences (which do not span lines) are not split.
+    """
+    while len(text) > size:
+        end = text.rfind('\n', 0, size) + 1
+        if end == 0:
+            # A single line longer than `size`, do not split an escape
+            # sequence at the end of the chunk.
+            end = size
+            escape = text.rfind('\x1b', size - 32, size)
+            if escape > 0:
+                end = escape
+
+        yield text[:end]
+        text = text[end:]
+
+    if text:
+        yield text
+
+
 class PartialExecutePreprocessor(ExecutePreprocessor):
+    """Executes a notebook while streaming its outputs to a log file.
+
+    Outputs are written to the log as the kernel sends them (instead of
+    once the cell has finished), prefixed with the execution count of
+    their cell.
+    """
 
 
     def __init__(self, **kw):
-        self.log_file = kw['log_file']
+        self.log_file = kw.pop('log_file')
+
+        # Directory to write the side files of rich outputs to.
+        self.output_dir = kw.pop('output_dir')
+
+        # Whether the log ends with a newline.
+        self._at_line_start = True
+        self._num_side_files = 0
 
         super(PartialExecutePreprocessor, self).__init__(**kw)
 
@@ -39,47 +102,98 @@ class PartialExecutePreprocessor(ExecutePreprocessor):
 
                 cell, resources = super().preprocess_cell(cell, resources, cell_index)
 
-                # cell output to STDOUT of this process
-                if hasattr(cell, 'outputs'):
-                    for output in cell.outputs:
+                # The outputs of the cell were already logged while it
+                # was executing.
+                self.end_line()
 
-                        output_text = ''
+            except CellExecutionError as e:
 
-                        # support multiple types of output:
-                        # output['text'] (for output['output_type']=='stream')
-                        # output['data']['text/plain'] (for output['output_type']=='execute_result')
+                self.end_line()
+                self.log_file.write("%s" % ansi2html(e))
+                self.log_file.flush()
 
-                        # Note this means application/json and image/png are currently not supported for logging.
-                        if 'text' in output:
-                            output_text = output['text']
-                        elif 'data' in output and 'text/plain' in output['data']:
-                            output_text = output['data']['text/plain']
+                # raise CellExecutionError to avoid execution next cells
+                raise e
 
-                        if not output_text.endswith('\n'):
-                            output_text = ''.join([output_text, '\n'])
 
-                        # process output text with ansi2html to prep for output
-                        # in html log viewer
-                        output_text = ansi2html(output_text)
+            return cell, resources
 
-                        self.log_file.write("[%i] %s" % (cell['execution_count'], output_text))
-                    self.log_file.flush()
 
-            except CellExecutionError as e:
+    def output(self, outs, msg, display_id, cell_index):
+        """Logs an output of a cell as soon as it is received."""
+        out = super().output(outs, msg, display_id, cell_index)
 
-                self.log_file.write("%s" % ansi2html(e))
-                self.log_file.flush()
+        if out is not None:
+            # The execution count of the cell is set by the preceding
+            # "execute_input" message.
+            execution_count = self.nb.cells[cell_index].get('execution_count')
+            self.log_output(out, execution_count)
 
-                # raise CellExecutionError to avoid execution next cells
-                raise e
+        return out
 
 
+    def log_output(self, output, execution_count):
+        # support multiple types of output:
+        # output['text'] (for output['output_type']=='stream')
+        # output['data'] (for output['output_type'] in ['execute_result', 'display_data'])
+        if output['output_type'] == 'stream':
+            self.log_text(output['text'], execution_count)
 
-            # else:
-            #     # TODO: Evaluate whether we want to output anything for no output cells
-            #     self.log_file.write("%s" % ('<No output cell: %s >\n' % cell['cell_type']))
+        elif 'data' in output:
+            for mime_type, data in output['data'].items():
+                if mime_type == 'text/plain' and len(data) <= LOG_INLINE_LIMIT:
+                    self.log_text(data, execution_count)
+                    self.end_line()
+                else:
+                    path = self.write_side_file(mime_type, data, execution_count)
+                    self.log_text('<%s output: %s>\n' % (mime_type, path), execution_count)
 
-            return cell, resources
+        self.log_file.flush()
+
+
+    def log_text(self, text, execution_count):
+        """Writes text to the log, converted to HTML in chunks."""
+        for chunk in iter_chunks(text):
+            if self._at_line_start:
+                self.log_file.write("[%s] " % execution_count)
+
+            # process output text with ansi2html to prep for output
+            # in html log viewer
+            self.log_file.write(ansi2html(chunk))
+            self._at_line_start = chunk.endswith('\n')
+
+
+    def end_line(self):
+        if not self._at_line_start:
+            self.log_file.write('\n')
+            self._at_line_start = True
+        self.log_file.flush()
+
+
+    def write_side_file(self, mime_type, data, execution_count):
+        """Writes a rich output to a side file.
+
+        Returns:
+            The path of the side file relative to the working directory.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        extension = OUTPUT_EXTENSIONS.get(mime_type, 'txt')
+        path = os.path.join(
+            self.output_dir, "%s-%i.%s" % (execution_count, self._num_side_files, extension))
+        self._num_side_files += 1
+
+        # Binary data, e.g. images, is base64 encoded by the kernel.
+        if mime_type.startswith('image/') and mime_type != 'image/svg+xml':
+            with open(path, 'wb') as f:
+                f.write(base64.b64decode(data))
+        else:
+            if not isinstance(data, str):
+                data = json.dumps(data)
+            with open(path, 'w') as f:
+                f.write(data)
+
+        return os.path.relpath(path, WORKING_DIR)
 
 
 def inverted(dict):
@@ -96,6 +210,14 @@ def clear_pipeline_step_log(step_uuid):
         except Exception as e:
             raise Exception("Failed to remove file in path %s error: %s" % (log_file_path, e))
 
+    output_dir_path = get_output_dir_path(step_uuid)
+
+    if os.path.isdir(output_dir_path):
+        try:
+            shutil.rmtree(output_dir_path)
+        except Exception as e:
+            raise Exception("Failed to remove directory in path %s error: %s" % (output_dir_path, e))
+
 
 def run_notebook(file_path, step_uuid=None):
 
@@ -121,7 +243,9 @@ def run_notebook(file_path, step_uuid=None):
         # log file
         log_file_path = get_log_file_path(step_uuid)
         with open(log_file_path, 'w') as log_file:
-            ep = PartialExecutePreprocessor(log_file=log_file)
+            write_log_id(log_file)
+            ep = PartialExecutePreprocessor(
+                log_file=log_file, output_dir=get_output_dir_path(step_uuid))
             ep.preprocess(nb, {"metadata": {"path": WORKING_DIR}})
 
     with open(file_path, 'w', encoding='utf-8') as f:
@@ -133,11 +257,24 @@ def get_log_file_path(step_uuid):
     return os.path.join(WORKING_DIR, LOG_DIR, "%s.log" % step_uuid)
 
 
+def get_output_dir_path(step_uuid):
+    # Rich outputs of notebook cells that are not inlined in the log.
+    return os.path.join(WORKING_DIR, LOG_DIR, step_uuid)
+
+
+def write_log_id(log_file):
+    # Identifies this run of the step to readers of the log, which
+    # cannot rely on the inode of the file since it can be reused.
+    log_file.write(_config.LOG_ID_LINE.format(log_id=uuid.uuid4()))
+    log_file.flush()
+
+
 def run_process(command, filename, step_uuid=None):
 
     log_file_path = get_log_file_path(step_uuid)
 
     with open(log_file_path, 'w') as f:
+        write_log_id(f)
         process = subprocess.Popen([command, filename], cwd=WORKING_DIR, stdout=f, stderr=f)
         process.wait()
 
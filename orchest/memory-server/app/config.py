@@ -14,3 +14,16 @@ STORE_SOCKET_NAME = os.path.join(_config.MEMORY_SERVER_SOCK_PATH, 'plasma.sock')
 STORE_MEMORY = 1000000000  # 1 GB
 # "System memory request exceeds memory available in /dev/shm."
 # STORE_MEMORY = 60397977  # default max by docker
+
+# Default policy to spill objects from the store to disk with, in case
+# the `eviction-policy` is not set in the pipeline description. None
+# means that objects are never spilled.
+EVICTION_POLICY = None
+
+# Fractions of the capacity of the store. Objects are spilled once the
+# occupancy exceeds the high watermark, until it is below the low
+# watermark. The high watermark should be below the
+# `MAX_RELATIVE_STORE_CAPACITY` of the SDK, which is the maximum
+# occupancy at which objects are still written to the store.
+SPILL_HIGH_WATERMARK = 0.8
+SPILL_LOW_WATERMARK = 0.6
@@ -5,6 +5,7 @@ import subprocess
 import time
 from typing import Tuple
 
+from orchest.store import get_occupancy_path
 import pyarrow as pa
 
 import config
@@ -26,6 +27,12 @@ def get_command_line_args():
                         required=False,
                         default=config.PIPELINE_DESCRIPTION_FILE,
                         help='file containing pipeline description')
+    parser.add_argument('-e', '--eviction_policy',
+                        required=False,
+                        default=config.EVICTION_POLICY,
+                        choices=['lru', 'largest-first', 'cost-aware'],
+                        help=('policy to spill objects to disk with, unless '
+                              'set in the pipeline description'))
 
     args = parser.parse_args()
     return args
@@ -70,6 +77,12 @@ def start_plasma_store(
 
         os.remove(store_socket_name)
 
+        # Created by the manager.
+        try:
+            os.remove(get_occupancy_path(store_socket_name))
+        except FileNotFoundError:
+            pass
+
 
 def main():
     args = get_command_line_args()
@@ -79,7 +92,9 @@ def main():
     ) as (store_socket_name, _):
         # Start the manager that handles eviction by listening to the
         # notification socket of the store.
-        start_manager(store_socket_name, pipeline_fname=args.pipeline_fname)
+        start_manager(store_socket_name,
+                      pipeline_fname=args.pipeline_fname,
+                      eviction_policy=args.eviction_policy)
 
 
 if __name__ == '__main__':
@@ -1,70 +1,169 @@
 import json
+import os
 
-import networkx as nx
+from orchest.store import get_occupancy_path, OccupancyCounter
+from orchest.transfer import get_stream_chunk_ids
 import pyarrow.plasma as plasma
 
+import config
+from spill import get_policy, Spiller, StoreObjects
 
-def construct_pipeline(pipeline_fname):
-    """Construct pipeline from pipeline.json"""
-    with open(pipeline_fname, 'r') as f:
-        description = json.load(f)
 
-    try:
-        auto_eviction = description['settings'].get('auto-eviction', False)
-    except KeyError:
-        auto_eviction = False
+class ConsumerIndex:
+    """Keeps track of which consumers have received the output of a step.
 
-    pipeline = nx.DiGraph(auto_eviction=auto_eviction)
+    For every step (the source) the index maintains the set of steps
+    that receive its output (its consumers) according to the
+    `pipeline.json`, together with the set of consumers that have
+    already received the output. Once all consumers have received the
+    output, the output can be evicted.
 
-    # If an interactive session is started the first time on a newly
-    # created pipeline. Then the `pipeline.json` will not have a `steps`
-    # key, since the pipeline does not yet have steps.
-    steps = description.get('steps')
-    if steps is None:
-        return pipeline
+    Marking that a consumer has received an output is O(1). The
+    `pipeline.json` is only parsed again when the file has changed,
+    after which the received state is kept for connections that still
+    exist.
 
-    # Create and add nodes.
-    uuids = steps.keys()
-    pipeline.add_nodes_from(uuids)
+    Args:
+        pipeline_fname: Path to the `pipeline.json`.
 
-    # Create and add edges with weight zero.
-    all_edges = []
-    for uuid, info in steps.items():
-        edges = [(conn, uuid, 0) for conn in info['incoming_connections']]
-        all_edges.extend(edges)
+    Attributes:
+        auto_eviction: Whether the `auto-eviction` setting is enabled in
+            the `pipeline.json`.
+        eviction_policy: The `eviction-policy` setting in the
+            `pipeline.json`, see :mod:`spill`. None if it is not set.
+    """
 
-    pipeline.add_weighted_edges_from(all_edges)
+    def __init__(self, pipeline_fname):
+        self.pipeline_fname = pipeline_fname
+        self.auto_eviction = False
+        self.eviction_policy = None
 
-    return pipeline
+        # Maps the UUID of a step to the UUIDs of the steps that receive
+        # its output respectively have received its output.
+        self._consumers = {}
+        self._received = {}
 
+        # Maps the UUID of a step to the UUIDs of its incoming steps.
+        self._incoming = {}
 
-# NOTE: changes new it in place.
-def propagate_weights(old, new):
-    """Add old weights to new pipeline."""
-    # Add weights from the previous pipeline to the new pipeline. Only
-    # weights for still existing edges are propagated.
-    for edge in new.edges:
-        s, t = edge
+        # Maps the binary ObjectID of the output of a step to the UUID
+        # of the step.
+        self._step_uuids = {}
 
-        try:
-            new[s][t]['weight'] = old[s][t]['weight']
-        except KeyError:
-            # Hit if the edge does not exist in the previous pipeline.
-            pass
+        # Identifies the version of the `pipeline.json` that was loaded.
+        self._file_version = None
 
+        self.reload_if_changed()
 
-def get_uuids_to_evict(pipeline):
-    """Go over entire pipeline and check for objects to evict."""
-    uuids = []
-    for uuid in pipeline.nodes:
-        out_degree = pipeline.out_degree(uuid)
-        num_uniq_receivers = pipeline.out_degree(uuid, weight='weight')
+    def reload_if_changed(self):
+        """Loads the `pipeline.json` again if it has changed.
 
-        # For these we want to do eviction.
-        if out_degree == num_uniq_receivers:
-            uuids.append(uuid)
+        Returns:
+            True if the `pipeline.json` was loaded again, False otherwise.
+        """
+        try:
+            stat = os.stat(self.pipeline_fname)
+        except FileNotFoundError:
+            # Keep the current state, the file might be in the process
+            # of being replaced.
+            return False
+
+        # The inode changes if the file is replaced instead of written
+        # to, the size guards against writes within the mtime
+        # resolution of the filesystem.
+        file_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_version == self._file_version:
+            return False
 
-    return uuids
+        try:
+            with open(self.pipeline_fname, 'r') as f:
+                description = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # The file is being written to. Since the version is not
+            # stored, the file will be loaded again on the next call.
+            return False
+
+        self._load(description)
+        self._file_version = file_version
+        return True
+
+    def mark_received(self, source, consumer):
+        """Marks that the `consumer` has received the output of `source`.
+
+        Returns:
+            True if all consumers of `source` have received its output,
+            False otherwise. Also False if there is no connection from
+            `source` to `consumer` in the pipeline.
+        """
+        consumers = self._consumers.get(source)
+        if consumers is None or consumer not in consumers:
+            return False
+
+        received = self._received.setdefault(source, set())
+        received.add(consumer)
+
+        return len(received) == len(consumers)
+
+    def incoming(self, step_uuid):
+        """Returns the UUIDs of the incoming steps of a step."""
+        return self._incoming.get(step_uuid, [])
+
+    def get_step_uuid(self, obj_id):
+        """Returns the UUID of the step that outputs the given object.
+
+        Returns:
+            None if the object is not the output of a step, e.g. because
+            it is the chunk of a stream.
+        """
+        return self._step_uuids.get(obj_id.binary())
+
+    def reset(self, source):
+        """Marks that none of the consumers have received `source`.
+
+        Should be called once the output of `source` is evicted, such
+        that a new output of the step is only evicted once it has been
+        received again by all consumers.
+        """
+        self._received.pop(source, None)
+
+    def _load(self, description):
+        settings = description.get('settings', {})
+        self.auto_eviction = settings.get('auto-eviction', False)
+        self.eviction_policy = settings.get('eviction-policy')
+
+        # If an interactive session is started the first time on a newly
+        # created pipeline. Then the `pipeline.json` will not have a
+        # `steps` key, since the pipeline does not yet have steps.
+        steps = description.get('steps') or {}
+
+        consumers = {uuid: set() for uuid in steps}
+        for uuid, info in steps.items():
+            for source in info['incoming_connections']:
+                consumers.setdefault(source, set()).add(uuid)
+
+        # Only keep the received state of still existing connections. A
+        # user might have added or removed multiple steps or
+        # connections.
+        received = {}
+        for source, old_received in self._received.items():
+            still_received = old_received & consumers.get(source, set())
+            if still_received:
+                received[source] = still_received
+
+        self._consumers = consumers
+        self._received = received
+        self._incoming = {
+            uuid: info['incoming_connections'] for uuid, info in steps.items()
+        }
+        self._step_uuids = {}
+        for uuid in steps:
+            try:
+                obj_id = _convert_uuid_to_object_id(uuid)
+            except ValueError:
+                # The UUID is too short to be converted to an object
+                # ID, thus the step cannot have an output in the store.
+                continue
+            self._step_uuids[obj_id.binary()] = uuid
 
 
 # TODO: could actually import this from orchest.transfer
@@ -78,25 +177,41 @@ def delete(client, uuids):
     # Just a wrapper of the apache arrow plasma client.delete().
     bin_uuids = [_convert_uuid_to_object_id(uuid) for uuid in uuids]
 
+    # Outputs that are streams consist of a head object and an object
+    # for every chunk.
+    for obj_id in list(bin_uuids):
+        bin_uuids.extend(get_stream_chunk_ids(client, obj_id))
+
     # No error is raised in case an ID is not in the store. It passes
     # silently, since in essence it is actually succeeding.
     client.delete(bin_uuids)
 
 
-def start_manager(store_socket_name, pipeline_fname):
+def start_manager(store_socket_name, pipeline_fname, eviction_policy=None):
     # Connect to the plasma store and subscribe to its notification
     # socket.
     client = plasma.connect(store_socket_name)
     client.subscribe()
-
-    # Keeps a `pipeline` in memory to maintain state. Everytime a step
-    # retrieves the output from another the weight of that connection
-    # (aka edge) is set to 1. If the outdegree of a step is equal to the
-    # sum of the weight of its outgoing edges, then we know that all the
-    # receiving steps have already read the output. If the
-    # `auto-eviction` is set in the `pipeline.json`, then this will
-    # cause that output to be removed from the store.
-    pipeline = construct_pipeline(pipeline_fname=pipeline_fname)
+    capacity = client.store_capacity()
+
+    # Keeps track of which steps have received the output of which
+    # other steps. If all the receiving steps of a step have read its
+    # output and the `auto-eviction` is set in the `pipeline.json`, then
+    # that output is removed from the store.
+    index = ConsumerIndex(pipeline_fname)
+
+    # Keeps track of the objects inside the store, such that objects can
+    # be spilled to disk if the store is filling up and an
+    # `eviction-policy` is set in the `pipeline.json` (or given as
+    # default). The occupancy of the store is published for the SDK to
+    # check whether objects fit in the store.
+    occupancy_counter = OccupancyCounter(get_occupancy_path(store_socket_name),
+                                         writable=True)
+    objects = StoreObjects(occupancy_counter=occupancy_counter)
+    spiller = Spiller(store_socket_name, objects,
+                      high_watermark=config.SPILL_HIGH_WATERMARK,
+                      low_watermark=config.SPILL_LOW_WATERMARK)
+    spiller.start()
 
     while True:
         try:
@@ -105,11 +220,16 @@ def start_manager(store_socket_name, pipeline_fname):
             # "Failed to read object notification from Plasma socket"
             continue
 
-        mdata = client.get_metadata([obj_id], timeout_ms=1000)
-
         # Whenever a sealed object is deleted, it also triggers a
         # notification. However, we do not need to check for eviction in
         # that case.
+        if data_size < 0:
+            objects.remove(obj_id)
+            continue
+
+        mdata = client.get_metadata([obj_id], timeout_ms=1000)
+
+        # The object has already been deleted again.
         if mdata[0] is None:
             continue
 
@@ -117,43 +237,52 @@ def start_manager(store_socket_name, pipeline_fname):
         print('Received:', obj_id)
         mdata = bytes(mdata[0])
 
+        # Account for a possible change in the pipeline. A user might
+        # have added or removed multiple steps or connections.
+        index.reload_if_changed()
+
         # An example message: b'2;uuid-1,uuid-2'. Meaning that step with
         # 'uuid-2' has retrieved the output from step with 'uuid-1'.
         identifier, _, mdata = mdata.partition(b';')
+
+        if identifier == b'1':
+            step_uuid = index.get_step_uuid(obj_id)
+            objects.add(obj_id, data_size + mdata_size,
+                        step_uuid=step_uuid,
+                        serialization=mdata.decode(encoding='utf-8'),
+                        incoming=index.incoming(step_uuid))
+        else:
+            objects.add(obj_id, data_size + mdata_size)
+
+        policy = get_policy(index.eviction_policy or eviction_policy)
+        if policy is not None:
+            spiller.request(policy, capacity)
+
         if identifier != b'2':
             continue
 
         decoded_mdata = mdata.decode(encoding='utf-8')
         source, target = decoded_mdata.split(',')
 
-        # Create new pipeline and propagate weights. A new pipeline is
-        # created to account for a possible change in the pipeline. A
-        # user might have added or removed multiple steps or
-        # connections.
-        new_pipeline = construct_pipeline(pipeline_fname=pipeline_fname)
-        propagate_weights(pipeline, new_pipeline)
-
-        # The `pipeline` instance is kept in memory so that the state of
-        # the eviction manager is maintained during the lifecycle of the
-        # store.
-        pipeline = new_pipeline
-
         # Set that the target uuid has received from the source.
-        pipeline[source][target]['weight'] = 1
+        objects.touch(_convert_uuid_to_object_id(source))
+        all_received = index.mark_received(source, target)
 
         # TODO: should we check for this options earlier, because
         #       probably we want to start counting the moment the user
         #       selects the options (and by deselect maybe reset all
         #       weights to zero).
         # Only consider evicting objects if the option is set.
-        if not pipeline.graph.get('auto_eviction', False):
+        if not index.auto_eviction:
             continue
 
-        # Delete the objects corresponding to the `uuids_to_evict`.
-        uuids_to_evict = get_uuids_to_evict(new_pipeline)
-        delete(client, uuids_to_evict)
+        # Only the output of the source can have become evictable by
+        # this notification.
+        if all_received:
+            delete(client, [source])
+            index.reset(source)
 
-        print('Evicting:', uuids_to_evict)
+            print('Evicting:', [source])
 
         # Need to also delete the "ping" object that contained the
         # metadata.
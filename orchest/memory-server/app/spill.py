@@ -0,0 +1,312 @@
+"""Spilling of objects from the store to disk.
+
+Once the occupancy of the store exceeds its high watermark, objects are
+spilled to disk in the background until the occupancy is below its low
+watermark. Spilled objects are written in the same format as outputs to
+disk by the SDK, thus ``orchest.transfer.resolve`` resolves to them once
+they are removed from the store.
+
+The order in which objects are spilled is determined by the eviction
+policy, which is set through the `eviction-policy` setting in the
+`pipeline.json`:
+
+* ``'lru'``: least recently used (i.e. outputted or received) first.
+* ``'largest-first'``: largest first, to free up memory by spilling as
+  few objects as possible.
+* ``'cost-aware'``: cheapest to recompute per byte first.
+"""
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import datetime
+
+from orchest import transfer
+from orchest.errors import DiskOutputNotFoundError
+import pyarrow.plasma as plasma
+
+
+# Serializations of which the object in the store is byte for byte the
+# same as the file on disk. Other objects, e.g. the heads and chunks of
+# streams, are never spilled.
+SPILLABLE_SERIALIZATIONS = ['arrow', 'arrowpickle', 'pickle5']
+
+
+class StoreObject:
+    """An object inside the store.
+
+    Attributes:
+        obj_id: The ObjectID of the object.
+        size: The size of the data and metadata of the object in bytes.
+        step_uuid: The UUID of the step that outputted the object. None
+            if the object is not the output of a step.
+        serialization: The serialization of the object. None if the
+            object is not the output of a step.
+        last_access: Time the object was last outputted or received.
+        recompute_time: Estimate of the number of seconds it takes to
+            recompute the object. None if unknown.
+    """
+
+    __slots__ = ['obj_id', 'size', 'step_uuid', 'serialization', 'last_access',
+                 'recompute_time']
+
+    def __init__(self, obj_id, size, step_uuid=None, serialization=None,
+                 recompute_time=None):
+        self.obj_id = obj_id
+        self.size = size
+        self.step_uuid = step_uuid
+        self.serialization = serialization
+        self.last_access = time.time()
+        self.recompute_time = recompute_time
+
+    @property
+    def spillable(self):
+        return (self.step_uuid is not None
+                and self.serialization in SPILLABLE_SERIALIZATIONS)
+
+
+class StoreObjects:
+    """Keeps track of the objects inside the store.
+
+    Updated by the manager through the notifications of the store and
+    read by the :class:`Spiller` from another thread.
+
+    Args:
+        occupancy_counter: An ``orchest.store.OccupancyCounter`` to
+            publish the total size of all objects to, such that the SDK
+            does not have to compute it.
+
+    Attributes:
+        occupied: The total size of all objects inside the store.
+    """
+
+    def __init__(self, occupancy_counter=None):
+        self.occupied = 0
+        self.occupancy_counter = occupancy_counter
+
+        self._objects = {}
+        self._lock = threading.Lock()
+
+        # Maps the UUID of a step to the time of its most recent output.
+        self._output_times = {}
+
+    def add(self, obj_id, size, step_uuid=None, serialization=None, incoming=()):
+        """Adds an object that was sealed inside the store.
+
+        Args:
+            obj_id: See :class:`StoreObject`.
+            size: See :class:`StoreObject`.
+            step_uuid: See :class:`StoreObject`.
+            serialization: See :class:`StoreObject`.
+            incoming: The UUIDs of the incoming steps of `step_uuid`.
+                The time between the most recent output of an incoming
+                step and this object is used as estimate of the time it
+                takes to recompute the object.
+        """
+        now = time.time()
+
+        recompute_time = None
+        if step_uuid is not None:
+            input_times = [
+                self._output_times[uuid] for uuid in incoming if uuid in self._output_times
+            ]
+            if input_times:
+                recompute_time = now - max(input_times)
+
+            self._output_times[step_uuid] = now
+
+        obj = StoreObject(obj_id, size, step_uuid=step_uuid,
+                          serialization=serialization, recompute_time=recompute_time)
+
+        with self._lock:
+            old_obj = self._objects.pop(obj_id, None)
+            if old_obj is not None:
+                self.occupied -= old_obj.size
+
+            self._objects[obj_id] = obj
+            self.occupied += size
+            self._publish()
+
+    def remove(self, obj_id):
+        """Removes an object that was deleted from the store."""
+        with self._lock:
+            obj = self._objects.pop(obj_id, None)
+            if obj is not None:
+                self.occupied -= obj.size
+                self._publish()
+
+    def touch(self, obj_id):
+        """Marks that an object was accessed."""
+        obj = self._objects.get(obj_id)
+        if obj is not None:
+            obj.last_access = time.time()
+
+    def snapshot(self):
+        """Returns a list of all objects inside the store."""
+        with self._lock:
+            return list(self._objects.values())
+
+    def _publish(self):
+        if self.occupancy_counter is not None:
+            self.occupancy_counter.write(self.occupied)
+
+
+class EvictionPolicy(ABC):
+    """Determines the order in which objects are spilled."""
+
+    @abstractmethod
+    def sort_key(self, obj):
+        """Returns the key by which objects are spilled in ascending order."""
+
+    def order(self, objs):
+        """Orders the objects from first to last to be spilled."""
+        return sorted(objs, key=self.sort_key)
+
+
+class LRUPolicy(EvictionPolicy):
+    def sort_key(self, obj):
+        return obj.last_access
+
+
+class LargestFirstPolicy(EvictionPolicy):
+    def sort_key(self, obj):
+        return -obj.size
+
+
+class CostAwarePolicy(EvictionPolicy):
+    def sort_key(self, obj):
+        # Objects of which the recompute time is unknown, e.g. outputs
+        # of steps without incoming steps, are spilled last.
+        if obj.recompute_time is None:
+            return (1, 0)
+
+        return (0, obj.recompute_time / max(obj.size, 1))
+
+
+POLICIES = {
+    'lru': LRUPolicy,
+    'largest-first': LargestFirstPolicy,
+    'cost-aware': CostAwarePolicy,
+}
+
+
+def get_policy(name):
+    """Returns the eviction policy with the given name.
+
+    Returns:
+        None if `name` is None or not a known policy.
+    """
+    policy = POLICIES.get(name)
+    if policy is None:
+        return None
+
+    return policy()
+
+
+def spill_object(client, obj, create_time):
+    """Spills an object from the store to disk.
+
+    Args:
+        client: A PlasmaClient to interface with the store.
+        obj: The object to spill.
+        create_time: The `create_time` of the object inside the store.
+    """
+    timestamp = datetime.utcfromtimestamp(create_time)
+
+    try:
+        disk_timestamp = transfer.resolve_disk(obj.step_uuid)['timestamp']
+    except DiskOutputNotFoundError:
+        disk_timestamp = None
+
+    # If the step has outputted to disk more recently, then the object
+    # in the store is outdated and is only removed.
+    if disk_timestamp is None or disk_timestamp < timestamp.isoformat():
+        [buffer] = client.get_buffers([obj.obj_id], timeout_ms=0)
+        if buffer is None:
+            return
+
+        transfer.spill_to_disk(obj.step_uuid, buffer, obj.serialization, timestamp)
+
+        # Release the buffer, otherwise the object cannot be deleted.
+        del buffer
+
+    client.delete([obj.obj_id])
+
+
+class Spiller(threading.Thread):
+    """Spills objects from the store to disk in the background.
+
+    Args:
+        store_socket_name: The socket name of the store.
+        objects: The objects inside the store.
+        high_watermark: Fraction of the capacity of the store above
+            which objects are spilled.
+        low_watermark: Fraction of the capacity of the store to spill
+            objects to.
+    """
+
+    def __init__(self, store_socket_name, objects, high_watermark, low_watermark):
+        super().__init__(daemon=True)
+        self.store_socket_name = store_socket_name
+        self.objects = objects
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+
+        self._policy = None
+        self._event = threading.Event()
+
+    def request(self, policy, capacity):
+        """Requests to spill if the store is filled above its high watermark.
+
+        Args:
+            policy: The :class:`EvictionPolicy` to spill objects with.
+            capacity: The capacity of the store.
+        """
+        if self.objects.occupied > self.high_watermark * capacity:
+            self._policy = policy
+            self._event.set()
+
+    def run(self):
+        # The client of the manager cannot be shared, since clients are
+        # not thread safe.
+        client = plasma.connect(self.store_socket_name)
+        capacity = client.store_capacity()
+
+        while True:
+            self._event.wait()
+            self._event.clear()
+
+            try:
+                spilled = self.spill(client, self._policy, capacity)
+            except Exception as e:
+                # The spiller has to survive e.g. a full disk.
+                print('Failed to spill:', e)
+                continue
+
+            print('Spilled:', spilled)
+
+    def spill(self, client, policy, capacity):
+        """Spills objects until the store is below its low watermark.
+
+        Returns:
+            The UUIDs of the steps of which the output was spilled.
+        """
+        excess = self.objects.occupied - self.low_watermark * capacity
+
+        # Objects that are in use, e.g. retrieved by a consumer, are not
+        # spilled since they cannot be deleted.
+        store_objects = client.list()
+
+        spilled = []
+        for obj in policy.order(self.objects.snapshot()):
+            if excess <= 0:
+                break
+
+            info = store_objects.get(obj.obj_id)
+            if not obj.spillable or info is None or info['ref_count'] > 0:
+                continue
+
+            spill_object(client, obj, info['create_time'])
+            spilled.append(obj.step_uuid)
+            excess -= obj.size
+
+        return spilled
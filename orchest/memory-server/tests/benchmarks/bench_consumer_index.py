@@ -0,0 +1,108 @@
+"""Benchmark the bookkeeping of the eviction manager per notification.
+
+Run from the ``orchest/memory-server`` directory:
+
+    python tests/benchmarks/bench_consumer_index.py
+
+Simulates the notifications of every step receiving the outputs of its
+incoming steps for pipelines of increasing size. Reported are the time
+per notification when:
+
+* ``index``: the pipeline is unchanged, thus only the counters of the
+  source are updated.
+* ``index+edit``: the `pipeline.json` is edited every
+  ``EDIT_INTERVAL`` notifications, thus it is loaded again.
+* ``reload``: the `pipeline.json` is parsed and indexed on every
+  notification, which is a lower bound of the cost of rebuilding the
+  pipeline on every notification. Only the first
+  ``MAX_RELOAD_NOTIFICATIONS`` notifications are measured.
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app'))
+from manager import ConsumerIndex  # noqa: E402
+
+
+NUM_STEPS = [100, 1000, 5000]
+MAX_INCOMING_CONNECTIONS = 3
+EDIT_INTERVAL = 1000
+MAX_RELOAD_NOTIFICATIONS = 500
+
+
+def generate_steps(num_steps):
+    steps = {}
+    for i in range(num_steps):
+        sources = random.sample(range(i), min(i, MAX_INCOMING_CONNECTIONS))
+        steps[f'uuid-{i}'] = {
+            'incoming_connections': [f'uuid-{source}' for source in sources]
+        }
+    return steps
+
+
+def write_pipeline(pipeline_fname, steps):
+    with open(pipeline_fname, 'w') as f:
+        json.dump({'settings': {'auto-eviction': True}, 'steps': steps}, f)
+
+
+def get_notifications(steps):
+    notifications = [
+        (source, uuid)
+        for uuid, info in steps.items()
+        for source in info['incoming_connections']
+    ]
+    random.shuffle(notifications)
+    return notifications
+
+
+def measure(pipeline_fname, notifications, mode):
+    index = ConsumerIndex(pipeline_fname)
+    evicted = 0
+
+    start = time.perf_counter()
+    for i, (source, target) in enumerate(notifications):
+        if mode == 'index+edit' and i % EDIT_INTERVAL == 0:
+            # Touching the file is enough to trigger a reload.
+            os.utime(pipeline_fname, ns=(i, i))
+
+        if mode == 'reload':
+            index._file_version = None
+
+        index.reload_if_changed()
+
+        if index.mark_received(source, target):
+            index.reset(source)
+            evicted += 1
+
+    elapsed = time.perf_counter() - start
+    return elapsed / len(notifications), evicted
+
+
+def main():
+    random.seed(0)
+
+    print(f'{"steps":<8}{"notifications":<15}{"mode":<12}{"per notification (us)":<23}'
+          f'{"evicted":<8}')
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline_fname = os.path.join(directory, 'pipeline.json')
+
+        for num_steps in NUM_STEPS:
+            steps = generate_steps(num_steps)
+            write_pipeline(pipeline_fname, steps)
+            notifications = get_notifications(steps)
+
+            for mode in ['index', 'index+edit', 'reload']:
+                if mode == 'reload':
+                    notifications = notifications[:MAX_RELOAD_NOTIFICATIONS]
+
+                latency, evicted = measure(pipeline_fname, notifications, mode)
+                print(f'{num_steps:<8}{len(notifications):<15}{mode:<12}'
+                      f'{latency * 1e6:<23.2f}{evicted:<8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,22 @@
+from datetime import datetime
+import json
 import os
+import shutil
 import subprocess
+import sys
 import time
 from unittest.mock import patch
 
 import numpy as np
 import orchest
+import pyarrow.plasma as plasma
 import pytest
 
 # Add the folder to the path to not break imports. This has to do with
 # imports that work differently when started via a subprocess.
-# import sys
-# sys.path.insert(0, os.path.abspath('app'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from manager import ConsumerIndex  # noqa: E402
+from spill import get_policy, spill_object, StoreObject, StoreObjects  # noqa: E402
 
 KILOBYTE = 1 << 10
 MEGABYTE = KILOBYTE * KILOBYTE
@@ -43,11 +49,19 @@ def memory_store(monkeypatch):
     monkeypatch.setattr(orchest.Config, 'STORE_SOCKET_NAME', store_socket_name)
     yield store_socket_name, pipeline_fname
 
+    # The process-wide client is connected to this store.
+    orchest.store.close()
+
     if proc.poll() is None:
         proc.kill()
 
     os.remove(store_socket_name)
 
+    # Published by the memory-server next to the socket.
+    occupancy_path = orchest.store.get_occupancy_path(store_socket_name)
+    if os.path.exists(occupancy_path):
+        os.remove(occupancy_path)
+
 
 @patch('orchest.transfer.get_step_uuid')
 @patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
@@ -145,3 +159,153 @@ def test_memory_eviction_memoryerror(mock_get_step_uuid, memory_store):
             data_3,
             disk_fallback=False,
         )
+
+
+def write_pipeline(pipeline_fname, steps, auto_eviction=True):
+    description = {
+        'settings': {'auto-eviction': auto_eviction},
+        'steps': {
+            uuid: {'incoming_connections': incoming_connections}
+            for uuid, incoming_connections in steps.items()
+        },
+    }
+    with open(pipeline_fname, 'w') as f:
+        json.dump(description, f)
+
+
+UUID_1 = 'd1ae41bb-4bb2-4bd2-a4ea-f5f2e8cbc5d3'
+UUID_2 = '52eab9a6-1ca1-4e0b-9a3d-2b7a3c1c3b9e'
+UUID_3 = 'a0e2bd3c-6e04-4ab5-a2a6-0c5c3a5e1d51'
+UUID_4 = 'f3b5a7c0-4a9e-4f3b-8c3f-6f1d7b2e9a04'
+
+
+def test_consumer_index(tmp_path):
+    pipeline_fname = str(tmp_path / 'pipeline.json')
+    write_pipeline(pipeline_fname, {
+        UUID_1: [],
+        UUID_2: [UUID_1],
+        UUID_3: [UUID_1],
+    })
+
+    index = ConsumerIndex(pipeline_fname)
+    assert index.auto_eviction
+
+    assert not index.mark_received(UUID_1, UUID_2)
+
+    # Receiving the same output twice does not count twice.
+    assert not index.mark_received(UUID_1, UUID_2)
+
+    # Connections that do not exist are ignored.
+    assert not index.mark_received(UUID_2, UUID_3)
+    assert not index.mark_received(UUID_4, UUID_1)
+
+    assert index.mark_received(UUID_1, UUID_3)
+
+    # Once evicted, a new output has to be received again by all.
+    index.reset(UUID_1)
+    assert not index.mark_received(UUID_1, UUID_3)
+
+    assert index.get_step_uuid(plasma.ObjectID(UUID_2.encode()[:20])) == UUID_2
+
+
+def test_consumer_index_short_uuids(tmp_path):
+    pipeline_fname = str(tmp_path / 'pipeline.json')
+    write_pipeline(pipeline_fname, {
+        'uuid-1': [],
+        'uuid-2': ['uuid-1'],
+    })
+
+    # UUIDs that cannot be converted to object IDs do not break the
+    # index.
+    index = ConsumerIndex(pipeline_fname)
+    assert index.mark_received('uuid-1', 'uuid-2')
+
+
+def test_consumer_index_reload(tmp_path):
+    pipeline_fname = str(tmp_path / 'pipeline.json')
+    write_pipeline(pipeline_fname, {
+        UUID_1: [],
+        UUID_2: [UUID_1],
+        UUID_3: [UUID_1],
+    })
+
+    index = ConsumerIndex(pipeline_fname)
+    assert not index.reload_if_changed()
+    assert not index.mark_received(UUID_1, UUID_2)
+
+    # The received state of still existing connections is kept.
+    write_pipeline(pipeline_fname, {
+        UUID_1: [],
+        UUID_2: [UUID_1],
+        UUID_4: [UUID_1],
+    }, auto_eviction=False)
+    assert index.reload_if_changed()
+    assert not index.auto_eviction
+
+    assert index.mark_received(UUID_1, UUID_4)
+
+
+def test_eviction_policies():
+    objects = StoreObjects()
+    objects.add('obj-1', 10, step_uuid='uuid-1', serialization='arrow')
+    objects.add('obj-2', 30, step_uuid='uuid-2', serialization='arrow',
+                incoming=['uuid-1'])
+    objects.add('obj-3', 20, step_uuid='uuid-3', serialization='arrow',
+                incoming=['uuid-1'])
+    assert objects.occupied == 60
+
+    time.sleep(0.01)
+    objects.touch('obj-1')
+
+    def order(policy_name):
+        policy = get_policy(policy_name)
+        return [obj.obj_id for obj in policy.order(objects.snapshot())]
+
+    assert order('lru') == ['obj-2', 'obj-3', 'obj-1']
+    assert order('largest-first') == ['obj-2', 'obj-3', 'obj-1']
+
+    # The recompute time of "obj-1" is unknown, since "uuid-1" has no
+    # incoming steps.
+    assert order('cost-aware')[-1] == 'obj-1'
+
+    assert get_policy(None) is None
+
+    objects.remove('obj-2')
+    assert objects.occupied == 30
+
+
+@patch('orchest.Config.STEP_DATA_DIR', 'tests/userdir/.data/{step_uuid}')
+def test_spill_object():
+    step_uuid = 'uuid-1______________'
+    data = generate_data(KILOBYTE)
+
+    with plasma.start_plasma_store(PLASMA_STORE_CAPACITY) as (store_socket_name, _):
+        client = plasma.connect(store_socket_name)
+
+        obj, serialization = orchest.transfer.serialize(data)
+        metadata = bytes(f'1;{serialization}', 'utf-8')
+        obj_id = orchest.transfer._output_to_memory(
+            obj, client, obj_id=plasma.ObjectID(step_uuid.encode()), metadata=metadata
+        )
+        info = client.list()[obj_id]
+
+        store_obj = StoreObject(obj_id, obj.total_bytes, step_uuid=step_uuid,
+                                serialization=serialization)
+        spill_object(client, store_obj, info['create_time'])
+
+        assert not client.contains(obj_id)
+
+    try:
+        # The spilled output resolves to the same timestamp as the output
+        # in memory did.
+        method_info = orchest.transfer.resolve_disk(step_uuid)
+        assert method_info['timestamp'] == datetime.utcfromtimestamp(
+            info['create_time']).isoformat()
+
+        spilled_data = orchest.transfer.get_output_disk(
+            step_uuid, **method_info['method_kwargs']
+        )
+        assert (spilled_data == data).all()
+
+    finally:
+        shutil.rmtree(f'tests/userdir/.data/{step_uuid}', ignore_errors=True)
@@ -1,5 +1,7 @@
 from datetime import datetime
+from uuid import uuid4
 
+from celery import group
 from celery.task.control import revoke
 from flask import current_app, request
 from flask_restplus import Namespace, Resource
@@ -8,7 +10,8 @@ from app import schema
 from app.celery_app import make_celery
 from app.connections import db
 from app.core.pipelines import construct_pipeline
-from app.utils import register_schema, update_status_db
+from app.utils import (get_step_durations, register_schema, update_status_db,
+                       update_step_statuses_db)
 import app.models as models
 
 
@@ -46,71 +49,102 @@ class ExperimentList(Resource):
         scheduled_start = post_data['scheduled_start']
         scheduled_start = datetime.fromisoformat(scheduled_start)
 
-        pipeline_runs = []
         pipeline_run_spec = post_data['pipeline_run_spec']
+
+        # Used to prioritize the steps of the runs.
+        pipeline_run_spec['run_config']['step_durations'] = get_step_durations(
+            post_data['pipeline_uuid'])
+
+        experiment = {
+            'experiment_uuid': post_data['experiment_uuid'],
+            'pipeline_uuid': post_data['pipeline_uuid'],
+            'scheduled_start': scheduled_start,
+        }
+
+        # The pipeline descriptions of the runs only differ in the
+        # parameters of their steps. Thus the pipeline is constructed
+        # once, since the same steps are run in every pipeline run.
+        step_uuids = []
+        if post_data['pipeline_descriptions']:
+            pipeline_run_spec['pipeline_description'] = post_data['pipeline_descriptions'][0]
+            pipeline = construct_pipeline(**pipeline_run_spec)
+            step_uuids = [s.properties['uuid'] for s in pipeline.steps]
+
+        # Create Celery object with the Flask context.
+        celery = make_celery(current_app)
+
+        pipeline_runs = []
+        pipeline_steps = []
+        signatures = []
         for pipeline_description, id_ in zip(post_data['pipeline_descriptions'],
                                              post_data['pipeline_run_ids']):
-            pipeline_run_spec['pipeline_description'] = pipeline_description
-            pipeline = construct_pipeline(**post_data['pipeline_run_spec'])
-
-            # TODO: This can be made more efficient, since the pipeline
-            #       is the same for all pipeline runs. The only
-            #       difference is the parameters. So all the jobs could
-            #       be created in batch.
-            # Create Celery object with the Flask context and construct the
-            # kwargs for the job.
-            celery = make_celery(current_app)
+            # The UUID of the run is the id of its Celery task, which is
+            # set upfront such that all runs can be created before any
+            # of them is sent.
+            run_uuid = str(uuid4())
+
+            # The steps of the constructed pipeline are used, since for
+            # a "selection" or "incoming" run their connections are
+            # trimmed to the steps of the run. Only the parameters are
+            # taken from the description of the run.
+            run_description = pipeline.to_dict()
+            run_description['steps'] = {
+                uuid: {
+                    **properties,
+                    'parameters': pipeline_description['steps'][uuid].get('parameters', {}),
+                } for uuid, properties in run_description['steps'].items()
+            }
             celery_job_kwargs = {
                 'experiment_uuid': post_data['experiment_uuid'],
-                'pipeline_description': pipeline.to_dict(),
+                'pipeline_description': run_description,
                 'run_config': pipeline_run_spec['run_config'],
             }
 
-            # Start the run as a background task on Celery. Due to circular
-            # imports we send the task by name instead of importing the
-            # function directly.
-            res = celery.send_task(
+            # Due to circular imports we send the task by name instead
+            # of importing the function directly.
+            signatures.append(celery.signature(
                 'app.core.tasks.start_non_interactive_pipeline_run',
+                kwargs=celery_job_kwargs,
+                task_id=run_uuid,
                 eta=scheduled_start,
-                kwargs=celery_job_kwargs
-            )
+            ))
 
             non_interactive_run = {
                 'experiment_uuid': post_data['experiment_uuid'],
-                'run_uuid': res.id,
+                'run_uuid': run_uuid,
                 'pipeline_run_id': id_,
                 'pipeline_uuid': pipeline.properties['uuid'],
                 'status': 'PENDING',
             }
-            db.session.add(models.NonInteractiveRun(**non_interactive_run))
-
-            # TODO: this code is also in `namespace_runs`. Could
-            #       potentially be put in a function for modularity.
-            # Set an initial value for the status of the pipline steps that
-            # will be run.
-            step_uuids = [s.properties['uuid'] for s in pipeline.steps]
-            pipeline_steps = []
-            for step_uuid in step_uuids:
-                pipeline_steps.append(models.NonInteractiveRunPipelineStep(**{
-                    'experiment_uuid': post_data['experiment_uuid'],
-                    'run_uuid': res.id,
-                    'step_uuid': step_uuid,
-                    'status': 'PENDING'
-                }))
-            db.session.bulk_save_objects(pipeline_steps)
-            db.session.commit()
-
-            non_interactive_run['pipeline_steps'] = pipeline_steps
             pipeline_runs.append(non_interactive_run)
 
-        experiment = {
-            'experiment_uuid': post_data['experiment_uuid'],
-            'pipeline_uuid': post_data['pipeline_uuid'],
-            'scheduled_start': scheduled_start,
-        }
-        db.session.add(models.Experiment(**experiment))
+            # Set an initial value for the status of the pipline steps
+            # that will be run.
+            pipeline_steps.extend({
+                'experiment_uuid': post_data['experiment_uuid'],
+                'run_uuid': run_uuid,
+                'step_uuid': step_uuid,
+                'status': 'PENDING',
+            } for step_uuid in step_uuids)
+
+        # Create all rows in a single transaction.
+        db.session.bulk_insert_mappings(models.Experiment, [experiment])
+        db.session.bulk_insert_mappings(models.NonInteractiveRun, pipeline_runs)
+        db.session.bulk_insert_mappings(models.NonInteractiveRunPipelineStep,
+                                        pipeline_steps)
         db.session.commit()
 
+        # Start the runs as background tasks on Celery, sending all of
+        # them at once. The runs are sent only after their rows are
+        # created, such that they can always update their status.
+        if signatures:
+            group(signatures).apply_async()
+
+        num_steps = len(step_uuids)
+        for i, non_interactive_run in enumerate(pipeline_runs):
+            non_interactive_run['pipeline_steps'] = pipeline_steps[
+                i * num_steps:(i + 1) * num_steps]
+
         experiment['pipeline_runs'] = pipeline_runs
         return experiment, 201
 
@@ -230,6 +264,33 @@ class PipelineRun(Resource):
         return {'message': 'Status was updated successfully'}, 200
 
 
+@api.route(
+    '/<string:experiment_uuid>/<string:run_uuid>/steps',
+    doc={
+        'description': ('Set the execution status of multiple steps of a '
+                        'pipeline run in an experiment at once.')
+    }
+)
+@api.param('experiment_uuid', 'UUID of Experiment')
+@api.param('run_uuid', 'UUID of Run')
+class PipelineStepStatusList(Resource):
+    @api.doc('set_pipeline_run_pipeline_step_statuses')
+    @api.expect(schema.step_status_updates)
+    def put(self, experiment_uuid, run_uuid):
+        """Set the statuses of multiple pipeline steps of a pipeline run."""
+        status_updates = request.get_json()['steps']
+
+        filter_by = {
+            'experiment_uuid': experiment_uuid,
+            'run_uuid': run_uuid,
+        }
+        update_step_statuses_db(status_updates,
+                                model=models.NonInteractiveRunPipelineStep,
+                                filter_by=filter_by)
+
+        return {'message': 'Statuses were updated successfully'}, 200
+
+
 @api.route(
     '/<string:experiment_uuid>/<string:run_uuid>/<string:step_uuid>',
     doc={
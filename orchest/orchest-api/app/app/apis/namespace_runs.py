@@ -11,7 +11,8 @@ from app import schema
 from app.celery_app import make_celery
 from app.connections import db
 from app.core.pipelines import construct_pipeline
-from app.utils import register_schema, update_status_db
+from app.utils import (get_step_durations, register_schema, update_status_db,
+                       update_step_statuses_db)
 import app.models as models
 
 
@@ -42,6 +43,10 @@ class RunList(Resource):
 
         pipeline = construct_pipeline(**post_data)
 
+        # Used to prioritize the steps of the run.
+        post_data['run_config']['step_durations'] = get_step_durations(
+            pipeline.properties['uuid'])
+
         # Create Celery object with the Flask context and construct the
         # kwargs for the job.
         celery = make_celery(current_app)
@@ -143,6 +148,22 @@ class Run(Resource):
         return {'message': 'Run termination was successful'}, 200
 
 
+@api.route('/<string:run_uuid>/steps')
+@api.param('run_uuid', 'UUID of Run')
+class StepStatusList(Resource):
+    @api.doc('set_step_statuses')
+    @api.expect(schema.step_status_updates)
+    def put(self, run_uuid):
+        """Sets the statuses of multiple pipeline steps at once."""
+        status_updates = request.get_json()['steps']
+
+        update_step_statuses_db(status_updates,
+                                model=models.InteractiveRunPipelineStep,
+                                filter_by={'run_uuid': run_uuid})
+
+        return {'message': 'Statuses were updated successfully'}, 200
+
+
 @api.route('/<string:run_uuid>/<string:step_uuid>')
 @api.param('run_uuid', 'UUID of Run')
 @api.param('step_uuid', 'UUID of Pipeline Step')
@@ -0,0 +1,294 @@
+"""Content-addressed caching of the outputs of pipeline steps.
+
+A step is identified by the hash (its key) of its code, parameters,
+image and the hashes of the outputs of its parents. Once a step has
+outputted to disk, its output is stored in the cache under its key.
+Whenever a step with the same key is run again, its output is restored
+from the cache instead of running the step.
+
+Only outputs to disk can be cached. Thus steps that output to memory,
+or do not output at all, are always run, as well as the steps that
+depend on them (since their input cannot be identified). The outputs of
+parents that are not part of the run (e.g. when running a selection of
+steps) are identified by their output on disk.
+"""
+from hashlib import sha256
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from _orchest.internals import config as _config
+
+
+# Name of the file inside a cache entry that contains the hash of the
+# output.
+OUTPUT_HASH_FILE = 'OUTPUT_HASH'
+
+CHUNK_SIZE = 1 << 20
+
+
+def _hash_notebook(f, h) -> None:
+    # Executing a notebook writes its outputs to the notebook, thus only
+    # the code (and whether it is skipped) determines its key.
+    notebook = json.load(f)
+    cells = [(cell.get('source'), cell.get('metadata', {}).get('tags'))
+             for cell in notebook.get('cells', [])
+             if cell.get('cell_type') == 'code']
+    h.update(json.dumps(cells).encode('utf-8'))
+
+
+class StepCache:
+    """Cache of the outputs of the steps of a pipeline.
+
+    Entries are stored inside the pipeline directory. Once the cache
+    exceeds its maximum size, the least recently used entries are
+    evicted.
+
+    NOTE:
+        Steps are assumed to be deterministic, i.e. running a step on
+        the same input results in the same output.
+
+    Args:
+        pipeline_dir: path to the pipeline directory (as accessible by
+            this process).
+        max_size: maximum size of the cache in bytes.
+    """
+
+    def __init__(self, pipeline_dir: str, max_size: int) -> None:
+        self.pipeline_dir = pipeline_dir
+        self.max_size = max_size
+
+        self.data_dir = os.path.join(pipeline_dir, _config.DATA_PATH)
+        self.cache_dir = os.path.join(pipeline_dir, _config.STEP_CACHE_PATH)
+
+        # The pipeline that is run can be a subgraph of the pipeline,
+        # thus the incoming connections of the steps are taken from the
+        # full pipeline description.
+        try:
+            with open(os.path.join(pipeline_dir, _config.PIPELINE_DESCRIPTION_PATH)) as f:
+                description = json.load(f)
+        except (OSError, ValueError):
+            description = {'steps': {}}
+
+        self._incoming: Dict[str, List[str]] = {
+            uuid: step['incoming_connections']
+            for uuid, step in description['steps'].items()
+        }
+
+    def get_incoming(self, properties: Dict[str, Any]) -> List[str]:
+        """Returns the UUIDs of the incoming steps of a step."""
+        return self._incoming.get(properties['uuid'], properties['incoming_connections'])
+
+    def get_key(self,
+                properties: Dict[str, Any],
+                input_hashes: Iterable[Optional[str]]) -> Optional[str]:
+        """Returns the key of a step.
+
+        Args:
+            properties: properties of the step.
+            input_hashes: the hashes of the outputs of the parents of the
+                step, in the order of its incoming connections (which is
+                the order in which the step gets its inputs).
+
+        Returns:
+            None if the step cannot be cached, i.e. if the output of a
+            parent is unknown or its file does not exist.
+        """
+        input_hashes = list(input_hashes)
+        if None in input_hashes:
+            return None
+
+        h = sha256()
+        file_path = os.path.join(self.pipeline_dir, properties['file_path'])
+        try:
+            with open(file_path, 'rb') as f:
+                if file_path.endswith('.ipynb'):
+                    _hash_notebook(f, h)
+                else:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        h.update(chunk)
+        except (OSError, ValueError):
+            return None
+
+        h.update(json.dumps({
+            'image': properties['image'],
+            'parameters': properties.get('parameters'),
+            'inputs': input_hashes,
+        }, sort_keys=True).encode('utf-8'))
+
+        return h.hexdigest()
+
+    def restore_step(self,
+                     properties: Dict[str, Any],
+                     output_hashes: Dict[str, Optional[str]]
+                     ) -> Tuple[Optional[str], Optional[str]]:
+        """Restores the output of a step if it is cached.
+
+        Args:
+            properties: properties of the step.
+            output_hashes: maps the UUIDs of the steps that completed as
+                part of the run to the hashes of their outputs.
+
+        Returns:
+            The key of the step and the hash of its output. The hash is
+            None if the output of the step is not cached.
+        """
+        input_hashes = []
+        for uuid in self.get_incoming(properties):
+            if uuid in output_hashes:
+                input_hashes.append(output_hashes[uuid])
+            else:
+                input_hashes.append(self.hash_output(uuid))
+
+        key = self.get_key(properties, input_hashes)
+        if key is None:
+            return None, None
+
+        return key, self.restore(key, properties['uuid'])
+
+    def restore(self, key: str, step_uuid: str) -> Optional[str]:
+        """Restores the output of a step from the cache.
+
+        Returns:
+            The hash of the output. None if the key is not in the cache.
+        """
+        entry = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry, OUTPUT_HASH_FILE), 'r') as f:
+                output_hash = f.read()
+        except FileNotFoundError:
+            return None
+
+        # Copy the entry next to the data directory of the step, such
+        # that the output of the step is replaced at once.
+        step_data_dir = os.path.join(self.data_dir, step_uuid)
+        tmp_dir = f'{step_data_dir}.{uuid4()}'
+        shutil.copytree(entry, tmp_dir)
+        os.remove(os.path.join(tmp_dir, OUTPUT_HASH_FILE))
+
+        # The output has to resolve as the most recent output of the
+        # step, e.g. over an older output of the step in memory.
+        head_file = os.path.join(tmp_dir, 'HEAD')
+        with open(head_file, 'r') as f:
+            _, head = f.read().split(',', 1)
+        with open(head_file, 'w') as f:
+            f.write(f'{datetime.utcnow().isoformat(timespec="seconds")},{head}')
+
+        if os.path.isdir(step_data_dir):
+            shutil.rmtree(step_data_dir)
+        os.rename(tmp_dir, step_data_dir)
+
+        # Mark the entry as recently used.
+        os.utime(entry)
+
+        return output_hash
+
+    def _hash_output(self, step_data_dir: str) -> str:
+        h = sha256()
+        for name in sorted(os.listdir(step_data_dir)):
+            path = os.path.join(step_data_dir, name)
+            if not os.path.isfile(path) or name == OUTPUT_HASH_FILE:
+                continue
+
+            h.update(name.encode('utf-8'))
+            with open(path, 'rb') as f:
+                if name == 'HEAD':
+                    # Leave out the timestamp, which differs between
+                    # runs.
+                    h.update(f.read().split(b',', 1)[-1])
+                    continue
+
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    h.update(chunk)
+
+        return h.hexdigest()
+
+    def hash_output(self, step_uuid: str) -> Optional[str]:
+        """Returns the hash of the output on disk of a step.
+
+        Returns:
+            None if the step has no output on disk.
+        """
+        step_data_dir = os.path.join(self.data_dir, step_uuid)
+        if not os.path.isfile(os.path.join(step_data_dir, 'HEAD')):
+            return None
+
+        return self._hash_output(step_data_dir)
+
+    def store(self, key: Optional[str], step_uuid: str, since: float) -> Optional[str]:
+        """Stores the output of a step in the cache.
+
+        Args:
+            key: the key of the step. If None, the output is only
+                hashed.
+            step_uuid: UUID of the step.
+            since: time (since the epoch) at which the step started.
+                Outputs from before are not stored.
+
+        Returns:
+            The hash of the output. None if the step did not output to
+            disk since `since`.
+        """
+        step_data_dir = os.path.join(self.data_dir, step_uuid)
+        try:
+            if os.path.getmtime(os.path.join(step_data_dir, 'HEAD')) < since:
+                return None
+        except FileNotFoundError:
+            return None
+
+        if key is None:
+            return self._hash_output(step_data_dir)
+
+        # Hash the copy, since the output of the step could be changed
+        # in the meantime.
+        tmp_dir = os.path.join(self.cache_dir, f'.{key}.{uuid4()}')
+        shutil.copytree(step_data_dir, tmp_dir)
+
+        output_hash = self._hash_output(tmp_dir)
+        with open(os.path.join(tmp_dir, OUTPUT_HASH_FILE), 'w') as f:
+            f.write(output_hash)
+
+        entry = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.rename(tmp_dir, entry)
+
+        self.evict()
+        return output_hash
+
+    def _get_entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            # Entries that are being written are not evicted.
+            if name.startswith('.'):
+                continue
+
+            entry = os.path.join(self.cache_dir, name)
+            size = sum(os.path.getsize(os.path.join(entry, file_name))
+                       for file_name in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, entry))
+
+        return entries
+
+    def evict(self) -> List[str]:
+        """Evicts the least recently used entries if the cache is full.
+
+        Returns:
+            The keys of the evicted entries.
+        """
+        entries = self._get_entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        evicted = []
+        for _, entry_size, entry in sorted(entries):
+            if size <= self.max_size:
+                break
+
+            shutil.rmtree(entry, ignore_errors=True)
+            size -= entry_size
+            evicted.append(os.path.basename(entry))
+
+        return evicted
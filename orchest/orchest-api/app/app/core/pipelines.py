@@ -1,12 +1,17 @@
 import asyncio
+from collections import defaultdict
 import copy
+import json
+import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional#, TypedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple#, TypedDict
 
 import aiodocker
 import aiohttp
 import requests
 
+from app.core.cache import StepCache
 from config import CONFIG_CLASS
 from _orchest.internals import config as _config
 
@@ -26,6 +31,8 @@ class PipelineStepProperties(TypedDict):
     image: Dict[str, str]
     experiment_json: str
     meta_data: Dict[str, List[int]]
+    memory: str  # in megabytes
+    vcpus: str
 
 
 class PipelineDescription(TypedDict):
@@ -119,6 +126,326 @@ async def update_status(status: str,
         return await response.json()
 
 
+async def update_step_statuses(updates: List[Dict[str, str]],
+                               task_id: str,
+                               session: aiohttp.ClientSession,
+                               run_endpoint: str) -> Any:
+    """Updates the statuses of multiple steps via the orchest-api.
+
+    Args:
+        updates: The status updates of the steps, see
+            `StepStatusBuffer`.
+    """
+    url = f'{CONFIG_CLASS.ORCHEST_API_ADDRESS}/{run_endpoint}/{task_id}/steps'
+
+    async with session.put(url, json={'steps': updates}) as response:
+        # Raise on error responses, such that the updates are retried.
+        response.raise_for_status()
+        return await response.json()
+
+
+class StepStatusBuffer:
+    """Buffers the status updates of steps and sends them in batches.
+
+    Instead of a request to the orchest-api per status update of a step,
+    the updates are sent in a single request every `flush_interval`
+    seconds. Updates of the same step within an interval are coalesced
+    into one, keeping the most recent status and all timestamps.
+
+    Sending the updates is done in the background, thus adding an update
+    never blocks the run of a pipeline. If sending fails, the updates
+    are retried at the next flush.
+
+    Args:
+        flush_interval: Seconds in between flushes. Defaults to the
+            `STEP_STATUS_FLUSH_INTERVAL` of the `CONFIG_CLASS`.
+    """
+
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 task_id: str,
+                 run_endpoint: str,
+                 flush_interval: Optional[float] = None):
+        self.session = session
+        self.task_id = task_id
+        self.run_endpoint = run_endpoint
+
+        if flush_interval is None:
+            flush_interval = CONFIG_CLASS.STEP_STATUS_FLUSH_INTERVAL
+        self.flush_interval = flush_interval
+
+        # Maps the UUIDs of steps to their pending status update.
+        self._pending: Dict[str, Dict[str, str]] = {}
+
+        self._closed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, status: str, uuid: str) -> None:
+        """Adds a status update of the step with the given UUID."""
+        update = self._pending.setdefault(uuid, {'step_uuid': uuid})
+        update['status'] = status
+
+        if status == 'STARTED':
+            update['started_time'] = datetime.utcnow().isoformat()
+        elif status in ['SUCCESS', 'FAILURE']:
+            update['finished_time'] = datetime.utcnow().isoformat()
+
+    async def flush(self) -> None:
+        """Sends all pending status updates to the orchest-api."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        try:
+            await update_step_statuses(list(pending.values()), self.task_id,
+                                       self.session, self.run_endpoint)
+        except Exception as e:
+            print('Exception', e)
+
+            # Updates that were added in the meantime are more recent.
+            for uuid, update in pending.items():
+                self._pending[uuid] = {**update, **self._pending.get(uuid, {})}
+
+    def start(self) -> None:
+        """Starts flushing in the background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stops flushing in the background and flushes one last time."""
+        self._closed.set()
+        if self._task is not None:
+            await self._task
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await self.flush()
+
+
+def get_step_resources(properties: PipelineStepProperties) -> Tuple[float, int]:
+    """Returns the resources requested by a step.
+
+    Returns:
+        The number of vcpus and the memory in bytes. Resources that are
+        not requested by the step are zero.
+
+    Raises:
+        ValueError if the requested resources are not numbers.
+    """
+    vcpus = float(properties.get('vcpus') or 0)
+    memory = int(float(properties.get('memory') or 0) * (1 << 20))
+    return vcpus, memory
+
+
+def get_host_resources() -> Tuple[float, int]:
+    """Returns the number of vcpus and the memory in bytes of the host."""
+    vcpus = os.cpu_count() or 1
+    memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    return vcpus, memory
+
+
+class StepAdmission:
+    """Admits steps to run as long as the host has capacity for them.
+
+    A step is admitted if the number of running steps is below the
+    maximum number of parallel steps and the requested resources of the
+    running steps together with the step fit the capacity of the host.
+    A step that requests more than the capacity of the host is only
+    admitted once no other steps are running, such that it can still be
+    run.
+
+    NOTE:
+        The capacity is accounted for per pipeline run. Concurrent
+        pipeline runs (e.g. of experiments) are not taken into account.
+
+    Args:
+        max_parallel_steps: maximum number of steps that run in
+            parallel. None means no limit.
+        vcpus: number of vcpus available to the steps.
+        memory: memory in bytes available to the steps.
+    """
+
+    def __init__(self,
+                 max_parallel_steps: Optional[int] = None,
+                 vcpus: float = float('inf'),
+                 memory: float = float('inf')) -> None:
+        if max_parallel_steps is not None and max_parallel_steps < 1:
+            raise ValueError('At least one step has to be able to run.')
+
+        self.max_parallel_steps = max_parallel_steps
+        self.vcpus = vcpus
+        self.memory = memory
+
+        # Maps the UUIDs of the admitted steps to their resources.
+        self._admitted: Dict[str, Tuple[float, int]] = {}
+        self._used_vcpus: float = 0
+        self._used_memory: int = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'StepAdmission':
+        host_vcpus, host_memory = get_host_resources()
+
+        vcpus = config.HOST_VCPUS
+        if vcpus is None:
+            vcpus = host_vcpus
+
+        memory = config.HOST_MEMORY
+        if memory is None:
+            memory = host_memory
+        else:
+            memory = memory * (1 << 20)
+
+        return cls(config.MAX_PARALLEL_STEPS, vcpus, memory)
+
+    def try_admit(self, step: 'PipelineStep') -> bool:
+        """Admits the step if there is capacity for it.
+
+        Returns:
+            True if the step was admitted, False otherwise.
+        """
+        if self.max_parallel_steps is not None and \
+                len(self._admitted) >= self.max_parallel_steps:
+            return False
+
+        vcpus, memory = get_step_resources(step.properties)
+        fits = (self._used_vcpus + vcpus <= self.vcpus
+                and self._used_memory + memory <= self.memory)
+        if self._admitted and not fits:
+            return False
+
+        self._admitted[step.properties['uuid']] = (vcpus, memory)
+        self._used_vcpus += vcpus
+        self._used_memory += memory
+        return True
+
+    def release(self, step: 'PipelineStep') -> None:
+        """Releases the resources of a completed step."""
+        vcpus, memory = self._admitted.pop(step.properties['uuid'])
+        self._used_vcpus -= vcpus
+        self._used_memory -= memory
+
+
+class ContainerPool:
+    """Pool of warm containers to run the steps of a pipeline run in.
+
+    Creating a container, attaching it to the network and starting it
+    can take longer than running a short step. Instead, containers of
+    the pool are kept idle (using the "idle" command of the bootscript)
+    and steps are run inside them through ``docker exec``. Every step
+    gets a fresh environment, since only the environment of the step is
+    passed to the exec.
+
+    Containers are only shared between steps that have the same image
+    and host configuration (i.e. mounts and requested resources). The
+    containers are removed once the pool is closed, which is at the end
+    of the pipeline run, since they have the mounts of the run.
+
+    Args:
+        docker_client: Docker environment to run containers (async).
+        isolation: one of ("clean", "none"). If "clean", leftover
+            processes of a step are stopped and its temporary files
+            are removed (using the "clean" command of the bootscript)
+            before the container is used again. If "none", containers
+            are used again as is.
+    """
+
+    def __init__(self, docker_client: aiodocker.Docker, isolation: str = 'clean') -> None:
+        if isolation not in ['clean', 'none']:
+            raise ValueError(f'Isolation "{isolation}" is not supported by the pool.')
+
+        self.docker_client = docker_client
+        self.isolation = isolation
+
+        # Maps the configuration of containers to their idle containers.
+        self._idle: Dict[str, List[Any]] = defaultdict(list)
+        self._containers: List[Any] = []
+
+    @staticmethod
+    def _get_key(config: Dict[str, Any]) -> str:
+        return json.dumps([config['Image'], config['HostConfig']], sort_keys=True)
+
+    async def acquire(self, config: Dict[str, Any]) -> Any:
+        """Returns an idle container to run the given step config in.
+
+        A new container is started if there are no idle containers for
+        the config.
+        """
+        idle = self._idle[self._get_key(config)]
+        if idle:
+            return idle.pop()
+
+        container = await self.docker_client.containers.run(config={
+            **config,
+            'Cmd': ['/orchest/bootscript.sh', 'idle'],
+            'Env': [],
+        })
+        self._containers.append(container)
+        return container
+
+    async def run(self, container: Any, config: Dict[str, Any]) -> int:
+        """Runs the command of the step config inside the container.
+
+        Afterwards the container is released back into the pool.
+
+        Returns:
+            The exit code of the command.
+        """
+        try:
+            exit_code = await self._exec(container, config['Cmd'], config['Env'])
+
+            if self.isolation == 'clean':
+                clean_exit_code = await self._exec(
+                    container, ['/orchest/bootscript.sh', 'clean'], [])
+                if clean_exit_code:
+                    raise RuntimeError('Failed to clean the container.')
+
+        except Exception as e:
+            # The state of the container is unknown, thus it cannot be
+            # used to run other steps.
+            print('Exception', e)
+            await self._remove(container)
+            return 1
+
+        self._idle[self._get_key(config)].append(container)
+        return exit_code
+
+    async def _exec(self, container: Any, cmd: List[str], env: List[str]) -> int:
+        exec_ = await container.exec(cmd, environment=env)
+
+        # The output stream closes once the command has exited.
+        async with exec_.start(detach=False) as stream:
+            while True:
+                try:
+                    message = await stream.read_out()
+                except aiohttp.EofStream:
+                    break
+
+                if message is None:
+                    break
+
+        info = await exec_.inspect()
+        return info['ExitCode']
+
+    async def _remove(self, container: Any) -> None:
+        self._containers.remove(container)
+        try:
+            await container.delete(force=True)
+        except Exception as e:
+            print('Exception', e)
+
+    async def close(self) -> None:
+        """Removes all containers of the pool."""
+        await asyncio.gather(*[self._remove(container)
+                               for container in list(self._containers)])
+        self._idle.clear()
+
+
 def get_dynamic_mounts(run_config, task_id):
     mounts = []
 
@@ -192,30 +519,43 @@ class PipelineStepRunner:
                             session: aiohttp.ClientSession,
                             task_id: str,
                             *,
-                            run_config: Dict[str, Any]) -> Optional[str]:
+                            run_config: Dict[str, Any],
+                            pool: Optional[ContainerPool] = None,
+                            status_buffer: Optional[StepStatusBuffer] = None
+                            ) -> Optional[str]:
         """Runs the container image defined in the step's properties.
 
         Running is done asynchronously.
 
+        NOTE:
+            The step is run regardless of the status of its parents.
+            Ordering the steps of a pipeline is up to the
+            `StepScheduler`.
+
         Args:
             docker_client: Docker environment to run containers (async).
-            wait_on_completion: if True await containers, else do not.
-                Awaiting containers is helpful when running a dependency
-                graph (like a pipeline), because one step can only
-                executed once all its proper ancestors have completed.
+            pool: if given, the step is run inside a warm container of
+                the pool instead of inside a new container.
+            status_buffer: if given, the status updates of the step are
+                added to the buffer instead of being sent directly.
         """
-        if not all([parent._status == 'SUCCESS' for parent in self.parents]):
-            # The step cannot be run yet.
-            return self._status
+        host_config = {
+            'Binds': get_dynamic_mounts(run_config, task_id),
+        }
+
+        # Limit the container to the requested resources.
+        vcpus, memory = get_step_resources(self.properties)
+        if vcpus:
+            host_config['NanoCpus'] = int(vcpus * 1e9)
+        if memory:
+            host_config['Memory'] = memory
 
         config = {
             'Image': self.properties['image'],
             'Env': [
                 f'STEP_UUID={self.properties["uuid"]}',
             ],
-            'HostConfig': {
-                'Binds': get_dynamic_mounts(run_config, task_id),
-            },
+            'HostConfig': host_config,
             'Cmd': ["/orchest/bootscript.sh", "runnable", self.properties['file_path']],
             'NetworkingConfig': {
                 'EndpointsConfig': {
@@ -232,25 +572,28 @@ class PipelineStepRunner:
         # command does). Therefore the option to await the container
         # completion is introduced.
         try:
-            container = await docker_client.containers.run(config=config)
+            if pool is not None:
+                container = await pool.acquire(config)
+            else:
+                container = await docker_client.containers.run(config=config)
         except Exception as e:
             print('Exception', e)
 
         # TODO: error handling?
         self._status = 'STARTED'
-        await update_status(self._status, task_id, session, type='step',
-                            run_endpoint=run_config['run_endpoint'],
-                            uuid=self.properties['uuid'])
+        await self._update_status(task_id, session, run_config, status_buffer)
 
-        data = await container.wait()
+        if pool is not None:
+            status_code = await pool.run(container, config)
+        else:
+            data = await container.wait()
+            status_code = data.get('StatusCode')
 
         # The status code will be 0 for "SUCCESS" and -N otherwise. A
         # negative value -N indicates that the child was terminated
         # by signal N (POSIX only).
-        self._status = 'FAILURE' if data.get('StatusCode') else 'SUCCESS'
-        await update_status(self._status, task_id, session, type='step',
-                            run_endpoint=run_config['run_endpoint'],
-                            uuid=self.properties['uuid'])
+        self._status = 'FAILURE' if status_code else 'SUCCESS'
+        await self._update_status(task_id, session, run_config, status_buffer)
 
         # TODO: get the logs (errors are piped to stdout, thus running
         #       "docker logs" should get them). Find the appropriate
@@ -260,74 +603,22 @@ class PipelineStepRunner:
 
         return self._status
 
-    async def run_children_on_docker(
-            self,
-            docker_client: aiodocker.Docker,
-            session: aiohttp.ClientSession,
-            task_id: str,
-            *,
-            run_config: Dict[str, Any]
-    ) -> Optional[str]:
-        """Runs all children steps after running itself.
-
-        A child run is only started if the step itself has successfully
-        completed.
-
-        Args:
-            docker_client: Docker environment to run containers (async).
-        """
-        # NOTE: construction for sentinel since it cannot run itself (it
-        # is empty).
-        if self.properties:
-            status = await self.run_on_docker(docker_client, session, task_id,
-                                              run_config=run_config)
-        else:
-            status = 'SUCCESS'
-
-        if status == 'SUCCESS':
-            # If the task ran successfully then also try to run its
-            # children.
-            tasks = []
-            for child in self._children:
-                task = child.run_children_on_docker(
-                    docker_client, session, task_id,
-                    run_config=run_config)
-                tasks.append(asyncio.create_task(task))
-
-            res = await asyncio.gather(*tasks)
+    async def _update_status(self,
+                             task_id: str,
+                             session: aiohttp.ClientSession,
+                             run_config: Dict[str, Any],
+                             status_buffer: Optional[StepStatusBuffer]) -> None:
+        if status_buffer is not None:
+            status_buffer.add(self._status, self.properties['uuid'])
+            return
 
-        else:
-            # The task did not run successfully, thus all its children
-            # will be aborted.
-            all_children = set()
-            traversel = self._children.copy()
-            while traversel:
-                child = traversel.pop()
-                if child not in all_children:
-                    all_children.add(child)
-                    traversel.extend(child._children)
-
-            for child in all_children:
-                child._status = 'ABORTED'
-                await update_status('ABORTED', task_id, session, type='step',
-                                    run_endpoint=run_config['run_endpoint'],
-                                    uuid=child.properties['uuid'])
-
-        # If one of the children turns out to fail, then we say the step
-        # itself has failed. Because we start by calling the sentinel node
-        # which is placed at the start of the pipeline.
-        if status != 'SUCCESS' or 'FAILURE' in res:
-            return 'FAILURE'
-
-        return 'SUCCESS'
+        await update_status(self._status, task_id, session, type='step',
+                            run_endpoint=run_config['run_endpoint'],
+                            uuid=self.properties['uuid'])
 
     async def run_on_kubernetes(self):
         pass
 
-    async def run_ancestors_on_kubernetes(self):
-        # Call the run_on_kubernetes internally.
-        pass
-
 
 class PipelineStep(PipelineStepRunner):
     """A step of a pipeline.
@@ -354,15 +645,14 @@ class PipelineStep(PipelineStepRunner):
                   task_id: str,
                   *,
                   run_config: Dict[str, Any],
-                  compute_backend: str = 'docker') -> None:
+                  compute_backend: str = 'docker') -> str:
         """Runs the `PipelineStep` on the given compute backend.
 
         Args:
             runner_client: client to manage the compute backend.
             compute_backend: one of ("docker", "kubernetes").
         """
-        # run_func = getattr(self, f'run_ancestors_on_{compute_backend}')
-        run_func = getattr(self, f'run_children_on_{compute_backend}')
+        run_func = getattr(self, f'run_on_{compute_backend}')
         return await run_func(runner_client, session, task_id,
                               run_config=run_config)
 
@@ -391,6 +681,157 @@ class PipelineStep(PipelineStepRunner):
         return f'Pipelinestep(None)'
 
 
+class StepScheduler:
+    """Schedules the steps of a pipeline in topological order.
+
+    Keeps track of the number of parents of every step that have not
+    yet completed successfully (its in-degree). A step becomes ready
+    once its in-degree drops to zero, i.e. once its last parent has
+    completed successfully, thus every step is ready exactly once.
+
+    Ready steps are prioritized by the length of their critical path,
+    i.e. the longest path (weighted by the duration of the steps) from
+    the step to the end of the pipeline. Starting the steps with the
+    longest critical path first minimizes the time it takes to run the
+    pipeline when not all ready steps can be run in parallel.
+
+    Args:
+        steps: the steps to schedule. Parents and children that are not
+            part of `steps` are ignored.
+        durations: maps the UUIDs of steps to their expected duration in
+            seconds, e.g. from previous runs. Steps without a duration
+            are expected to take the average of the given durations.
+
+    Attributes:
+        status: "FAILURE" if any of the steps has failed, "SUCCESS"
+            otherwise.
+        expected_makespan: the length of the longest critical path, i.e.
+            the time it is expected to take to run all steps if the
+            steps are not limited in how many can run in parallel.
+    """
+
+    def __init__(self,
+                 steps: Iterable[PipelineStep],
+                 durations: Optional[Dict[str, float]] = None) -> None:
+        # Steps are identified by their UUID, since the parents and
+        # children of a step might be copies of the steps (see for
+        # example `Pipeline.get_induced_subgraph`).
+        self._steps: Dict[str, PipelineStep] = {
+            step.properties['uuid']: step for step in steps}
+
+        self._in_degrees: Dict[str, int] = {}
+        self._ready: List[PipelineStep] = []
+        for uuid, step in self._steps.items():
+            in_degree = sum(parent.properties['uuid'] in self._steps
+                            for parent in step.parents)
+            self._in_degrees[uuid] = in_degree
+            if in_degree == 0:
+                self._ready.append(step)
+
+        self._priorities = self._get_priorities(durations or {})
+        self.expected_makespan = max(self._priorities.values(), default=0)
+
+        self.status = 'SUCCESS'
+
+    def _get_children(self, step: PipelineStep) -> List[PipelineStep]:
+        return [self._steps[child.properties['uuid']]
+                for child in step._children
+                if child.properties['uuid'] in self._steps]
+
+    def _get_priorities(self, durations: Dict[str, float]) -> Dict[str, float]:
+        known_durations = [duration for uuid, duration in durations.items()
+                           if uuid in self._steps]
+        if known_durations:
+            default_duration = sum(known_durations) / len(known_durations)
+        else:
+            # Without any durations, the critical path is the path with
+            # the most steps.
+            default_duration = 1
+
+        # Get a topological ordering of the steps.
+        in_degrees = self._in_degrees.copy()
+        order = list(self._ready)
+        for step in order:
+            for child in self._get_children(step):
+                uuid = child.properties['uuid']
+                in_degrees[uuid] -= 1
+                if in_degrees[uuid] == 0:
+                    order.append(child)
+
+        # The critical path of a step is computed after the critical
+        # paths of all its children.
+        priorities: Dict[str, float] = {}
+        for step in reversed(order):
+            uuid = step.properties['uuid']
+            priorities[uuid] = durations.get(uuid, default_duration) + max(
+                (priorities[child.properties['uuid']]
+                 for child in self._get_children(step)),
+                default=0
+            )
+
+        return priorities
+
+    def get_priority(self, step: PipelineStep) -> float:
+        """Returns the length of the critical path of the step."""
+        return self._priorities.get(step.properties['uuid'], 0)
+
+    def has_ready(self) -> bool:
+        return bool(self._ready)
+
+    def pop_ready(self) -> List[PipelineStep]:
+        """Returns all steps that are ready to be run.
+
+        The steps are ordered from highest to lowest priority.
+        """
+        ready, self._ready = self._ready, []
+        ready.sort(key=self.get_priority, reverse=True)
+        return ready
+
+    def complete(self, step: PipelineStep, status: str) -> List[PipelineStep]:
+        """Records the completion of a step.
+
+        On success, the children of which this was the last parent to
+        complete become ready. Otherwise all descendants of the step
+        that are not yet aborted will never run and are aborted.
+
+        Args:
+            step: the step that completed.
+            status: the status of the step, one of ("SUCCESS",
+                "FAILURE").
+
+        Returns:
+            The steps that got aborted.
+        """
+        children = self._get_children(step)
+
+        if status == 'SUCCESS':
+            for child in children:
+                uuid = child.properties['uuid']
+                self._in_degrees[uuid] -= 1
+                if self._in_degrees[uuid] == 0:
+                    self._ready.append(child)
+
+            return []
+
+        self.status = 'FAILURE'
+
+        # A single traversal over the descendants. Steps that were
+        # aborted already (because of another failed ancestor) are not
+        # traversed again, since their descendants are aborted as well.
+        aborted = []
+        stack = children
+        while stack:
+            child = stack.pop()
+            if child._status == 'ABORTED':
+                continue
+
+            child._status = 'ABORTED'
+            aborted.append(child)
+            stack.extend(self._get_children(child))
+
+        return aborted
+
+
 class Pipeline:
     def __init__(self,
                  steps: List[PipelineStep],
@@ -430,7 +871,8 @@ class Pipeline:
 
         properties = {
             'name': description['name'],
-            'uuid': description['uuid']
+            'uuid': description['uuid'],
+            'settings': description.get('settings', {}),
         }
         return cls(list(steps.values()), properties)
 
@@ -451,7 +893,6 @@ class Pipeline:
         to the end of the pipeline (i.e. all steps that do not have
         children will be connected to the sentinel node). By having a
         pointer to the sentinel we can traverse the entire pipeline.
-        This way we can start a run by "running" the sentinel node.
         """
         if self._sentinel is None:
             self._sentinel = PipelineStep({})
@@ -591,18 +1032,197 @@ class Pipeline:
         properties = copy.deepcopy(self.properties)
         return Pipeline(steps=list(steps_to_be_included), properties=properties)
 
+    async def run_on_docker(self,
+                            docker_client: aiodocker.Docker,
+                            session: aiohttp.ClientSession,
+                            task_id: str,
+                            *,
+                            run_config: Dict[str, Any],
+                            admission: Optional[StepAdmission] = None,
+                            pool: Optional[ContainerPool] = None,
+                            cache: Optional[StepCache] = None,
+                            status_buffer: Optional[StepStatusBuffer] = None) -> str:
+        """Runs all steps of the Pipeline, respecting their dependencies.
+
+        Every step is started as soon as its last parent has completed
+        successfully and it is admitted by the `admission`. Ready steps
+        are admitted in order of priority, see `StepScheduler`. Once a
+        step fails, all its descendants are aborted.
+
+        The expected duration of the steps is taken from the
+        "step_durations" of the `run_config` (if given). In that case
+        the expected and actual makespan of the run are reported.
+
+        Args:
+            docker_client: Docker environment to run containers (async).
+            admission: admits steps to run. Defaults to the admission
+                as configured by the `CONFIG_CLASS`.
+            pool: if given, the steps are run inside warm containers of
+                the pool.
+            cache: if given, the outputs of steps are restored from the
+                cache instead of running the steps, and are stored in
+                the cache otherwise.
+            status_buffer: the buffer to add the status updates of the
+                steps to. Defaults to a new buffer that is flushed in
+                the background for the duration of the run.
+
+        Returns:
+            "FAILURE" if any of the steps failed, "SUCCESS" otherwise.
+        """
+        if admission is None:
+            admission = StepAdmission.from_config(CONFIG_CLASS)
+
+        if status_buffer is None:
+            status_buffer = StepStatusBuffer(session, task_id, run_config['run_endpoint'])
+            status_buffer.start()
+            try:
+                return await self.run_on_docker(
+                    docker_client, session, task_id, run_config=run_config,
+                    admission=admission, pool=pool, cache=cache,
+                    status_buffer=status_buffer)
+            finally:
+                await status_buffer.close()
+
+        durations = run_config.get('step_durations')
+        scheduler = StepScheduler(self.steps, durations)
+        start_time = time.monotonic()
+
+        # Steps that are ready, but not yet admitted to run.
+        waiting: List[PipelineStep] = []
+
+        # Maps the running tasks to the step they are running.
+        running: Dict[asyncio.Task, PipelineStep] = {}
+
+        # Bookkeeping of the cache. All map the UUIDs of steps to
+        # respectively their key, the hash of their output and the time
+        # at which they were started.
+        keys: Dict[str, Optional[str]] = {}
+        output_hashes: Dict[str, Optional[str]] = {}
+        started_times: Dict[str, float] = {}
+
+        loop = asyncio.get_event_loop()
+
+        while scheduler.has_ready() or waiting or running:
+            for step in scheduler.pop_ready():
+                if cache is not None and await self._restore_from_cache(
+                        step, cache, keys, output_hashes, status_buffer, task_id):
+                    scheduler.complete(step, 'SUCCESS')
+                    continue
+
+                waiting.append(step)
+
+            # Steps that were restored from the cache can cause other
+            # steps to become ready.
+            if scheduler.has_ready():
+                continue
+
+            waiting.sort(key=scheduler.get_priority, reverse=True)
+
+            # Steps that do not fit are passed over, such that smaller
+            # steps can make use of the remaining capacity.
+            not_admitted = []
+            for step in waiting:
+                if not admission.try_admit(step):
+                    not_admitted.append(step)
+                    continue
+
+                started_times[step.properties['uuid']] = time.time()
+                task = asyncio.create_task(step.run_on_docker(
+                    docker_client, session, task_id, run_config=run_config, pool=pool,
+                    status_buffer=status_buffer))
+                running[task] = step
+            waiting = not_admitted
+
+            if not running:
+                continue
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                step = running.pop(task)
+                admission.release(step)
+
+                step_status = task.result()
+                if cache is not None and step_status == 'SUCCESS':
+                    uuid = step.properties['uuid']
+                    try:
+                        output_hashes[uuid] = await loop.run_in_executor(
+                            None, cache.store, keys.get(uuid), uuid, started_times[uuid])
+                    except Exception as e:
+                        print('Exception', e)
+                        output_hashes[uuid] = None
+
+                aborted = scheduler.complete(step, step_status)
+
+                for aborted_step in aborted:
+                    status_buffer.add('ABORTED', aborted_step.properties['uuid'])
+
+        if durations:
+            print(f'Pipeline run {task_id}: expected makespan of '
+                  f'{scheduler.expected_makespan:.1f}s, actual makespan of '
+                  f'{time.monotonic() - start_time:.1f}s.')
+
+        return scheduler.status
+
+    async def _restore_from_cache(self,
+                                  step: PipelineStep,
+                                  cache: StepCache,
+                                  keys: Dict[str, Optional[str]],
+                                  output_hashes: Dict[str, Optional[str]],
+                                  status_buffer: StepStatusBuffer,
+                                  task_id: str) -> bool:
+        """Restores the output of the step from the cache.
+
+        Returns:
+            True if the output was restored, False otherwise.
+        """
+        uuid = step.properties['uuid']
+
+        loop = asyncio.get_event_loop()
+        try:
+            keys[uuid], output_hash = await loop.run_in_executor(
+                None, cache.restore_step, step.properties, output_hashes)
+        except Exception as e:
+            print('Exception', e)
+            keys[uuid], output_hash = None, None
+
+        if output_hash is None:
+            return False
+
+        output_hashes[uuid] = output_hash
+
+        print(f'Pipeline run {task_id}: restored the output of step {uuid} '
+              'from the cache.')
+        step._status = 'SUCCESS'
+        for status in ['STARTED', 'SUCCESS']:
+            status_buffer.add(status, uuid)
+
+        return True
+
     async def run(self,
                   task_id: str,
                   *,
                   run_config: Dict[str, Any]) -> str:
         """Runs the Pipeline asynchronously.
 
+        The "step-isolation" in the settings of the pipeline determines
+        how steps are isolated from each other. One of:
+            * "container" (default) -> every step runs in a new
+                container.
+            * "clean" -> steps run inside warm containers that are
+                cleaned in between steps, see `ContainerPool`.
+            * "none" -> steps run inside warm containers as is.
+
+        If "step-caching" is enabled in the settings of the pipeline,
+        then the outputs of steps are cached, see `StepCache`.
+
         Args:
             run_config: Configuration of the run. Example
                 {
                     'run_endpoint': 'runs',
                     'pipeline_dir': '/home/../pipelines/uuid',
                     'pipeline_uuid': 'some-uuid',
+                    'local_pipeline_dir': '/userdir/pipelines/uuid',
                 }
 
         Returns:
@@ -618,13 +1238,31 @@ class Pipeline:
         # bound to an asyncio eventloop.
         runner_client = aiodocker.Docker()
 
+        settings = self.properties.get('settings', {})
+
+        # Steps are run inside warm containers, unless every step has to
+        # be isolated in its own container.
+        isolation = settings.get('step-isolation', 'container')
+        pool = None
+        if isolation != 'container':
+            pool = ContainerPool(runner_client, isolation)
+
+        cache = None
+        if settings.get('step-caching', False):
+            cache = StepCache(run_config['local_pipeline_dir'],
+                              CONFIG_CLASS.STEP_CACHE_MAX_SIZE)
+
         async with aiohttp.ClientSession() as session:
             await update_status('STARTED', task_id, session, type='pipeline',
                                 run_endpoint=run_config['run_endpoint'])
 
-            status = await self.sentinel.run(
-                runner_client, session, task_id,
-                run_config=run_config, compute_backend='docker')
+            try:
+                status = await self.run_on_docker(runner_client, session, task_id,
+                                                  run_config=run_config, pool=pool,
+                                                  cache=cache)
+            finally:
+                if pool is not None:
+                    await pool.close()
 
             # NOTE: the status of a pipeline is always success once it is
             # done executing. Errors in steps are reflected by the status
@@ -14,6 +14,7 @@ from app.core.sessions import launch_session
 from config import CONFIG_CLASS
 
 from _orchest.internals import config as _config
+from _orchest.internals.materialize import IGNORED_PATHS, Materializer
 
 
 # TODO: create_app is called twice, meaning create_all (create
@@ -89,6 +90,11 @@ def run_partial(self,
     """
     run_config['pipeline_uuid'] = pipeline_description['uuid']
 
+    # The `pipeline_dir` is the path on the host, whereas the files of
+    # the pipeline are accessed through the mounted userdir.
+    run_config.setdefault('local_pipeline_dir', os.path.join(
+        '/userdir', 'pipelines', pipeline_description['uuid']))
+
     # Get the pipeline to run.
     pipeline = Pipeline.from_json(pipeline_description)
 
@@ -133,11 +139,18 @@ def start_non_interactive_pipeline_run(
     snapshot_dir = os.path.join(experiment_dir, 'snapshot')
     run_dir = os.path.join(experiment_dir, self.request.id)
 
-    # TODO: It should not copy all directories, e.g. not "data".
-    # Copy the contents of `snapshot_dir` to the new (not yet existing
-    # folder) `run_dir` (that will then be created by `copytree`).
-    # copytree(snapshot_dir, run_dir)
-    os.system("cp -R %s %s" % (snapshot_dir, run_dir))
+    # Materialize the `snapshot_dir` as the new (not yet existing)
+    # `run_dir`. Files are reflinked where possible (and hardlinked if
+    # enabled), only the files of the steps are always copied since they
+    # are written to when run, e.g. notebooks. The `pipeline.json` is
+    # written below.
+    step_paths = [step['file_path'] for step in pipeline_description['steps'].values()]
+    materializer = Materializer(
+        allow_hardlinks=CONFIG_CLASS.RUN_DIR_HARDLINKS,
+        copy_paths=step_paths,
+        ignored_paths=IGNORED_PATHS + [_config.PIPELINE_DESCRIPTION_PATH],
+    )
+    materializer.materialize(snapshot_dir, run_dir)
 
     # Update the `run_config` for the interactive pipeline run. The
     # pipeline run should execute on the `run_dir` as its
@@ -156,10 +169,10 @@ def start_non_interactive_pipeline_run(
     run_config['pipeline_dir'] = os.path.join(host_base_user_dir, run_dir[1:])
     run_config['run_endpoint'] = f'experiments/{experiment_uuid}'
     run_config['pipeline_uuid'] = pipeline_uuid
+    run_config['local_pipeline_dir'] = run_dir
 
-    # Overwrite the `pipeline.json`, that was copied from the snapshot,
-    # with the new `pipeline.json` that contains the new parameters for
-    # every step.
+    # Write the `pipeline.json`, that is not materialized from the
+    # snapshot, with the new parameters for every step.
     pipeline_json = os.path.join(run_dir, _config.PIPELINE_DESCRIPTION_PATH)
     with open(pipeline_json, 'w') as f:
         json.dump(pipeline_description, f)
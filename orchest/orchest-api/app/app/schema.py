@@ -161,6 +161,24 @@ status_update = Model('StatusUpdate', {
         enum=['PENDING', 'STARTED', 'SUCCESS', 'FAILURE', 'ABORTED', 'REVOKED']),
 })
 
+step_status_update = status_update.inherit('StepStatusUpdate', {
+    'step_uuid': fields.String(
+        required=True,
+        description='UUID of the pipeline step'),
+    'started_time': fields.String(
+        required=False,
+        description='Time at which the step started executing'),
+    'finished_time': fields.String(
+        required=False,
+        description='Time at which the step finished executing'),
+})
+
+step_status_updates = Model('StepStatusUpdates', {
+    'steps': fields.List(
+        fields.Nested(step_status_update),
+        description='New statuses of the pipeline steps of a run'),
+})
+
 # Namespace: Experiments.
 non_interactive_run_config = pipeline_run_config.inherit('NonInteractiveRunConfig', {
     # Needed for the celery-worker to set the new pipeline-dir for
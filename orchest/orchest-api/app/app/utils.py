@@ -1,10 +1,12 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 
 from flask_restplus import Model, Namespace
 
 from app import schema
 from app.connections import db
+import app.models as models
 
 
 def register_schema(api: Namespace) -> Namespace:
@@ -46,3 +48,75 @@ def update_status_db(status_update: Dict[str, str],
         db.session.commit()
 
     return
+
+
+def update_step_statuses_db(status_updates: List[Dict[str, str]],
+                            model: Model,
+                            filter_by: Dict[str, str]) -> None:
+    """Updates the statuses of multiple steps in a single transaction.
+
+    Args:
+        status_updates: The new statuses of the steps, e.g.
+            [{'step_uuid': 'uuid', 'status': 'STARTED',
+              'started_time': '2020-01-01T00:00:00'}]. Multiple updates
+            of the same step are applied in order.
+        model: Database model of the steps to update the statuses of.
+        filter_by: The primary key, apart from the `step_uuid`, of the
+            steps, e.g. {'run_uuid': 'uuid'}.
+
+    """
+    mappings = {}
+    for status_update in status_updates:
+        data = dict(status_update)
+        for key in ['started_time', 'finished_time']:
+            if data.get(key) is not None:
+                data[key] = datetime.fromisoformat(data[key])
+
+        mapping = mappings.setdefault(data['step_uuid'], dict(filter_by))
+        mapping.update(data)
+
+    db.session.bulk_update_mappings(model, list(mappings.values()))
+    db.session.commit()
+
+
+def get_step_durations(pipeline_uuid: str, limit: int = 1000) -> Dict[str, float]:
+    """Returns the durations of the steps of a pipeline in previous runs.
+
+    Only steps that completed successfully are taken into account.
+
+    Args:
+        pipeline_uuid: UUID of the pipeline.
+        limit: the maximum number of most recent step runs to take into
+            account, for interactive and non-interactive runs each.
+
+    Returns:
+        Maps the UUIDs of the steps to their average duration in
+        seconds. Steps that have not yet run successfully are omitted.
+    """
+    durations = defaultdict(list)
+
+    model_pairs = [
+        (models.InteractiveRun, models.InteractiveRunPipelineStep),
+        (models.NonInteractiveRun, models.NonInteractiveRunPipelineStep),
+    ]
+    for run_model, step_model in model_pairs:
+        step_runs = (
+            step_model.query
+            .join(run_model, step_model.run_uuid == run_model.run_uuid)
+            .filter(run_model.pipeline_uuid == pipeline_uuid,
+                    step_model.status == 'SUCCESS',
+                    step_model.started_time.isnot(None),
+                    step_model.finished_time.isnot(None))
+            .order_by(step_model.finished_time.desc())
+            .with_entities(step_model.step_uuid,
+                           step_model.started_time,
+                           step_model.finished_time)
+            .limit(limit)
+        )
+
+        for step_uuid, started_time, finished_time in step_runs:
+            duration = (finished_time - started_time).total_seconds()
+            durations[step_uuid].append(duration)
+
+    return {uuid: sum(step_durations) / len(step_durations)
+            for uuid, step_durations in durations.items()}
@@ -15,6 +15,34 @@ class Config:
     # TODO: for now this is put here.
     ORCHEST_API_ADDRESS = 'http://orchest-api:80/api'
 
+    # ---- Pipeline run configurations ----
+    # Maximum number of steps of a pipeline run that run in parallel.
+    # None means no limit.
+    MAX_PARALLEL_STEPS = None
+
+    # Capacity of the host that is available to the steps of a pipeline
+    # run. The "vcpus" and "memory" (in megabytes) that steps request
+    # are admitted against it. None means the capacity of the host is
+    # used.
+    HOST_VCPUS = None
+    HOST_MEMORY = None
+
+    # Maximum size in bytes of the cache of step outputs per pipeline
+    # (if "step-caching" is enabled in the settings of the pipeline).
+    STEP_CACHE_MAX_SIZE = 10 * (1 << 30)
+
+    # Interval in seconds at which the status updates of the steps of a
+    # pipeline run are sent to the orchest-api in a single request.
+    STEP_STATUS_FLUSH_INTERVAL = 0.5
+
+    # Whether the files of the experiment snapshot are hardlinked into
+    # the directory of a pipeline run if the filesystem does not support
+    # reflinks, instead of being copied. Only enable this if steps never
+    # write to files in place (other than the files of the steps
+    # themselves), since those writes would end up in the snapshot and
+    # in all other runs of the experiment.
+    RUN_DIR_HARDLINKS = False
+
     # ---- Celery configurations ----
     # NOTE: the configurations have to be lowercase.
     # NOTE: Flask will not configure lowercase variables. Therefore the
@@ -0,0 +1,107 @@
+"""Benchmark materializing the directories of pipeline runs.
+
+Run from the ``orchest/orchest-api/app`` directory:
+
+    python tests/benchmarks/bench_materialize.py [directory]
+
+Creates a large snapshot (``NUM_FILES`` files of ``FILE_BYTES`` each,
+and ``DATA_BYTES`` of step outputs in ``.orchest/data``) inside the
+given directory (defaults to a temporary directory) and materializes
+``NUM_RUNS`` run directories from it with:
+
+* ``cp -R``: as was done before.
+* ``copy``: copying all files, excluding the ignored paths.
+* ``link``: reflinks if the filesystem of the directory supports them,
+  hardlinks otherwise.
+
+Reported are the time per run directory and the disk usage of all run
+directories.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from _orchest.internals import config as _config
+from _orchest.internals.materialize import Materializer
+
+
+MEGABYTE = 1 << 20
+NUM_FILES = 1000
+FILE_BYTES = 256 * 1024
+DATA_BYTES = 256 * MEGABYTE
+NUM_RUNS = 10
+
+
+def create_snapshot(snapshot_dir):
+    for i in range(NUM_FILES):
+        directory = os.path.join(snapshot_dir, f'dir-{i % 10}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'file-{i}.csv'), 'wb') as f:
+            f.write(os.urandom(FILE_BYTES))
+
+    step_data_dir = os.path.join(snapshot_dir, _config.DATA_PATH, 'uuid-1')
+    os.makedirs(step_data_dir)
+    with open(os.path.join(step_data_dir, 'uuid-1.pickle5'), 'wb') as f:
+        f.write(os.urandom(DATA_BYTES))
+
+
+def disk_usage(directory):
+    # Hardlinks are only counted once, like `du` does.
+    inodes = set()
+    usage = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            stat = os.lstat(os.path.join(root, name))
+            if stat.st_ino not in inodes:
+                inodes.add(stat.st_ino)
+                usage += stat.st_blocks * 512
+    return usage
+
+
+def measure(snapshot_dir, runs_dir, mode):
+    os.makedirs(runs_dir)
+
+    stats = None
+    start = time.perf_counter()
+    for i in range(NUM_RUNS):
+        run_dir = os.path.join(runs_dir, f'run-{i}')
+        if mode == 'cp -R':
+            subprocess.run(['cp', '-R', snapshot_dir, run_dir], check=True)
+            continue
+
+        materializer = Materializer(allow_hardlinks=mode == 'link')
+        if mode == 'copy':
+            # Never reflink.
+            materializer._reflinks = False
+        stats = materializer.materialize(snapshot_dir, run_dir)
+    elapsed = time.perf_counter() - start
+
+    # Snapshot files are only counted for the runs if they are copied.
+    usage = disk_usage(runs_dir) if mode != 'link' else (
+        disk_usage(os.path.dirname(runs_dir)) - disk_usage(snapshot_dir))
+    shutil.rmtree(runs_dir)
+    return elapsed / NUM_RUNS, usage, stats
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp_dir:
+        snapshot_dir = os.path.join(tmp_dir, 'snapshot')
+        create_snapshot(snapshot_dir)
+        print(f'snapshot: {NUM_FILES} files, '
+              f'{disk_usage(snapshot_dir) / MEGABYTE:.0f} MB')
+
+        print(f'{"mode":<8}{"per run (ms)":<14}{"disk usage (MB)":<17}{"files":<40}')
+        for mode in ['cp -R', 'copy', 'link']:
+            runs_dir = os.path.join(tmp_dir, 'runs')
+            latency, usage, stats = measure(snapshot_dir, runs_dir, mode)
+            print(f'{mode:<8}{latency * 1e3:<14.1f}{usage / MEGABYTE:<17.1f}'
+                  f'{str(stats or ""):<40}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark the scheduling of pipeline steps on synthetic pipelines.
+
+Run from the ``orchest/orchest-api/app`` directory:
+
+    python tests/benchmarks/bench_scheduler.py
+
+Steps are run with mocked containers that complete instantly, thus the
+reported times are the overhead of scheduling. The pipelines are:
+
+* ``wide``: a root with ``n`` children, that are all joined by a sink.
+* ``deep``: a chain of ``n`` steps.
+* ``layered``: layers of ``LAYER_WIDTH`` steps where every step has
+  ``MAX_INCOMING_CONNECTIONS`` random parents in the previous layer.
+
+Reported are the time per step of the bookkeeping of the
+:class:`StepScheduler` alone, the time per step of a complete run, and
+the number of container launches per step (which is exactly one).
+"""
+import asyncio
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+from app.core import pipelines  # noqa: E402
+from app.core.pipelines import Pipeline, StepScheduler  # noqa: E402
+
+
+NUM_STEPS = [100, 1000, 10000]
+LAYER_WIDTH = 50
+MAX_INCOMING_CONNECTIONS = 3
+
+
+def wide(num_steps):
+    steps = {'root': [], 'sink': [f'step-{i}' for i in range(num_steps - 2)]}
+    for i in range(num_steps - 2):
+        steps[f'step-{i}'] = ['root']
+    return steps
+
+
+def deep(num_steps):
+    steps = {'step-0': []}
+    for i in range(1, num_steps):
+        steps[f'step-{i}'] = [f'step-{i - 1}']
+    return steps
+
+
+def layered(num_steps):
+    steps = {}
+    for i in range(num_steps):
+        layer = i // LAYER_WIDTH
+        if layer == 0:
+            steps[f'step-{i}'] = []
+            continue
+
+        previous = range((layer - 1) * LAYER_WIDTH, layer * LAYER_WIDTH)
+        sources = random.sample(previous, MAX_INCOMING_CONNECTIONS)
+        steps[f'step-{i}'] = [f'step-{source}' for source in sources]
+    return steps
+
+
+def to_pipeline(steps):
+    description = {
+        'name': 'pipeline-name',
+        'uuid': 'pipeline-uuid',
+        'steps': {
+            uuid: {
+                'incoming_connections': incoming,
+                'name': uuid,
+                'uuid': uuid,
+                'file_path': '',
+                'image': '',
+            }
+            for uuid, incoming in steps.items()
+        }
+    }
+    return Pipeline.from_json(description)
+
+
+class MockContainer:
+    async def wait(self):
+        return {'StatusCode': 0}
+
+
+class MockContainers:
+    def __init__(self):
+        self.launches = 0
+
+    async def run(self, config):
+        self.launches += 1
+        return MockContainer()
+
+
+class MockDocker:
+    def __init__(self):
+        self.containers = MockContainers()
+
+
+def measure_scheduler(pipeline):
+    start = time.perf_counter()
+    scheduler = StepScheduler(pipeline.steps)
+    while scheduler.has_ready():
+        for step in scheduler.pop_ready():
+            scheduler.complete(step, 'SUCCESS')
+    return time.perf_counter() - start
+
+
+def measure_run(pipeline):
+    docker_client = MockDocker()
+    run_config = {'pipeline_dir': None, 'run_endpoint': None}
+
+    start = time.perf_counter()
+    status = asyncio.run(
+        pipeline.run_on_docker(docker_client, None, 'task-id', run_config=run_config))
+    elapsed = time.perf_counter() - start
+
+    assert status == 'SUCCESS'
+    return elapsed, docker_client.containers.launches
+
+
+def main():
+    random.seed(0)
+
+    async def mock_update_status(*args, **kwargs):
+        return
+
+    async def mock_update_step_statuses(*args, **kwargs):
+        return
+
+    pipelines.update_status = mock_update_status
+    pipelines.update_step_statuses = mock_update_step_statuses
+    pipelines.get_dynamic_mounts = lambda *args, **kwargs: None
+
+    print(f'{"shape":<9}{"steps":<8}{"scheduler (us/step)":<21}{"run (us/step)":<15}'
+          f'{"launches/step":<13}')
+    for shape in [wide, deep, layered]:
+        for num_steps in NUM_STEPS:
+            pipeline = to_pipeline(shape(num_steps))
+
+            scheduler_time = measure_scheduler(pipeline)
+            run_time, launches = measure_run(pipeline)
+
+            print(f'{shape.__name__:<9}{num_steps:<8}'
+                  f'{scheduler_time / num_steps * 1e6:<21.2f}'
+                  f'{run_time / num_steps * 1e6:<15.2f}'
+                  f'{launches / num_steps:<13.2f}')
+
+
+if __name__ == '__main__':
+    main()
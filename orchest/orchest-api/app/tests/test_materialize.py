@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from _orchest.internals import materialize
+from _orchest.internals.materialize import Materializer
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    snapshot_dir = tmp_path / 'snapshot'
+    files = {
+        'step.ipynb': 'notebook',
+        'utils.py': 'utils',
+        'data/large.csv': 'a,b,c',
+        '.orchest/pipeline.json': '{}',
+        '.orchest/kernels/kernel.json': '{}',
+        '.orchest/data/uuid-1/HEAD': 'head',
+        '.orchest/logs/uuid-1.log': 'log',
+        '.ipynb_checkpoints/step-checkpoint.ipynb': 'checkpoint',
+    }
+    for path, content in files.items():
+        (snapshot_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (snapshot_dir / path).write_text(content)
+    os.symlink('utils.py', snapshot_dir / 'link.py')
+
+    return snapshot_dir
+
+
+def list_files(directory):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), directory)
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+@pytest.mark.parametrize('reflinks', [True, False])
+@pytest.mark.parametrize('allow_hardlinks', [True, False])
+def test_materialize(snapshot_dir, tmp_path, monkeypatch, reflinks, allow_hardlinks):
+    if not reflinks:
+        def mock_reflink(src, dst):
+            raise OSError(materialize.errno.EOPNOTSUPP, 'Not supported')
+
+        monkeypatch.setattr(materialize, 'reflink', mock_reflink)
+
+    run_dir = tmp_path / 'run'
+    materializer = Materializer(allow_hardlinks=allow_hardlinks, copy_paths=['step.ipynb'])
+    stats = materializer.materialize(str(snapshot_dir), str(run_dir))
+
+    assert list_files(run_dir) == [
+        '.orchest/kernels/kernel.json',
+        '.orchest/pipeline.json',
+        'data/large.csv',
+        'link.py',
+        'step.ipynb',
+        'utils.py',
+    ]
+    assert os.readlink(run_dir / 'link.py') == 'utils.py'
+    assert sum(stats.values()) == 5
+
+    # Writing to files that are always copied does not change the
+    # snapshot.
+    (run_dir / 'step.ipynb').write_text('executed notebook')
+    assert (snapshot_dir / 'step.ipynb').read_text() == 'notebook'
+
+    is_hardlink = os.path.samefile(run_dir / 'utils.py', snapshot_dir / 'utils.py')
+    if reflinks and stats['reflink']:
+        assert not is_hardlink
+    elif allow_hardlinks:
+        assert is_hardlink
+        assert stats == {'reflink': 0, 'hardlink': 4, 'copy': 1}
+    else:
+        assert not is_hardlink
+        assert stats == {'reflink': 0, 'hardlink': 0, 'copy': 5}
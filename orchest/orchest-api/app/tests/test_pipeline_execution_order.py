@@ -9,12 +9,13 @@ The pipeline looks as follows:
 """
 import asyncio
 import json
+import os
 
 from aiodocker.containers import DockerContainer, DockerContainers
 import pytest
 
 from app.core import pipelines
-from app.core.pipelines import Pipeline
+from app.core.pipelines import Pipeline, StepAdmission, StepScheduler, StepStatusBuffer
 
 
 class IO:
@@ -56,7 +57,41 @@ class MockDockerContainer:
         return {'StatusCode': 0}
 
 
-def test_pipeline_run_call_order(testio, monkeypatch):
+@pytest.fixture
+def step_status_updates(monkeypatch):
+    """Mocks the calls to the orchest-api made while running a pipeline.
+
+    Returns the list the step status updates are appended to.
+    """
+    async def mockreturn_update_status(*args, **kwargs):
+        return
+
+    async def mockreturn_update_step_statuses(updates, *args, **kwargs):
+        step_status_updates.extend(updates)
+
+    def mock_get_dynamic_mounts(*args, **kwargs):
+        return
+
+    step_status_updates = []
+
+    monkeypatch.setattr(pipelines, 'update_status', mockreturn_update_status)
+    monkeypatch.setattr(pipelines, 'update_step_statuses',
+                        mockreturn_update_step_statuses)
+    monkeypatch.setattr(pipelines, 'get_dynamic_mounts', mock_get_dynamic_mounts)
+
+    return step_status_updates
+
+
+def final_statuses(step_status_updates):
+    """Returns the statuses, other than STARTED, that each step got."""
+    statuses = {}
+    for update in step_status_updates:
+        if update['status'] != 'STARTED':
+            statuses.setdefault(update['step_uuid'], []).append(update['status'])
+    return statuses
+
+
+def test_pipeline_run_call_order(testio, step_status_updates, monkeypatch):
     async def mockreturn_run(*args, **kwargs):
         # It gets the config that get's passed to the
         # `aiodocker.Docker().containers.run(config=config)`
@@ -66,19 +101,11 @@ def test_pipeline_run_call_order(testio, monkeypatch):
 
         return mock_class
 
-    async def mockreturn_update_status(*args, **kwargs):
-        return
-
-    def mock_get_dynamic_mounts(*args, **kwargs):
-        return
-
     # We use that the class will point to the same object list to write
     # the calling order to.
     execution_order = []
 
     monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
-    monkeypatch.setattr(pipelines, 'update_status', mockreturn_update_status)
-    monkeypatch.setattr(pipelines, 'get_dynamic_mounts', mock_get_dynamic_mounts)
 
     filler_for_task_id = '1'
     run_config = {
@@ -88,3 +115,490 @@ def test_pipeline_run_call_order(testio, monkeypatch):
     asyncio.run(testio.pipeline.run(filler_for_task_id, run_config=run_config))
 
     assert execution_order == testio.correct_execution_order
+
+
+def diamond_description(num_parents):
+    """A pipeline of a step with `num_parents` parents and one child.
+
+    The pipeline looks as follows:
+        root --> parent-0 --> join --> leaf
+             |            |
+               --> ...  --
+             |            |
+               --> parent-(n-1)
+    """
+    steps = {
+        'root': [],
+        'join': [f'parent-{i}' for i in range(num_parents)],
+        'leaf': ['join'],
+    }
+    for i in range(num_parents):
+        steps[f'parent-{i}'] = ['root']
+
+    return {
+        'name': 'pipeline-name',
+        'uuid': 'pipeline-uuid',
+        'steps': {
+            uuid: {
+                'incoming_connections': incoming,
+                'name': uuid,
+                'uuid': uuid,
+                'file_path': '',
+                'image': 0,
+            }
+            for uuid, incoming in steps.items()
+        }
+    }
+
+
+def test_step_scheduler_in_degrees():
+    pipeline = Pipeline.from_json(diamond_description(3))
+    steps = {step.properties['uuid']: step for step in pipeline.steps}
+    scheduler = StepScheduler(pipeline.steps)
+
+    assert scheduler.pop_ready() == [steps['root']]
+    assert not scheduler.has_ready()
+
+    scheduler.complete(steps['root'], 'SUCCESS')
+    parents = scheduler.pop_ready()
+    assert sorted(step.properties['uuid'] for step in parents) == [
+        'parent-0', 'parent-1', 'parent-2']
+
+    # The join only becomes ready once its last parent has completed.
+    scheduler.complete(steps['parent-0'], 'SUCCESS')
+    scheduler.complete(steps['parent-1'], 'SUCCESS')
+    assert not scheduler.has_ready()
+
+    scheduler.complete(steps['parent-2'], 'SUCCESS')
+    assert scheduler.pop_ready() == [steps['join']]
+    assert scheduler.status == 'SUCCESS'
+
+
+def test_step_scheduler_abort():
+    pipeline = Pipeline.from_json(diamond_description(3))
+    steps = {step.properties['uuid']: step for step in pipeline.steps}
+    scheduler = StepScheduler(pipeline.steps)
+
+    scheduler.complete(steps['root'], 'SUCCESS')
+    scheduler.pop_ready()
+
+    aborted = scheduler.complete(steps['parent-0'], 'FAILURE')
+    assert sorted(step.properties['uuid'] for step in aborted) == ['join', 'leaf']
+    assert scheduler.status == 'FAILURE'
+
+    # Descendants are only aborted once.
+    assert scheduler.complete(steps['parent-1'], 'FAILURE') == []
+    scheduler.complete(steps['parent-2'], 'SUCCESS')
+    assert not scheduler.has_ready()
+
+
+@pytest.mark.parametrize('failing_uuid,correct_statuses', [
+    (None, {'root': 'SUCCESS', 'parent-0': 'SUCCESS', 'parent-1': 'SUCCESS',
+            'parent-2': 'SUCCESS', 'join': 'SUCCESS', 'leaf': 'SUCCESS'}),
+    ('parent-1', {'root': 'SUCCESS', 'parent-0': 'SUCCESS', 'parent-1': 'FAILURE',
+                  'parent-2': 'SUCCESS', 'join': 'ABORTED', 'leaf': 'ABORTED'}),
+    ('root', {'root': 'FAILURE', 'parent-0': 'ABORTED', 'parent-1': 'ABORTED',
+              'parent-2': 'ABORTED', 'join': 'ABORTED', 'leaf': 'ABORTED'}),
+])
+def test_pipeline_run_statuses(failing_uuid, correct_statuses, step_status_updates,
+                               monkeypatch):
+    class MockFailingDockerContainer:
+        def __init__(self, uuid):
+            self.uuid = uuid
+
+        async def wait(self):
+            await asyncio.sleep(0)
+            return {'StatusCode': int(self.uuid == failing_uuid)}
+
+    async def mockreturn_run(*args, **kwargs):
+        uuid = kwargs['config']['tests-uuid']
+        runs.append(uuid)
+        return MockFailingDockerContainer(uuid)
+
+    runs = []
+
+    monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
+
+    pipeline = Pipeline.from_json(diamond_description(3))
+    run_config = {
+        'pipeline_dir': None,
+        'run_endpoint': None
+    }
+    status = asyncio.run(pipeline.run('1', run_config=run_config))
+
+    # Every step is run at most once and gets exactly one final status.
+    assert len(runs) == len(set(runs))
+    assert final_statuses(step_status_updates) == {
+        uuid: [status] for uuid, status in correct_statuses.items()}
+    assert status == ('SUCCESS' if failing_uuid is None else 'FAILURE')
+
+
+def test_step_admission():
+    pipeline = Pipeline.from_json(diamond_description(3))
+    steps = {step.properties['uuid']: step for step in pipeline.steps}
+    steps['parent-0'].properties.update({'vcpus': '2', 'memory': '1024'})
+    steps['parent-1'].properties.update({'vcpus': '1', 'memory': '512'})
+    steps['parent-2'].properties.update({'vcpus': '8'})
+
+    admission = StepAdmission(max_parallel_steps=3, vcpus=3, memory=1 << 30)
+    assert admission.try_admit(steps['parent-0'])
+
+    # Exceeds the memory of the host.
+    assert not admission.try_admit(steps['parent-1'])
+
+    # Steps that do not request resources are only limited by the
+    # maximum number of parallel steps.
+    assert admission.try_admit(steps['root'])
+    assert admission.try_admit(steps['join'])
+    assert not admission.try_admit(steps['leaf'])
+
+    admission.release(steps['parent-0'])
+    admission.release(steps['root'])
+    admission.release(steps['join'])
+
+    # A step that exceeds the capacity is run once no other step runs.
+    assert admission.try_admit(steps['parent-2'])
+    assert not admission.try_admit(steps['parent-1'])
+    admission.release(steps['parent-2'])
+    assert admission.try_admit(steps['parent-1'])
+
+
+def test_pipeline_run_max_parallel_steps(step_status_updates, monkeypatch):
+    class MockCountingDockerContainer:
+        async def wait(self):
+            await asyncio.sleep(0.01)
+            parallel_steps.pop()
+            return {'StatusCode': 0}
+
+    async def mockreturn_run(*args, **kwargs):
+        configs.append(kwargs['config'])
+        parallel_steps.append(None)
+        max_parallel_steps.append(len(parallel_steps))
+        return MockCountingDockerContainer()
+
+    configs = []
+    parallel_steps = []
+    max_parallel_steps = []
+
+    monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
+    monkeypatch.setattr(pipelines.CONFIG_CLASS, 'MAX_PARALLEL_STEPS', 2)
+
+    description = diamond_description(5)
+    description['steps']['join'].update({'vcpus': '0.5', 'memory': '256'})
+    pipeline = Pipeline.from_json(description)
+    run_config = {
+        'pipeline_dir': None,
+        'run_endpoint': None
+    }
+    status = asyncio.run(pipeline.run('1', run_config=run_config))
+
+    assert status == 'SUCCESS'
+    assert len(configs) == 8
+    assert max(max_parallel_steps) == 2
+
+    host_configs = {config['tests-uuid']: config['HostConfig'] for config in configs}
+    assert host_configs['join']['NanoCpus'] == 500000000
+    assert host_configs['join']['Memory'] == 256 * (1 << 20)
+    assert 'Memory' not in host_configs['root']
+
+
+def test_step_scheduler_priorities():
+    pipeline = Pipeline.from_json(diamond_description(2))
+    steps = {step.properties['uuid']: step for step in pipeline.steps}
+
+    # Without durations the critical path has the most steps.
+    scheduler = StepScheduler(pipeline.steps)
+    assert scheduler.get_priority(steps['root']) == 4
+    assert scheduler.get_priority(steps['parent-0']) == 3
+    assert scheduler.expected_makespan == 4
+
+    durations = {'root': 1, 'parent-0': 2, 'parent-1': 10, 'join': 3}
+    scheduler = StepScheduler(pipeline.steps, durations)
+    assert scheduler.get_priority(steps['parent-0']) == 2 + 3 + 4
+    assert scheduler.get_priority(steps['parent-1']) == 10 + 3 + 4
+    assert scheduler.expected_makespan == 1 + 10 + 3 + 4
+
+    assert scheduler.pop_ready() == [steps['root']]
+    scheduler.complete(steps['root'], 'SUCCESS')
+    assert scheduler.pop_ready() == [steps['parent-1'], steps['parent-0']]
+
+
+def test_pipeline_run_critical_path_first(step_status_updates, monkeypatch):
+    async def mockreturn_run(*args, **kwargs):
+        execution_order.append(kwargs['config']['tests-uuid'])
+        return MockDockerContainer(0, None, [])
+
+    execution_order = []
+
+    monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
+    monkeypatch.setattr(pipelines.CONFIG_CLASS, 'MAX_PARALLEL_STEPS', 1)
+
+    # The pipeline looks as follows:
+    #   short --> long
+    #   medium
+    steps = {'short': [], 'long': ['short'], 'medium': []}
+    description = {
+        'name': 'pipeline-name',
+        'uuid': 'pipeline-uuid',
+        'steps': {
+            uuid: {
+                'incoming_connections': incoming,
+                'name': uuid,
+                'uuid': uuid,
+                'file_path': '',
+                'image': 0,
+            }
+            for uuid, incoming in steps.items()
+        }
+    }
+    pipeline = Pipeline.from_json(description)
+    run_config = {
+        'pipeline_dir': None,
+        'run_endpoint': None,
+        'step_durations': {'short': 1, 'long': 10, 'medium': 5},
+    }
+    asyncio.run(pipeline.run('1', run_config=run_config))
+
+    assert execution_order == ['short', 'long', 'medium']
+
+
+@pytest.mark.parametrize('isolation', ['clean', 'none'])
+def test_pipeline_run_container_pool(isolation, step_status_updates, monkeypatch):
+    class MockStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return
+
+        async def read_out(self):
+            await asyncio.sleep(0.01)
+            return None
+
+    class MockExec:
+        def __init__(self, cmd):
+            self.cmd = cmd
+
+        def start(self, detach):
+            return MockStream()
+
+        async def inspect(self):
+            return {'ExitCode': int(self.cmd[-1] == 'failing.py')}
+
+    class MockPoolContainer:
+        def __init__(self):
+            self.deleted = False
+
+        async def exec(self, cmd, environment):
+            execs.append((self, cmd, environment))
+            return MockExec(cmd)
+
+        async def delete(self, force):
+            self.deleted = True
+
+    async def mockreturn_run(*args, **kwargs):
+        container = MockPoolContainer()
+        containers.append((container, kwargs['config']))
+        return container
+
+    containers = []
+    execs = []
+
+    monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
+
+    description = diamond_description(2)
+    description['settings'] = {'step-isolation': isolation}
+    description['steps']['leaf']['image'] = 1
+    description['steps']['leaf']['file_path'] = 'failing.py'
+    pipeline = Pipeline.from_json(description)
+    run_config = {
+        'pipeline_dir': None,
+        'run_endpoint': None
+    }
+    status = asyncio.run(pipeline.run('1', run_config=run_config))
+    assert status == 'FAILURE'
+
+    # Two containers for the parallel parents of the image of most
+    # steps and one for the image of the leaf.
+    assert len(containers) == 3
+    assert all(config['Cmd'] == ['/orchest/bootscript.sh', 'idle']
+               for _, config in containers)
+    assert all(container.deleted for container, _ in containers)
+
+    step_execs = [(container, env) for container, cmd, env in execs
+                  if cmd[1] == 'runnable']
+    assert sorted(env[0] for _, env in step_execs) == [
+        f'STEP_UUID={uuid}' for uuid in sorted(description['steps'])]
+    assert step_execs[-1][0] is containers[-1][0]
+
+    clean_execs = [cmd for _, cmd, _ in execs if cmd[1] == 'clean']
+    assert len(clean_execs) == (len(step_execs) if isolation == 'clean' else 0)
+
+
+def test_pipeline_run_step_caching(tmp_path, step_status_updates, monkeypatch):
+    class MockOutputtingDockerContainer:
+        def __init__(self, uuid):
+            self.uuid = uuid
+
+        async def wait(self):
+            # Steps without an output cannot be cached.
+            if self.uuid != 'leaf':
+                step_data_dir = tmp_path / '.orchest' / 'data' / self.uuid
+                step_data_dir.mkdir(parents=True, exist_ok=True)
+                output = (tmp_path / f'{self.uuid}.py').read_text()
+                (step_data_dir / f'{self.uuid}.pickle5').write_text(output)
+                (step_data_dir / 'HEAD').write_text('2020-01-01T00:00:00, pickle5')
+
+            return {'StatusCode': 0}
+
+    async def mockreturn_run(*args, **kwargs):
+        uuid = kwargs['config']['tests-uuid']
+        runs.append(uuid)
+        return MockOutputtingDockerContainer(uuid)
+
+    monkeypatch.setattr(DockerContainers, 'run', mockreturn_run)
+
+    description = diamond_description(2)
+    description['settings'] = {'step-caching': True}
+    for step in description['steps'].values():
+        step['file_path'] = f'{step["uuid"]}.py'
+        (tmp_path / step['file_path']).write_text(step['uuid'])
+
+    (tmp_path / '.orchest').mkdir()
+    (tmp_path / '.orchest' / 'pipeline.json').write_text(json.dumps(description))
+
+    run_config = {
+        'pipeline_dir': None,
+        'run_endpoint': None,
+        'local_pipeline_dir': str(tmp_path),
+    }
+
+    def run():
+        runs.clear()
+        step_status_updates.clear()
+        pipeline = Pipeline.from_json(description)
+        assert asyncio.run(pipeline.run('1', run_config=run_config)) == 'SUCCESS'
+        assert all(statuses == ['SUCCESS']
+                   for statuses in final_statuses(step_status_updates).values())
+        return sorted(runs)
+
+    runs = []
+
+    assert run() == sorted(description['steps'])
+
+    # Only the step without an output has to run again.
+    assert run() == ['leaf']
+
+    # Changing a step invalidates the step and its descendants.
+    (tmp_path / 'parent-0.py').write_text('changed')
+    assert run() == ['join', 'leaf', 'parent-0']
+    assert len(os.listdir(tmp_path / '.orchest' / 'cache')) == 6
+
+    # Descendants are not run again if the output of the changed step
+    # stays the same.
+    description['steps']['parent-0']['parameters'] = {'unused': True}
+    assert run() == ['leaf', 'parent-0']
+
+
+def test_step_status_buffer(monkeypatch):
+    async def mockreturn_update_step_statuses(updates, *args, **kwargs):
+        if fail:
+            raise Exception('orchest-api is unavailable')
+        requests.append(updates)
+
+    requests = []
+    fail = False
+
+    monkeypatch.setattr(pipelines, 'update_step_statuses',
+                        mockreturn_update_step_statuses)
+
+    async def run():
+        nonlocal fail
+
+        buffer = StepStatusBuffer(None, '1', 'runs', flush_interval=60)
+
+        # Updates of the same step are coalesced.
+        buffer.add('STARTED', 'step-1')
+        buffer.add('SUCCESS', 'step-1')
+        buffer.add('STARTED', 'step-2')
+        await buffer.flush()
+
+        [updates] = requests
+        assert [update['step_uuid'] for update in updates] == ['step-1', 'step-2']
+        assert updates[0]['status'] == 'SUCCESS'
+        assert {'started_time', 'finished_time'} <= set(updates[0])
+        assert updates[1]['status'] == 'STARTED'
+
+        # Nothing is sent if there are no pending updates.
+        await buffer.flush()
+        assert len(requests) == 1
+
+        # Failed updates are retried, without overwriting more recent
+        # updates.
+        fail = True
+        buffer.add('STARTED', 'step-3')
+        await buffer.flush()
+        buffer.add('FAILURE', 'step-3')
+
+        fail = False
+        buffer.start()
+        await buffer.close()
+
+        updates = requests[-1]
+        assert len(requests) == 2
+        assert updates[0]['step_uuid'] == 'step-3'
+        assert updates[0]['status'] == 'FAILURE'
+        assert {'started_time', 'finished_time'} <= set(updates[0])
+
+    asyncio.run(run())
+
+
+class MockResponse:
+    def __init__(self, status):
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise Exception(f'{self.status} response')
+
+    async def json(self):
+        return {'message': 'error'} if self.status >= 400 else {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class MockSession:
+    def __init__(self, status):
+        self.status = status
+        self.requests = []
+
+    def put(self, url, json):
+        self.requests.append(json)
+        return MockResponse(self.status)
+
+
+def test_step_status_buffer_error_response():
+    async def run():
+        session = MockSession(500)
+        buffer = StepStatusBuffer(session, '1', 'runs', flush_interval=60)
+
+        # Updates of which the request got an error response are
+        # retried at the next flush.
+        buffer.add('STARTED', 'step-1')
+        await buffer.flush()
+        assert len(session.requests) == 1
+
+        session.status = 200
+        await buffer.flush()
+        assert len(session.requests) == 2
+        assert session.requests[-1]['steps'][0]['step_uuid'] == 'step-1'
+
+        # Nothing is pending once the updates were sent.
+        await buffer.flush()
+        assert len(session.requests) == 2
+
+    asyncio.run(run())
@@ -0,0 +1,186 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.core.cache import StepCache
+
+
+def write_output(pipeline_dir, step_uuid, data):
+    step_data_dir = os.path.join(pipeline_dir, '.orchest', 'data', step_uuid)
+    os.makedirs(step_data_dir, exist_ok=True)
+
+    with open(os.path.join(step_data_dir, f'{step_uuid}.pickle5'), 'wb') as f:
+        f.write(data)
+    with open(os.path.join(step_data_dir, 'HEAD'), 'w') as f:
+        f.write('2020-01-01T00:00:00, pickle5')
+
+
+def read_output(pipeline_dir, step_uuid):
+    step_data_dir = os.path.join(pipeline_dir, '.orchest', 'data', step_uuid)
+    with open(os.path.join(step_data_dir, f'{step_uuid}.pickle5'), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def pipeline_dir(tmp_path):
+    pipeline_dir = str(tmp_path)
+
+    description = {
+        'name': 'pipeline-name',
+        'uuid': 'pipeline-uuid',
+        'steps': {
+            'uuid-1': {'incoming_connections': []},
+            'uuid-2': {'incoming_connections': ['uuid-1']},
+        }
+    }
+    os.makedirs(os.path.join(pipeline_dir, '.orchest'))
+    with open(os.path.join(pipeline_dir, '.orchest', 'pipeline.json'), 'w') as f:
+        json.dump(description, f)
+
+    with open(os.path.join(pipeline_dir, 'step.py'), 'w') as f:
+        f.write('print("step")')
+
+    return pipeline_dir
+
+
+def get_properties(uuid, incoming_connections=[], file_path='step.py', **kwargs):
+    properties = {
+        'uuid': uuid,
+        'incoming_connections': incoming_connections,
+        'file_path': file_path,
+        'image': 'image',
+        'parameters': {},
+    }
+    properties.update(kwargs)
+    return properties
+
+
+def test_step_cache_key(pipeline_dir):
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+    key = cache.get_key(get_properties('uuid-1'), [])
+
+    assert cache.get_key(get_properties('uuid-1'), []) == key
+    assert cache.get_key(get_properties('uuid-1', image='other'), []) != key
+    assert cache.get_key(get_properties('uuid-1', parameters={'a': 1}), []) != key
+    assert cache.get_key(get_properties('uuid-1'), ['hash']) != key
+
+    # Steps of which the input is unknown cannot be cached.
+    assert cache.get_key(get_properties('uuid-1'), [None]) is None
+    assert cache.get_key(get_properties('uuid-1', file_path='missing.py'), []) is None
+
+    with open(os.path.join(pipeline_dir, 'step.py'), 'w') as f:
+        f.write('print("changed")')
+    assert cache.get_key(get_properties('uuid-1'), []) != key
+
+
+def test_step_cache_notebook_key(pipeline_dir):
+    notebook = {
+        'cells': [
+            {'cell_type': 'code', 'source': 'print(1)', 'metadata': {}, 'outputs': []},
+            {'cell_type': 'markdown', 'source': '# Title', 'metadata': {}},
+        ],
+    }
+    notebook_path = os.path.join(pipeline_dir, 'step.ipynb')
+    with open(notebook_path, 'w') as f:
+        json.dump(notebook, f)
+
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+    properties = get_properties('uuid-1', file_path='step.ipynb')
+    key = cache.get_key(properties, [])
+
+    # Outputs written by executing the notebook do not change the key.
+    notebook['cells'][0]['outputs'] = [{'output_type': 'stream', 'text': '1'}]
+    with open(notebook_path, 'w') as f:
+        json.dump(notebook, f)
+    assert cache.get_key(properties, []) == key
+
+    notebook['cells'][0]['source'] = 'print(2)'
+    with open(notebook_path, 'w') as f:
+        json.dump(notebook, f)
+    assert cache.get_key(properties, []) != key
+
+
+def test_step_cache_store_restore(pipeline_dir):
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+    properties = get_properties('uuid-1')
+
+    key, output_hash = cache.restore_step(properties, {})
+    assert key is not None
+    assert output_hash is None
+
+    # Only outputs since the start of the step are stored.
+    write_output(pipeline_dir, 'uuid-1', b'output')
+    assert cache.store(key, 'uuid-1', since=time.time() + 10) is None
+
+    output_hash = cache.store(key, 'uuid-1', since=0)
+    assert output_hash == cache.hash_output('uuid-1')
+
+    write_output(pipeline_dir, 'uuid-1', b'other output')
+    assert cache.restore_step(properties, {}) == (key, output_hash)
+    assert read_output(pipeline_dir, 'uuid-1') == b'output'
+
+    # The restored output resolves as the most recent output.
+    with open(os.path.join(pipeline_dir, '.orchest', 'data', 'uuid-1', 'HEAD')) as f:
+        timestamp, serialization = f.read().split(', ')
+    assert timestamp > '2020-01-01T00:00:00'
+    assert serialization == 'pickle5'
+
+
+def test_step_cache_incoming(pipeline_dir):
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+
+    # The incoming step is not part of the run, thus its output on disk
+    # is used to identify the input.
+    properties = get_properties('uuid-2')
+    assert cache.restore_step(properties, {}) == (None, None)
+
+    write_output(pipeline_dir, 'uuid-1', b'output')
+    key, _ = cache.restore_step(properties, {})
+    assert key == cache.get_key(properties, [cache.hash_output('uuid-1')])
+
+    assert cache.restore_step(properties, {'uuid-1': None}) == (None, None)
+
+
+def test_step_cache_input_order(pipeline_dir):
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+    write_output(pipeline_dir, 'uuid-1', b'output-1')
+    write_output(pipeline_dir, 'uuid-2', b'output-2')
+
+    properties = get_properties('uuid-3', incoming_connections=['uuid-1', 'uuid-2'])
+    key, _ = cache.restore_step(properties, {})
+
+    # The step gets its inputs in the order of its incoming connections,
+    # thus reordering them changes the key.
+    properties = get_properties('uuid-3', incoming_connections=['uuid-2', 'uuid-1'])
+    assert cache.restore_step(properties, {})[0] != key
+
+    # So does swapping the outputs of the parents.
+    write_output(pipeline_dir, 'uuid-1', b'output-2')
+    write_output(pipeline_dir, 'uuid-2', b'output-1')
+    properties = get_properties('uuid-3', incoming_connections=['uuid-1', 'uuid-2'])
+    assert cache.restore_step(properties, {})[0] != key
+
+
+def test_step_cache_evict(pipeline_dir):
+    cache = StepCache(pipeline_dir, max_size=1 << 20)
+
+    keys = []
+    for i in range(3):
+        properties = get_properties('uuid-1', parameters={'i': i})
+        key = cache.get_key(properties, [])
+        write_output(pipeline_dir, 'uuid-1', bytes(1000))
+        cache.store(key, 'uuid-1', since=0)
+        keys.append(key)
+
+        # Make sure the entries differ in their last use.
+        entry = os.path.join(pipeline_dir, '.orchest', 'cache', key)
+        os.utime(entry, (i, i))
+
+    # Every entry is slightly larger than its output.
+    cache.max_size = 2500
+    cache.restore(keys[0], 'uuid-1')
+    assert cache.evict() == [keys[1]]
+    assert sorted(os.listdir(os.path.join(pipeline_dir, '.orchest', 'cache'))) == sorted(
+        [keys[0], keys[2]])
@@ -19,6 +19,7 @@ from flask import Flask, send_from_directory
 from app.config import CONFIG_CLASS
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.analytics import analytics_ping
+from app.render_cache import NotebookHTMLCache, prerender_experiment_notebooks
 from subprocess import Popen
 from app.views import register_views
 from app.connections import db
@@ -55,16 +56,26 @@ def create_app():
     register_views(app, db)
 
 
+    scheduler = BackgroundScheduler()
+
     if "TELEMETRY_DISABLED" not in app.config:
-        # create thread for analytics
-        scheduler = BackgroundScheduler()
-        
         # send a ping now
         analytics_ping(app)
         
         # and every 15 minutes
         scheduler.add_job(analytics_ping, 'interval', minutes=app.config["TELEMETRY_INTERVAL"], args=[app])
-        scheduler.start()
+
+    # render the notebooks of finished experiment runs in the background,
+    # such that viewing them is served from the cache
+    notebook_html_cache = NotebookHTMLCache(
+        app.config["NOTEBOOK_HTML_CACHE_DIR"], app.config["NOTEBOOK_HTML_CACHE_MAX_SIZE"])
+    scheduler.add_job(
+        prerender_experiment_notebooks, 'interval',
+        seconds=app.config["NOTEBOOK_PRERENDER_INTERVAL"],
+        args=[app, notebook_html_cache, {}],
+        max_instances=1, coalesce=True)
+
+    scheduler.start()
 
     
     # Start threaded file_permission_watcher
@@ -25,6 +25,26 @@ class Config:
 
     TELEMETRY_INTERVAL = 15  # in minutes
 
+    # Maximum number of bytes of a log that are sent per response (or
+    # per event when streaming).
+    LOG_MAX_RESPONSE_BYTES = 1 << 20
+    LOG_STREAM_POLL_INTERVAL = 0.5  # in seconds
+    # Streams are closed after this many seconds, such that they do not
+    # hold on to a worker forever. Clients reconnect automatically.
+    LOG_STREAM_TIMEOUT = 60  # in seconds
+
+    # The index of pipelines is reconciled with the pipelines inside the
+    # userdir (to pick up changes that were made outside of the
+    # webserver) at most once per interval.
+    PIPELINE_INDEX_RECONCILE_INTERVAL = 5  # in seconds
+
+    # Cache of notebooks rendered to HTML.
+    NOTEBOOK_HTML_CACHE_DIR = os.path.join(USER_DIR, ".orchest", "notebook-html-cache")
+    NOTEBOOK_HTML_CACHE_MAX_SIZE = 1 << 30  # in bytes
+    # Interval at which the notebooks of finished experiment runs are
+    # rendered to the cache in the background.
+    NOTEBOOK_PRERENDER_INTERVAL = 30  # in seconds
+
     if DEBUG:
         logging.basicConfig(level=logging.INFO)
 
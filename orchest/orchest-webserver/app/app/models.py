@@ -14,6 +14,23 @@ class DataSource(db.Model):
         return f'<DataSource {self.name}:{self.source_type}>'
 
 
+class Pipeline(db.Model):
+    """Index of the pipelines inside the userdir.
+
+    The `pipeline.json` of a pipeline is the source of truth, the index
+    only stores what is needed to list pipelines without reading them.
+    """
+    __tablename__ = 'pipelines'
+
+    uuid = db.Column(db.String(255), unique=True, nullable=False, primary_key=True)
+    name = db.Column(db.String(255), unique=False, nullable=False, index=True)
+    # Modification time (in ns) of the `pipeline.json` when it was indexed.
+    mtime = db.Column(db.BigInteger(), unique=False, nullable=False)
+
+    def __repr__(self):
+        return f'<Pipeline {self.uuid}:{self.name}>'
+
+
 class Experiment(db.Model):
     __tablename__ = 'experiments'
 
@@ -0,0 +1,234 @@
+"""Cache of notebooks rendered to HTML.
+
+Rendered notebooks are stored on disk (such that the cache is shared by
+all processes of the webserver), keyed by the hash of the content of the
+notebook. Once the cache exceeds its maximum size, the least recently
+used renders are evicted.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+
+import nbconvert
+import nbformat
+import requests
+from nbconvert import HTMLExporter
+
+from _orchest.internals import config as _config
+
+from app.models import Experiment
+
+
+TEMPLATE_FILE = "full"
+
+# Maximum number of notebooks of which the cache key is memoized.
+MAX_MEMOIZED_KEYS = 4096
+
+# Statuses of pipeline runs that no longer change their notebooks.
+FINISHED_STATUSES = ["SUCCESS", "FAILURE", "ABORTED", "REVOKED"]
+
+
+def render_notebook(notebook_path):
+    with open(notebook_path, "r") as file:
+        nb = nbformat.read(file, nbformat.NO_CONVERT)
+
+    html_exporter = HTMLExporter()
+    html_exporter.template_file = TEMPLATE_FILE
+
+    (body, resources) = html_exporter.from_notebook_node(nb)
+
+    return body
+
+
+class NotebookHTMLCache:
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        # Maps the path of a notebook to its ((mtime, size), key), such
+        # that unchanged notebooks do not have to be hashed again. Holds
+        # at most `MAX_MEMOIZED_KEYS` of the most recently used paths.
+        self._keys = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, notebook_path):
+        stat = os.stat(notebook_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._keys.get(notebook_path)
+            if cached is not None and cached[0] == version:
+                self._keys.move_to_end(notebook_path)
+                return cached[1]
+
+        # The render also depends on the exporter.
+        hasher = hashlib.sha256()
+        hasher.update(("%s:%s:" % (nbconvert.__version__, TEMPLATE_FILE)).encode())
+        with open(notebook_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                hasher.update(block)
+        key = hasher.hexdigest()
+
+        with self._lock:
+            self._keys[notebook_path] = (version, key)
+            self._keys.move_to_end(notebook_path)
+            while len(self._keys) > MAX_MEMOIZED_KEYS:
+                self._keys.popitem(last=False)
+
+        return key
+
+    def get(self, key):
+        path = os.path.join(self.cache_dir, "%s.html" % key)
+
+        try:
+            with open(path, "r") as file:
+                body = file.read()
+        except FileNotFoundError:
+            return None
+
+        # Mark the render as recently used.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return body
+
+    def put(self, key, body):
+        path = os.path.join(self.cache_dir, "%s.html" % key)
+
+        # Renders are written atomically, since they can be read by
+        # other processes at the same time.
+        tmp_path = "%s.%s.tmp" % (path, uuid.uuid4())
+        try:
+            with open(tmp_path, "w") as file:
+                file.write(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self.evict()
+
+    def render(self, notebook_path):
+        """Returns the notebook rendered to HTML, from the cache if possible."""
+        key = self.get_key(notebook_path)
+
+        body = self.get(key)
+        if body is None:
+            body = render_notebook(notebook_path)
+            self.put(key, body)
+
+        return body
+
+    def evict(self):
+        """Evicts the least recently used renders until within `max_size`."""
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".html"):
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
+def prerender_experiment_notebooks(app, cache, prerendered):
+    """Renders the notebooks of finished runs of experiments to the cache.
+
+    Args:
+        cache: The NotebookHTMLCache to render to.
+        prerendered: Maps the UUID of an experiment to the UUIDs of its
+            runs of which the notebooks were already rendered, or to
+            None if all its runs are finished and rendered (in which
+            case the experiment is skipped). Updated in place.
+    """
+
+    with app.app_context():
+        experiments = Experiment.query.filter(Experiment.draft == False).all()
+
+    # Forget about experiments that were deleted.
+    experiment_uuids = {experiment.uuid for experiment in experiments}
+    for experiment_uuid in list(prerendered):
+        if experiment_uuid not in experiment_uuids:
+            del prerendered[experiment_uuid]
+
+    for experiment in experiments:
+        prerendered_runs = prerendered.setdefault(experiment.uuid, set())
+        if prerendered_runs is None:
+            continue
+
+        try:
+            resp = requests.get(
+                "http://" + app.config["ORCHEST_API_ADDRESS"] + "/api/experiments/" + experiment.uuid,
+                timeout=10)
+            pipeline_runs = resp.json()["pipeline_runs"]
+        except Exception as e:
+            logging.debug("Could not fetch experiment %s error: %s" % (experiment.uuid, e))
+            continue
+
+        for pipeline_run in pipeline_runs:
+            run_uuid = pipeline_run["run_uuid"]
+            if run_uuid in prerendered_runs or pipeline_run["status"] not in FINISHED_STATUSES:
+                continue
+
+            run_dir = os.path.join(app.config["USER_DIR"], "experiments",
+                                   experiment.pipeline_uuid, experiment.uuid, run_uuid)
+            prerender_pipeline_notebooks(run_dir, cache)
+
+            prerendered_runs.add(run_uuid)
+
+        # All runs of an experiment are created along with it, thus no
+        # runs are added once they are all rendered.
+        if len(prerendered_runs) == len(pipeline_runs):
+            prerendered[experiment.uuid] = None
+
+
+def prerender_pipeline_notebooks(pipeline_dir, cache):
+
+    pipeline_json_path = os.path.join(pipeline_dir, _config.PIPELINE_DESCRIPTION_PATH)
+
+    try:
+        with open(pipeline_json_path, "r") as json_file:
+            pipeline_json = json.load(json_file)
+    except (IOError, ValueError) as e:
+        logging.debug("Could not read %s error: %s" % (pipeline_json_path, e))
+        return
+
+    for step in pipeline_json["steps"].values():
+        if not step["file_path"].endswith(".ipynb"):
+            continue
+
+        notebook_path = os.path.join(pipeline_dir, step["file_path"])
+        try:
+            cache.render(notebook_path)
+        except Exception as e:
+            logging.debug("Could not render notebook %s error: %s" % (notebook_path, e))
@@ -1,37 +1,167 @@
 #!/usr/bin/env python3
+"""Makes all files and directories inside a directory accessible to others.
+
+Files and directories inside the userdir are created by different
+containers (with different users), thus they have to be readable and
+writable by others (and directories also executable).
+
+Permissions are fixed once for the entire directory on startup (the
+reconciliation pass), after which only paths that are created, moved
+into the directory or of which the permissions are changed are fixed,
+as notified by inotify. The reconciliation pass is repeated every
+`RECONCILE_INTERVAL` seconds and whenever the inotify event queue
+overflows, to fix paths of which events were missed.
+"""
 
 import pyinotify
 import os
+import stat
 import sys
-import subprocess
 import logging
 import time
 
-logger = None
+logger = logging.getLogger('permission_app')
+
+DIR_PERMISSIONS = stat.S_IROTH | stat.S_IWOTH | stat.S_IXOTH
+FILE_PERMISSIONS = stat.S_IROTH | stat.S_IWOTH
+
+RECONCILE_INTERVAL = 600  # in seconds
+
+# Events of paths of which the permissions could have to be fixed.
+WATCH_MASK = (pyinotify.IN_CREATE | pyinotify.IN_MOVED_TO | pyinotify.IN_ATTRIB
+              | pyinotify.IN_Q_OVERFLOW)
+
+
+def fix_path_permission(path):
+    """Adds the permissions for others to the path if it lacks them.
+
+    Returns:
+        True if the permissions of the path were changed, False
+        otherwise (also if the path no longer exists or its permissions
+        could not be changed).
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning("Could not stat %s: %s" % (path, e))
+        return False
+
+    # The permissions of symlinks are those of their target.
+    if stat.S_ISLNK(mode):
+        return False
 
-def fix_path_permission(path, is_dir):
+    permissions = DIR_PERMISSIONS if stat.S_ISDIR(mode) else FILE_PERMISSIONS
+    if mode & permissions == permissions:
+        return False
 
-    # logger.debug(path)
-    if is_dir:
-        subprocess.Popen("chmod o+rwx " + path, shell=True)
-    else:
-        subprocess.Popen("chmod o+rw " + path, shell=True)
+    try:
+        os.chmod(path, stat.S_IMODE(mode) | permissions)
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        # E.g. the path is owned by another user.
+        logger.warning("Could not change permissions of %s: %s" % (path, e))
+        return False
+
+    return True
 
 
 def walk_dir(path):
+    """Fixes the permissions of all paths inside the directory.
+
+    Returns:
+        The number of paths of which the permissions were changed.
+    """
+    fixed = 0
+
+    try:
+        entries = list(os.scandir(path))
+    except (FileNotFoundError, NotADirectoryError):
+        return fixed
+    except OSError as e:
+        logger.warning("Could not list %s: %s" % (path, e))
+        return fixed
+
+    for entry in entries:
+        fixed += fix_path_permission(entry.path)
+
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            fixed += walk_dir(entry.path)
+
+    return fixed
+
 
-    for dp, dirs, files in os.walk(path):
-        for f in files:
-            current_path = os.path.join(dp, f)
-            fix_path_permission(current_path, os.path.isdir(current_path))
-        for d in dirs:
-            current_path = os.path.join(dp, d)
-            fix_path_permission(current_path, os.path.isdir(current_path))
+def reconcile(path):
+    start = time.monotonic()
+    fixed = walk_dir(path)
+    logger.info("Reconciled %s in %.1fs, fixed %d paths" % (
+        path, time.monotonic() - start, fixed))
+
+
+class EventHandler(pyinotify.ProcessEvent):
+
+    def my_init(self, watch_manager, path):
+        self.watch_manager = watch_manager
+        self.path = path
+
+    def process_IN_CREATE(self, event):
+        fix_path_permission(event.pathname)
+
+        # Paths can be created inside a new directory before it is
+        # watched (which `auto_add` takes care of).
+        if event.dir:
+            walk_dir(event.pathname)
+
+    def process_IN_MOVED_TO(self, event):
+        fix_path_permission(event.pathname)
+
+        # Directories that are moved into the watched directory are not
+        # added by `auto_add`.
+        if event.dir:
+            self.watch_manager.add_watch(
+                event.pathname, WATCH_MASK, rec=True, auto_add=True)
+            walk_dir(event.pathname)
+
+    def process_IN_ATTRIB(self, event):
+        # Fixing the permissions triggers another event, after which
+        # the path no longer has to be fixed.
+        fix_path_permission(event.pathname)
+
+    def process_IN_Q_OVERFLOW(self, event):
+        logger.warning("Event queue overflowed")
+        reconcile(self.path)
+
+
+def watch(path, reconcile_interval=RECONCILE_INTERVAL):
+    watch_manager = pyinotify.WatchManager()
+    handler = EventHandler(watch_manager=watch_manager, path=path)
+    notifier = pyinotify.Notifier(watch_manager, handler, timeout=1000)
+
+    # Watches are added before reconciling, such that no paths are
+    # missed in between.
+    watch_manager.add_watch(path, WATCH_MASK, rec=True, auto_add=True)
+    reconcile(path)
+    last_reconcile = time.monotonic()
+
+    while True:
+        if notifier.check_events():
+            notifier.read_events()
+            notifier.process_events()
+
+        if time.monotonic() - last_reconcile > reconcile_interval:
+            reconcile(path)
+            last_reconcile = time.monotonic()
 
 
 if __name__ == "__main__":
 
-    logger = logging.getLogger('permission_app')
     logger.setLevel(logging.INFO)
 
     # create file handler which logs even debug messages
@@ -46,6 +176,4 @@ if __name__ == "__main__":
 
     logger.info("Started permission logging")
 
-    while True:
-        walk_dir(sys.argv[1])
-        time.sleep(0.5)
+    watch(sys.argv[1])
@@ -1,3 +1,4 @@
+import codecs
 import json
 import os
 import hashlib
@@ -5,6 +6,9 @@ import random
 import string
 import logging
 
+from _orchest.internals import config as _config
+
+
 def get_hash(path):
 	BLOCKSIZE = 8192 * 8
 	hasher = hashlib.md5()
@@ -60,4 +64,78 @@ def write_config(app, key, value):
 
 
     # always set rw permissions on file
-    os.system("chmod o+rw " + conf_json_path)
\ No newline at end of file
+    os.system("chmod o+rw " + conf_json_path)
+
+def get_log_id(stat, run_log_id=None):
+    """Returns the identity of a log file, which changes if it is recreated.
+
+    Args:
+        stat: The stat result of the log file.
+        run_log_id: The id written to the first line of the log by the
+            run that wrote it (see `_config.LOG_ID_LINE`), if any.
+    """
+    log_id = "%d-%d" % (stat.st_dev, stat.st_ino)
+    if run_log_id is not None:
+        log_id = "%s-%s" % (log_id, run_log_id)
+
+    return log_id
+
+
+def parse_log_id_line(line):
+    """Returns the id in the first line of a log, None if it has none."""
+    prefix, suffix = _config.LOG_ID_LINE.split("{log_id}")
+    if line.startswith(prefix) and line.endswith(suffix):
+        return line[len(prefix):-len(suffix)]
+
+    return None
+
+
+def read_log(log_path, offset, max_bytes, log_id=None):
+    """Reads the content of a log file starting at a byte offset.
+
+    Args:
+        log_id: The identity of the log file (as returned by a previous
+            call) that `offset` refers to, None if unknown.
+
+    Returns:
+        A tuple (content, offset, log_id, reset). The `content` is at
+        most `max_bytes` long and only contains complete UTF-8
+        characters, `offset` is the offset to read the remaining content
+        from and `log_id` the identity of the log file it refers to.
+        `reset` is True if the log file was rewritten or truncated since
+        `offset` (i.e. it is rewritten by a new run), in which case the
+        content is read from the start. The line identifying the run
+        that wrote the log is never part of the `content`.
+    """
+    reset = False
+
+    with open(log_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+
+        first_line = f.readline(256).decode("utf-8", errors="replace")
+        run_log_id = parse_log_id_line(first_line)
+        start = len(first_line.encode("utf-8")) if run_log_id is not None else 0
+
+        current_log_id = get_log_id(stat, run_log_id)
+        if (log_id is not None and log_id != current_log_id) or offset > size:
+            offset = 0
+            reset = True
+        offset = max(offset, start)
+
+        f.seek(offset)
+        data = f.read(max_bytes)
+
+    # Lines are only split if a single line exceeds `max_bytes`.
+    if len(data) == max_bytes and offset + len(data) < size:
+        end = data.rfind(b"\n")
+        if end != -1:
+            data = data[:end + 1]
+
+    # The writer can be in the middle of writing a character, the
+    # remaining bytes of which are read at the next offset.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    content = decoder.decode(data, final=False)
+    pending, _ = decoder.getstate()
+
+    return content, offset + len(data) - len(pending), current_log_id, reset
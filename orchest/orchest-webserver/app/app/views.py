@@ -1,19 +1,21 @@
 import json
 import os
+import time
 import uuid
 import pdb
 import requests
 import logging
-import nbformat
 
-from flask import render_template, request, jsonify
+from flask import Response, render_template, request, jsonify
 from flask_restful import Api, Resource, HTTPException
 from flask_marshmallow import Marshmallow
 from distutils.dir_util import copy_tree
-from nbconvert import HTMLExporter
-from app.utils import get_hash, get_user_conf
-from app.models import DataSource, Experiment, PipelineRun
+from sqlalchemy.exc import IntegrityError
+from app.utils import get_hash, get_user_conf, read_log
+from app.models import DataSource, Experiment, Pipeline, PipelineRun
+from app.render_cache import NotebookHTMLCache
 from _orchest.internals import config as _config
+from _orchest.internals.materialize import materialize_dir
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -47,6 +49,9 @@ def register_views(app, db):
     experiment_schema = ExperimentSchema()
     experiments_schema = ExperimentSchema(many=True)
 
+    notebook_html_cache = NotebookHTMLCache(
+        app.config["NOTEBOOK_HTML_CACHE_DIR"], app.config["NOTEBOOK_HTML_CACHE_MAX_SIZE"])
+
     def return_404(reason=""):
         json_string = json.dumps(
             {"success": False, "reason": reason})
@@ -154,6 +159,86 @@ def register_views(app, db):
         return pipeline_dir
 
 
+    # Monotonic time at which the index of pipelines was last reconciled
+    # (by this process).
+    pipeline_index_state = {"last_reconcile": None}
+
+
+    def get_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+    def index_pipeline(pipeline_uuid, pipeline_json=None, commit=True):
+        """Updates the index entry of a pipeline from its pipeline.json.
+
+        The `pipeline_json` is read from disk if not given.
+        """
+
+        pipeline_json_path = os.path.join(
+            get_pipeline_directory_by_uuid(pipeline_uuid), _config.PIPELINE_DESCRIPTION_PATH)
+
+        mtime = get_mtime(pipeline_json_path)
+
+        if mtime is None:
+            Pipeline.query.filter(Pipeline.uuid == pipeline_uuid).delete()
+        else:
+            if pipeline_json is None:
+                try:
+                    with open(pipeline_json_path, "r") as json_file:
+                        pipeline_json = json.load(json_file)
+                except (IOError, ValueError) as error:
+                    logging.debug("Error reading pipeline.json %s error: %s" % (
+                        pipeline_json_path, error))
+                    return
+
+            db.session.merge(
+                Pipeline(uuid=pipeline_uuid, name=pipeline_json["name"], mtime=mtime))
+
+        if commit:
+            db.session.commit()
+
+
+    def reconcile_pipeline_index():
+        """Reconciles the index with the pipelines inside the userdir.
+
+        Only pipelines of which the pipeline.json was modified since it
+        was indexed are read, e.g. pipelines that were edited outside of
+        the webserver.
+        """
+
+        pipelines_dir = get_pipelines_dir()
+
+        indexed = dict(db.session.query(Pipeline.uuid, Pipeline.mtime))
+
+        pipeline_uuids = set()
+        for entry in os.scandir(pipelines_dir):
+            if not entry.is_dir():
+                continue
+
+            mtime = get_mtime(os.path.join(entry.path, _config.PIPELINE_DESCRIPTION_PATH))
+            if mtime is None:
+                continue
+
+            pipeline_uuids.add(entry.name)
+            if indexed.get(entry.name) != mtime:
+                index_pipeline(entry.name, commit=False)
+
+        removed_uuids = set(indexed) - pipeline_uuids
+        if removed_uuids:
+            Pipeline.query.filter(Pipeline.uuid.in_(list(removed_uuids))).delete(
+                synchronize_session=False)
+
+        try:
+            db.session.commit()
+        except IntegrityError as error:
+            # Another process reconciled at the same time.
+            db.session.rollback()
+            logging.debug("Failed to reconcile pipeline index: %s" % error)
+
+
     def generate_ipynb_from_template(step):
 
         # TODO: support additional languages to Python and R
@@ -214,7 +299,9 @@ def register_views(app, db):
         snapshot_path = os.path.join(experiment_path, "snapshot")
         pipeline_path = os.path.join(
             app.config["USER_DIR"], "pipelines", pipeline_uuid)
-        os.system("cp -R %s %s" % (pipeline_path, snapshot_path))
+        # The pipeline directory is edited in place after the snapshot
+        # is taken, thus its files are never hardlinked.
+        materialize_dir(pipeline_path, snapshot_path)
 
 
     def remove_experiment_directory(experiment_uuid, pipeline_uuid):
@@ -472,6 +559,9 @@ def register_views(app, db):
         if len(pipeline_dir) > 36:
             os.system("rm -rf %s" % (pipeline_dir))
 
+        Pipeline.query.filter(Pipeline.uuid == pipeline_uuid).delete()
+        db.session.commit()
+
         return jsonify({"success": True})
 
 
@@ -569,6 +659,8 @@ def register_views(app, db):
         with open(os.path.join(pipeline_dir, _config.PIPELINE_DESCRIPTION_PATH), "w") as pipeline_json_file:
             pipeline_json_file.write(json.dumps(pipeline_json))
 
+        index_pipeline(pipeline_uuid, pipeline_json)
+
         return jsonify({"success": True})
 
 
@@ -590,6 +682,8 @@ def register_views(app, db):
             with open(pipeline_json_path, "w") as json_file:
                 json_file.write(json.dumps(pipeline_json))
 
+            index_pipeline(pipeline_uuid, pipeline_json)
+
             json_string = json.dumps({"success": True})
             return json_string, 200, {"content-type": "application/json"}
         else:
@@ -634,30 +728,35 @@ def register_views(app, db):
 
     @app.route("/async/pipelines", methods=["GET"])
     def pipelines_get():
-
-        pipelines_dir = get_pipelines_dir()
-
-        pipeline_uuids = [f.path for f in os.scandir(
-            pipelines_dir) if f.is_dir()]
-
-        pipelines = []
-
-        for pipeline_uuid in pipeline_uuids:
-
-            pipeline_json_path = os.path.join(
-                pipelines_dir, pipeline_uuid, _config.PIPELINE_DESCRIPTION_PATH)
-
-            if os.path.isfile(pipeline_json_path):
-                with open(pipeline_json_path, "r") as json_file:
-                    pipeline_json = json.load(json_file)
-
-                    pipelines.append({
-                        "name": pipeline_json["name"],
-                        "uuid": pipeline_json["uuid"]
-                    })
-
-        json_string = json.dumps(
-            {"success": True, "result": pipelines})
+        """Lists the pipelines, ordered by name.
+
+        Pipelines are listed from the index. If `page` is given, then
+        only `per_page` pipelines of that page are returned.
+        """
+
+        now = time.monotonic()
+        last_reconcile = pipeline_index_state["last_reconcile"]
+        if (last_reconcile is None
+                or now - last_reconcile > app.config["PIPELINE_INDEX_RECONCILE_INTERVAL"]):
+            reconcile_pipeline_index()
+            pipeline_index_state["last_reconcile"] = now
+
+        query = Pipeline.query.order_by(Pipeline.name, Pipeline.uuid)
+
+        page = request.args.get("page", type=int)
+        if page is not None:
+            per_page = request.args.get("per_page", default=100, type=int)
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            pipelines, total = pagination.items, pagination.total
+        else:
+            pipelines = query.all()
+            total = len(pipelines)
+
+        json_string = json.dumps({
+            "success": True,
+            "result": [{"name": p.name, "uuid": p.uuid} for p in pipelines],
+            "total": total,
+        })
         return json_string, 200, {"content-type": "application/json"}
 
 
@@ -690,15 +789,7 @@ def register_views(app, db):
         if os.path.isfile(notebook_path):
             try:
 
-                with open(notebook_path, "r") as file:
-                    nb = nbformat.read(file, nbformat.NO_CONVERT)
-
-                html_exporter = HTMLExporter()
-                html_exporter.template_file = "full"
-
-                (body, resources) = html_exporter.from_notebook_node(nb)
-
-                return body
+                return notebook_html_cache.render(notebook_path)
 
             except IOError as error:
                 logging.debug("Error opening notebook file %s error: %s" % (
@@ -706,10 +797,7 @@ def register_views(app, db):
                 return return_404("Could not find notebook file %s" % notebook_path)
 
 
-    @app.route("/async/logs/<string:pipeline_uuid>/<string:step_uuid>", methods=["GET"])
-    def logs_get(pipeline_uuid, step_uuid):
-
-        pipeline_dir = None
+    def get_log_path(pipeline_uuid, step_uuid):
 
         if "pipeline_run_uuid" in request.args:
             pipeline_dir = get_pipeline_directory_by_uuid(
@@ -717,17 +805,31 @@ def register_views(app, db):
         else:
             pipeline_dir = get_pipeline_directory_by_uuid(pipeline_uuid)
 
-
-        log_path = os.path.join(
+        return os.path.join(
             pipeline_dir, app.config["LOG_DIR"], "%s.log" % step_uuid)
 
+
+    @app.route("/async/logs/<string:pipeline_uuid>/<string:step_uuid>", methods=["GET"])
+    def logs_get(pipeline_uuid, step_uuid):
+        """Returns the log of a step starting at the byte `offset`.
+
+        Clients tail the log by passing the returned `offset` and
+        `log_id` to the next request. If `reset` is true, then the log
+        was rewritten and the `result` replaces the previously returned
+        content.
+        """
+
+        log_path = get_log_path(pipeline_uuid, step_uuid)
+        offset = request.args.get("offset", default=0, type=int)
+        log_id = request.args.get("log_id")
+
         logs = None
 
         if os.path.isfile(log_path):
             try:
 
-                with open(log_path, "r") as f:
-                    logs = f.read()
+                logs, offset, log_id, reset = read_log(
+                    log_path, offset, app.config["LOG_MAX_RESPONSE_BYTES"], log_id)
 
             except IOError as error:
                 logging.debug("Error opening log file %s error: %s" %
@@ -735,7 +837,8 @@ def register_views(app, db):
 
         if logs is not None:
             json_string = json.dumps(
-                {"success": True, "result": logs})
+                {"success": True, "result": logs, "offset": offset, "log_id": log_id,
+                 "reset": reset})
 
             return json_string, 200, {"content-type": "application/json"}
 
@@ -746,6 +849,75 @@ def register_views(app, db):
             return json_string, 404, {"content-type": "application/json"}
 
 
+    @app.route("/async/logs/<string:pipeline_uuid>/<string:step_uuid>/stream", methods=["GET"])
+    def logs_stream(pipeline_uuid, step_uuid):
+        """Streams the log of a step as server-sent events.
+
+        Every event contains the content that was appended to the log,
+        see `logs_get`. The id of an event is "<log_id>:<offset>" to
+        continue from, such that clients that reconnect (e.g. after the
+        stream timed out) resume where they left off through the
+        "Last-Event-ID" header.
+        """
+
+        log_path = get_log_path(pipeline_uuid, step_uuid)
+
+        log_id = None
+        offset = 0
+        last_event_id = request.headers.get("Last-Event-ID")
+        if last_event_id:
+            try:
+                log_id, offset = last_event_id.rsplit(":", 1)
+                offset = int(offset)
+            except ValueError:
+                log_id, offset = None, 0
+
+        max_bytes = app.config["LOG_MAX_RESPONSE_BYTES"]
+        poll_interval = app.config["LOG_STREAM_POLL_INTERVAL"]
+        timeout = app.config["LOG_STREAM_TIMEOUT"]
+
+        def generate(log_id, offset):
+            deadline = time.monotonic() + timeout
+            version = None
+
+            while time.monotonic() < deadline:
+                try:
+                    stat = os.stat(log_path)
+                except OSError:
+                    new_version = None
+                else:
+                    new_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+                # Only read the log once it has changed.
+                if new_version is not None and new_version != version:
+                    previous_offset = offset
+                    try:
+                        logs, offset, log_id, reset = read_log(
+                            log_path, offset, max_bytes, log_id)
+                    except IOError as error:
+                        logging.debug("Error opening log file %s error: %s" %
+                                      (log_path, error))
+                    else:
+                        if logs or reset:
+                            data = json.dumps({"result": logs, "reset": reset})
+                            yield "id: %s:%d\ndata: %s\n\n" % (log_id, offset, data)
+
+                        # Continue right away if the log was only
+                        # partially read because of `max_bytes`.
+                        if previous_offset != offset and offset < stat.st_size:
+                            continue
+
+                    version = new_version
+
+                time.sleep(poll_interval)
+
+        return Response(generate(log_id, offset), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            # Do not let nginx buffer the events.
+            "X-Accel-Buffering": "no",
+        })
+
+
     @app.route("/async/pipelines/json/save", methods=["POST"])
     def pipelines_json_save():
 
@@ -762,6 +934,8 @@ def register_views(app, db):
         with open(os.path.join(pipeline_directory, _config.PIPELINE_DESCRIPTION_PATH), "w") as json_file:
             json_file.write(json.dumps(pipeline_json))
 
+        index_pipeline(request.form.get("pipeline_uuid"), pipeline_json)
+
         return jsonify({"success": True})
 
 
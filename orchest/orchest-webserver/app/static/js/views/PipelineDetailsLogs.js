@@ -1,5 +1,4 @@
 import React from 'react';
-import { makeRequest, PromiseManager, makeCancelable } from "../lib/utils/all";
 
 class PipelineDetailsLogs extends React.Component {
   constructor(props) {
@@ -8,22 +7,16 @@ class PipelineDetailsLogs extends React.Component {
     this.state = {
       logs: ''
     };
-
-    this.promiseManager = new PromiseManager();
   }
   componentDidMount() {
 
     // start listener
-    this.fetchLog();
-
-    this.logFetchInterval = setInterval(() => {
-      this.fetchLog();
-    }, 1000);
+    this.streamLog();
 
   }
 
   componentWillUnmount() {
-    clearInterval(this.logFetchInterval);
+    this.closeLogStream();
   }
 
   componentDidUpdate(prevProps){
@@ -31,38 +24,47 @@ class PipelineDetailsLogs extends React.Component {
       this.setState({
         logs: ""
       })
+
+      this.closeLogStream();
+      this.streamLog();
     }
   }
-  
-  fetchLog() {
 
-    let logURL = "/async/logs/" + this.props.pipeline.uuid + "/" + this.props.step.uuid;
+  closeLogStream() {
+    if(this.logEventSource){
+      this.logEventSource.close();
+      this.logEventSource = undefined;
+    }
+  }
+
+  streamLog() {
+
+    // Only the content that is appended to the log is sent. When the
+    // stream reconnects it continues from the last received offset.
+    let logURL = "/async/logs/" + this.props.pipeline.uuid + "/" + this.props.step.uuid + "/stream";
 
     if(this.props.pipelineRun){
       logURL += "?pipeline_run_uuid=" + this.props.pipelineRun.run_uuid;
     }
 
-    let fetchLogPromise = makeCancelable(makeRequest("GET", logURL), this.promiseManager);
-    
-    fetchLogPromise.promise.then((response) => {
-      let json = JSON.parse(response);
-      if (json.success) {
-        this.setState({
-          "logs": json.result
-        })
-      } else {
-        console.warn("Could not fetch logs.");
-        console.log(json);
-      }
-    }).catch((error) => {
-      if(!error.isCanceled){
-        // failed to fetch logs, clear log state
-        this.setState({
-          "logs": ""
-        })
-      }
-    })
-    
+    this.logEventSource = new EventSource(logURL);
+
+    this.logEventSource.onmessage = (event) => {
+      let json = JSON.parse(event.data);
+
+      this.setState((state) => {
+        return {
+          "logs": json.reset ? json.result : state.logs + json.result
+        }
+      })
+    };
+
+    this.logEventSource.onerror = () => {
+      // The stream is closed by the server after a timeout, in which
+      // case the EventSource reconnects automatically.
+      console.log("Log stream disconnected, reconnecting.");
+    };
+
   }
   render() {
     return <div className={"detail-subview"}>
@@ -73,4 +75,4 @@ class PipelineDetailsLogs extends React.Component {
   }
 }
 
-export default PipelineDetailsLogs;
\ No newline at end of file
+export default PipelineDetailsLogs;
@@ -0,0 +1,137 @@
+"""Stress benchmark of the file permission watcher.
+
+Run from the ``orchest/orchest-webserver/app`` directory:
+
+    python tests/benchmarks/bench_file_permission_watcher.py
+
+Creates a directory of ``NUM_FILES`` files (in directories of
+``FILES_PER_DIR`` files) without permissions for others and reports:
+
+* ``poll``: the duration of a single iteration of the previous
+  implementation, that walked the entire directory and spawned a
+  ``chmod`` process per path every 0.5 seconds (measured on
+  ``POLL_NUM_FILES`` files only, since it forks a process per path).
+* ``reconcile``: the duration of the startup reconciliation pass, once
+  when all paths have to be fixed and once when none have to be.
+* ``idle cpu``: the CPU usage of the watcher while nothing changes.
+* ``burst``: the time until the permissions of ``BURST_FILES`` files,
+  that are created at once, are fixed by the running watcher.
+"""
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app',
+                                'scripts'))
+import file_permission_watcher  # noqa: E402
+
+
+NUM_FILES = 200000
+FILES_PER_DIR = 100
+POLL_NUM_FILES = 2000
+BURST_FILES = 10000
+IDLE_SECONDS = 5
+
+WATCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app', 'scripts',
+                       'file_permission_watcher.py')
+
+
+def create_tree(directory, num_files):
+    for i in range(num_files):
+        subdir = os.path.join(directory, f'dir-{i // FILES_PER_DIR}')
+        if i % FILES_PER_DIR == 0:
+            os.mkdir(subdir, 0o700)
+        os.close(os.open(os.path.join(subdir, f'file-{i}'), os.O_CREAT | os.O_WRONLY, 0o600))
+
+
+def is_fixed(path):
+    return os.stat(path).st_mode & file_permission_watcher.FILE_PERMISSIONS != 0
+
+
+def measure_poll(directory):
+    # The previous implementation.
+    start = time.perf_counter()
+    processes = []
+    for dp, dirs, files in os.walk(directory):
+        for name in files + dirs:
+            path = os.path.join(dp, name)
+            mode = 'o+rwx' if os.path.isdir(path) else 'o+rw'
+            processes.append(subprocess.Popen('chmod %s %s' % (mode, path), shell=True))
+    for process in processes:
+        process.wait()
+    return time.perf_counter() - start
+
+
+def get_cpu_time(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        poll_dir = os.path.join(directory, 'poll')
+        os.mkdir(poll_dir)
+        create_tree(poll_dir, POLL_NUM_FILES)
+        poll_time = measure_poll(poll_dir)
+        print(f'poll ({POLL_NUM_FILES} files): {poll_time:.2f}s per iteration')
+
+        user_dir = os.path.join(directory, 'userdir')
+        os.mkdir(user_dir)
+        create_tree(user_dir, NUM_FILES)
+
+        start = time.perf_counter()
+        fixed = file_permission_watcher.walk_dir(user_dir)
+        print(f'reconcile ({NUM_FILES} files): {time.perf_counter() - start:.2f}s, '
+              f'fixed {fixed} paths')
+
+        start = time.perf_counter()
+        fixed = file_permission_watcher.walk_dir(user_dir)
+        print(f'reconcile ({NUM_FILES} files): {time.perf_counter() - start:.2f}s, '
+              f'fixed {fixed} paths')
+
+        watcher = subprocess.Popen([sys.executable, WATCHER, user_dir], cwd=directory)
+        try:
+            # Wait until the watcher has reconciled the directory and
+            # processes events.
+            log_file = os.path.join(directory, 'permission-app.log')
+            while not os.path.isfile(log_file) or 'Reconciled' not in open(log_file).read():
+                time.sleep(0.01)
+
+            probe = os.path.join(user_dir, 'probe')
+            os.close(os.open(probe, os.O_CREAT | os.O_WRONLY, 0o600))
+            while not is_fixed(probe):
+                time.sleep(0.01)
+
+            cpu_time = get_cpu_time(watcher.pid)
+            time.sleep(IDLE_SECONDS)
+            idle_cpu = (get_cpu_time(watcher.pid) - cpu_time) / IDLE_SECONDS
+            print(f'idle cpu: {idle_cpu * 100:.1f}%')
+
+            burst_dir = os.path.join(user_dir, 'burst')
+            start = time.perf_counter()
+            os.mkdir(burst_dir, 0o700)
+            paths = []
+            for i in range(BURST_FILES):
+                path = os.path.join(burst_dir, f'file-{i}')
+                os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+                paths.append(path)
+            created = time.perf_counter() - start
+
+            for path in paths:
+                while not is_fixed(path):
+                    time.sleep(0.001)
+            elapsed = time.perf_counter() - start
+            assert stat.S_IMODE(os.stat(burst_dir).st_mode) == 0o707
+
+            print(f'burst ({BURST_FILES} files): created in {created:.2f}s, '
+                  f'fixed in {elapsed:.2f}s')
+        finally:
+            watcher.kill()
+
+
+if __name__ == '__main__':
+    main()
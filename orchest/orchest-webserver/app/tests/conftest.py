@@ -0,0 +1,32 @@
+import os
+
+from flask import Flask
+import pytest
+
+from app.config import TestingConfig
+from app.connections import db
+from app.views import register_views
+
+
+@pytest.fixture
+def app(tmp_path):
+    user_dir = str(tmp_path / "userdir")
+    os.makedirs(user_dir)
+
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config.update({
+        "USER_DIR": user_dir,
+        "HOST_USER_DIR": user_dir,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///%s" % (tmp_path / "orchest-webserver.db"),
+        "NOTEBOOK_HTML_CACHE_DIR": str(tmp_path / "notebook-html-cache"),
+    })
+
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    register_views(app, db)
+
+    with app.app_context():
+        yield app
@@ -0,0 +1,176 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app import render_cache
+from app.connections import db
+from app.models import Experiment
+from app.render_cache import NotebookHTMLCache, prerender_experiment_notebooks
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Stubs rendering, returning the paths of the rendered notebooks."""
+    renders = []
+
+    def render_notebook(notebook_path):
+        renders.append(notebook_path)
+        with open(notebook_path, "r") as f:
+            return "<html>%s</html>" % f.read()
+
+    monkeypatch.setattr(render_cache, "render_notebook", render_notebook)
+    return renders
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return NotebookHTMLCache(str(tmp_path / "cache"), max_size=1 << 20)
+
+
+def write_notebook(path, content, mtime_ns=None):
+    with open(path, "w") as f:
+        f.write(content)
+
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def list_cache(cache):
+    return sorted(os.listdir(cache.cache_dir))
+
+
+def test_render(tmp_path, cache, renders):
+    notebook_path = str(tmp_path / "step.ipynb")
+    write_notebook(notebook_path, "notebook")
+
+    assert cache.render(notebook_path) == "<html>notebook</html>"
+    assert cache.render(notebook_path) == "<html>notebook</html>"
+    assert len(renders) == 1
+
+    # Notebooks with the same content share their render.
+    other_path = str(tmp_path / "other.ipynb")
+    write_notebook(other_path, "notebook")
+    cache.render(other_path)
+    assert len(renders) == 1
+
+    write_notebook(notebook_path, "changed")
+    assert cache.render(notebook_path) == "<html>changed</html>"
+    assert len(renders) == 2
+
+
+def test_get_key_memoized(tmp_path, cache):
+    notebook_path = str(tmp_path / "step.ipynb")
+    write_notebook(notebook_path, "notebook", mtime_ns=1000)
+    key = cache.get_key(notebook_path)
+
+    # The key is memoized as long as the mtime and size are unchanged,
+    # thus the content is not hashed again.
+    write_notebook(notebook_path, "changed!", mtime_ns=1000)
+    assert cache.get_key(notebook_path) == key
+
+    write_notebook(notebook_path, "changed!", mtime_ns=2000)
+    changed_key = cache.get_key(notebook_path)
+    assert changed_key != key
+
+    write_notebook(notebook_path, "changed!!", mtime_ns=2000)
+    assert cache.get_key(notebook_path) != changed_key
+
+
+def test_get_key_memo_bounded(tmp_path, cache, monkeypatch):
+    monkeypatch.setattr(render_cache, "MAX_MEMOIZED_KEYS", 2)
+
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / ("%d.ipynb" % i)))
+        write_notebook(paths[-1], "notebook-%d" % i)
+        cache.get_key(paths[-1])
+
+    assert list(cache._keys) == paths[1:]
+
+
+def test_put_atomic(cache):
+    cache.put("key", "render")
+    assert cache.get("key") == "render"
+
+    # A failed write leaves the previous render (and no temporary files)
+    # behind.
+    with patch("os.replace", side_effect=OSError("No space left on device")):
+        with pytest.raises(OSError):
+            cache.put("key", "new render")
+
+    assert cache.get("key") == "render"
+    assert list_cache(cache) == ["key.html"]
+
+
+def test_evict(cache):
+    cache.max_size = 25
+
+    for i, key in enumerate(["key-1", "key-2"]):
+        cache.put(key, "x" * 10)
+        os.utime(os.path.join(cache.cache_dir, "%s.html" % key), (i, i))
+
+    # Getting a render marks it as recently used.
+    cache.get("key-1")
+
+    cache.put("key-3", "x" * 10)
+    assert list_cache(cache) == ["key-1.html", "key-3.html"]
+
+    # Renders larger than the cache are evicted right away.
+    cache.put("key-4", "x" * 30)
+    assert list_cache(cache) == []
+
+
+def test_prerender_experiment_notebooks(app, cache, renders, monkeypatch):
+    experiment_dir = os.path.join(
+        app.config["USER_DIR"], "experiments", "pipeline-uuid", "experiment-uuid")
+    for run_uuid in ["run-1", "run-2"]:
+        run_dir = os.path.join(experiment_dir, run_uuid)
+        os.makedirs(os.path.join(run_dir, ".orchest"))
+        with open(os.path.join(run_dir, ".orchest", "pipeline.json"), "w") as f:
+            json.dump({"steps": {"step-1": {"file_path": "step.ipynb"}}}, f)
+        write_notebook(os.path.join(run_dir, "step.ipynb"), run_uuid)
+
+    db.session.add(Experiment(
+        name="experiment", uuid="experiment-uuid", pipeline_uuid="pipeline-uuid",
+        pipeline_name="pipeline", strategy_json="", draft=False))
+    db.session.commit()
+
+    statuses = {"run-1": "SUCCESS", "run-2": "STARTED"}
+    requests = []
+
+    class MockResponse:
+        def json(self):
+            return {"pipeline_runs": [
+                {"run_uuid": run_uuid, "status": status}
+                for run_uuid, status in statuses.items()
+            ]}
+
+    def get(url, **kwargs):
+        requests.append(url)
+        return MockResponse()
+
+    monkeypatch.setattr(render_cache.requests, "get", get)
+
+    # Only the notebooks of finished runs are rendered.
+    prerendered = {}
+    prerender_experiment_notebooks(app, cache, prerendered)
+    assert renders == [os.path.join(experiment_dir, "run-1", "step.ipynb")]
+    assert prerendered == {"experiment-uuid": {"run-1"}}
+
+    statuses["run-2"] = "FAILURE"
+    prerender_experiment_notebooks(app, cache, prerendered)
+    assert len(renders) == 2
+    assert prerendered == {"experiment-uuid": None}
+
+    # Experiments of which all runs are rendered are skipped.
+    prerender_experiment_notebooks(app, cache, prerendered)
+    assert len(requests) == 2
+    assert len(renders) == 2
+
+    # Deleted experiments are forgotten.
+    Experiment.query.delete()
+    db.session.commit()
+    prerender_experiment_notebooks(app, cache, prerendered)
+    assert prerendered == {}
@@ -0,0 +1,105 @@
+import os
+
+from app.utils import read_log
+
+
+def write_log(log_path, content, mode="wb"):
+    with open(log_path, mode) as f:
+        f.write(content)
+
+
+def test_read_log(tmp_path):
+    log_path = str(tmp_path / "step.log")
+    write_log(log_path, b"line 1\nline 2\n")
+
+    content, offset, log_id, reset = read_log(log_path, 0, 1024)
+    assert content == "line 1\nline 2\n"
+    assert offset == 14
+    assert not reset
+
+    # Only the appended content is returned.
+    write_log(log_path, b"line 3\n", mode="ab")
+    content, offset, log_id, reset = read_log(log_path, offset, 1024, log_id)
+    assert content == "line 3\n"
+    assert offset == 21
+    assert not reset
+
+
+def test_read_log_max_bytes(tmp_path):
+    log_path = str(tmp_path / "step.log")
+    write_log(log_path, b"line 1\nline 2\nline 3\n")
+
+    # The content is cut at the last complete line.
+    content, offset, log_id, _ = read_log(log_path, 0, 10)
+    assert content == "line 1\n"
+    assert offset == 7
+
+    content, offset, log_id, _ = read_log(log_path, offset, 10, log_id)
+    assert content == "line 2\n"
+
+    # A single line exceeding `max_bytes` is split.
+    write_log(log_path, b"a" * 20 + b"\n")
+    content, offset, _, _ = read_log(log_path, 0, 10)
+    assert content == "a" * 10
+    assert offset == 10
+
+
+def test_read_log_partial_character(tmp_path):
+    log_path = str(tmp_path / "step.log")
+    euro = "€".encode("utf-8")
+    write_log(log_path, b"price: " + euro[:2])
+
+    # The incomplete character is read once it is completely written.
+    content, offset, log_id, _ = read_log(log_path, 0, 1024)
+    assert content == "price: "
+    assert offset == 7
+
+    write_log(log_path, euro[2:] + b"\n", mode="ab")
+    content, offset, log_id, _ = read_log(log_path, offset, 1024, log_id)
+    assert content == "€\n"
+    assert offset == 11
+
+
+def test_read_log_reset(tmp_path):
+    log_path = str(tmp_path / "step.log")
+    write_log(log_path, b"old run\n" * 4)
+    _, offset, log_id, _ = read_log(log_path, 0, 1024)
+
+    # The log is truncated by a new run.
+    write_log(log_path, b"new run\n")
+    content, offset, log_id, reset = read_log(log_path, offset, 1024, log_id)
+    assert content == "new run\n"
+    assert reset
+
+    # The log is recreated by a new run and grows past the old offset
+    # before it is read again.
+    other_path = str(tmp_path / "other.log")
+    write_log(other_path, b"new run\n" * 8)
+    os.replace(other_path, log_path)
+
+    content, offset, log_id, reset = read_log(log_path, offset, 1024, log_id)
+    assert content == "new run\n" * 8
+    assert offset == 64
+    assert reset
+
+
+def test_read_log_run_id(tmp_path):
+    log_path = str(tmp_path / "step.log")
+    write_log(log_path, b"<!-- log-id: run-1 -->\nold run\n")
+
+    # The line identifying the run is not part of the content.
+    content, offset, log_id, reset = read_log(log_path, 0, 1024)
+    assert content == "old run\n"
+    assert not reset
+
+    # The log is rewritten by a new run in the same file (as happens if
+    # the inode of the removed log is reused) and grows past the old
+    # offset before it is read again.
+    write_log(log_path, b"<!-- log-id: run-2 -->\n" + b"new run\n" * 4)
+    content, offset, log_id, reset = read_log(log_path, offset, 1024, log_id)
+    assert content == "new run\n" * 4
+    assert reset
+
+    content, _, _, reset = read_log(log_path, offset, 1024, log_id)
+    assert content == ""
+    assert not reset
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.connections import db
+from app.models import Pipeline
+from _orchest.internals import config as _config
+
+
+def write_pipeline(app, pipeline_uuid, name):
+    pipeline_dir = os.path.join(app.config["USER_DIR"], "pipelines", pipeline_uuid)
+    pipeline_json_path = os.path.join(pipeline_dir, _config.PIPELINE_DESCRIPTION_PATH)
+    os.makedirs(os.path.dirname(pipeline_json_path), exist_ok=True)
+
+    with open(pipeline_json_path, "w") as f:
+        json.dump({"name": name, "uuid": pipeline_uuid, "version": "1.0.0"}, f)
+
+    # Make sure the modification time differs from the previous write.
+    mtime = os.stat(pipeline_json_path).st_mtime_ns
+    os.utime(pipeline_json_path, ns=(mtime + 1000, mtime + 1000))
+
+    return pipeline_dir
+
+
+def list_pipelines(client, **args):
+    resp = client.get("/async/pipelines", query_string=args)
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+@pytest.fixture
+def client(app):
+    # Reconcile the index on every listing.
+    app.config["PIPELINE_INDEX_RECONCILE_INTERVAL"] = -1
+    return app.test_client()
+
+
+def test_pipelines_get_reconciles(app, client):
+    write_pipeline(app, "uuid-1", "b")
+    write_pipeline(app, "uuid-2", "a")
+
+    result = list_pipelines(client)
+    assert result["result"] == [{"name": "a", "uuid": "uuid-2"}, {"name": "b", "uuid": "uuid-1"}]
+    assert result["total"] == 2
+
+    # Pipelines that are edited, added and removed on disk.
+    write_pipeline(app, "uuid-1", "c")
+    write_pipeline(app, "uuid-3", "d")
+    shutil.rmtree(os.path.join(app.config["USER_DIR"], "pipelines", "uuid-2"))
+
+    result = list_pipelines(client)
+    assert result["result"] == [{"name": "c", "uuid": "uuid-1"}, {"name": "d", "uuid": "uuid-3"}]
+    assert result["total"] == 2
+    assert Pipeline.query.count() == 2
+
+
+def test_pipelines_get_throttled(app, client):
+    app.config["PIPELINE_INDEX_RECONCILE_INTERVAL"] = 3600
+
+    write_pipeline(app, "uuid-1", "a")
+    assert list_pipelines(client)["total"] == 1
+
+    # Changes on disk are only picked up once the interval has passed.
+    write_pipeline(app, "uuid-2", "b")
+    assert list_pipelines(client)["total"] == 1
+
+
+def test_pipelines_get_pagination(app, client):
+    for i in range(5):
+        write_pipeline(app, "uuid-%d" % i, "pipeline-%d" % i)
+
+    result = list_pipelines(client, page=1, per_page=2)
+    assert [p["name"] for p in result["result"]] == ["pipeline-0", "pipeline-1"]
+    assert result["total"] == 5
+
+    result = list_pipelines(client, page=3, per_page=2)
+    assert [p["name"] for p in result["result"]] == ["pipeline-4"]
+    assert result["total"] == 5
+
+    # Pages past the last one are empty.
+    result = list_pipelines(client, page=4, per_page=2)
+    assert result["result"] == []
+    assert result["total"] == 5
+
+
+def test_pipelines_rename_and_delete(app, client):
+    write_pipeline(app, "uuid-1", "a")
+    list_pipelines(client)
+
+    resp = client.post("/async/pipelines/rename/uuid-1", data={"name": "renamed"})
+    assert resp.status_code == 200
+    assert Pipeline.query.get("uuid-1").name == "renamed"
+
+    # Deleting a pipeline removes its entry from the index, without
+    # having to reconcile.
+    resp = client.post("/async/pipelines/delete/uuid-1")
+    assert resp.status_code == 200
+    assert Pipeline.query.count() == 0
+
+
+def test_pipelines_get_integrity_error(app, client):
+    write_pipeline(app, "uuid-1", "a")
+
+    # Another process indexed the pipeline at the same time.
+    error = IntegrityError("INSERT INTO pipelines", {}, Exception("UNIQUE constraint failed"))
+    with patch.object(db.session, "commit", side_effect=error):
+        result = list_pipelines(client)
+    assert result["total"] == 0
+
+    # The failed reconciliation was rolled back and is done again.
+    result = list_pipelines(client)
+    assert result["result"] == [{"name": "a", "uuid": "uuid-1"}]
@@ -53,6 +53,7 @@ if [ ${#SERVICES[@]} -eq 0 ]; then
         "memory-server"
         "orchest-api"
         "orchest-sdk"
+        "orchest-webserver"
     )
 fi
 
@@ -89,6 +90,10 @@ do
         REQ_DIR=$DIR/../orchest/orchest-api/app
         TEST_DIR=$REQ_DIR
     fi
+    if [ $SERVICE == "orchest-webserver" ]; then
+        REQ_DIR=$DIR/../orchest/orchest-webserver/app
+        TEST_DIR=$REQ_DIR
+    fi
     if [ $SERVICE == "orchest-sdk" ]; then
         REQ_DIR=$DIR/../orchest-sdk/python
         TEST_DIR=$REQ_DIR